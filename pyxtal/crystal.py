@@ -2,14 +2,20 @@
 import os
 import random
 import numpy as np
-from copy import deepcopy
+from copy import copy, deepcopy
 
 # PyXtal imports #avoid *
-from pyxtal.symmetry import Group, choose_wyckoff
-from pyxtal.wyckoff_site import atom_site, check_atom_sites, WP_merge
+from pyxtal.symmetry import (
+    Group,
+    get_group,
+    choose_wyckoff,
+    get_stoichiometry_solver,
+)
+from pyxtal.wyckoff_site import atom_site, check_atom_site_neighbors, WP_merge
 from pyxtal.msg import printx
 from pyxtal.tolerance import Tol_matrix
 from pyxtal.lattice import Lattice, cellsize
+from pyxtal.operations import get_random_state, Cell_list
 from pyxtal.database.element import Element
 
 # Define functions
@@ -33,6 +39,8 @@ class random_crystal:
             object to define the unit cell
         tm (optional): the `pyxtal.tolerance.Tol_matrix <pyxtal.tolerance.Tol_matrix.html>`_ 
             object to define the distances
+        random_state (optional): a seed or `numpy.random.Generator` for the
+            random generation. If None, the global random state is used
     """
 
     def __init__(
@@ -44,21 +52,27 @@ class random_crystal:
         lattice=None,
         sites = None,
         tm=Tol_matrix(prototype="atomic"),
+        random_state=None,
     ):
 
         self.dim = 3 #periodic dimensions of the crystal
         if type(group) != Group:
-            group = Group(group, self.dim)
+            group = get_group(group, self.dim)
         self.sg = group.number #The international spacegroup number 
         self.PBC = [1, 1, 1]
         """The periodic boundary axes of the crystal"""
-        self.init_common(species, numIons, factor, group, lattice, sites, tm)
+        self.init_common(
+            species, numIons, factor, group, lattice, sites, tm, random_state
+        )
 
-    def init_common(self, species, numIons, factor, group, lattice, sites, tm):
+    def init_common(
+        self, species, numIons, factor, group, lattice, sites, tm, random_state=None
+    ):
         """
         Common init functionality for 0D-3D cases of random_crystal.
         """
         self.valid = False
+        self.random_state = get_random_state(random_state)
         # Check that numIons are integers greater than 0
         for num in numIons:
             if int(num) != num or num < 1:
@@ -67,7 +81,7 @@ class random_crystal:
         if type(group) == Group:
             self.group = group
         else:
-            self.group = Group(group, dim=self.dim)
+            self.group = get_group(group, dim=self.dim)
         self.number = self.group.number
         """
         The international group number of the crystal:
@@ -107,6 +121,8 @@ class random_crystal:
             if lattice.PBC != self.PBC:
                 self.lattice.PBC = self.PBC
                 printx("\n  Warning: converting custom lattice PBC to " + str(self.PBC))
+            if self.random_state is not None:
+                self.lattice.random_state = self.random_state
 
         # Generate a Lattice instance based on a given volume estimation
         elif lattice is None:
@@ -133,6 +149,7 @@ class random_crystal:
                     self.volume,
                     PBC=self.PBC,
                     unique_axis=unique_axis,
+                    random_state=self.random_state,
                 )
             elif self.dim == 2:
                 self.lattice = Lattice(
@@ -142,6 +159,7 @@ class random_crystal:
                     unique_axis=unique_axis,
                     # NOTE self.thickness is part of 2D class
                     thickness=self.thickness,
+                    random_state=self.random_state,
                 )
             elif self.dim == 1:
                 self.lattice = Lattice(
@@ -151,6 +169,7 @@ class random_crystal:
                     unique_axis=unique_axis,
                     # NOTE self.area is part of 1D class
                     area=self.area,
+                    random_state=self.random_state,
                 )
         # Set the tolerance matrix for checking inter-atomic distances
         if type(tm) == Tol_matrix:
@@ -190,110 +209,13 @@ class random_crystal:
         Checks if the number of atoms is compatible with the Wyckoff
         positions. Considers the number of degrees of freedom for each Wyckoff
         position, and makes sure at least one valid combination of WP's exists.
-    
-        NOTE Comprhys: Is degrees of freedom used symnomously with multiplicity?
-        perhaps standardising to multiplicity would be clearer?
-        """
-        # Store whether or not at least one degree of freedom exists
-        has_freedom = False
-        # Store the wp's already used that don't have any freedom
-        used_indices = []
-        # Loop over species
-        for numIon in numIons:
-            # Get lists of multiplicity, maxn and freedom
-            l_mult0 = []
-            l_maxn0 = []
-            l_free0 = []
-            indices0 = []
-            for i_wp, wp in enumerate(group):
-                indices0.append(i_wp)
-                l_mult0.append(len(wp))
-                l_maxn0.append(numIon // len(wp))
-                if np.allclose(wp[0].rotation_matrix, np.zeros([3, 3])):
-                    l_free0.append(False)
-                else:
-                    l_free0.append(True)
-            # Remove redundant multiplicities:
-            l_mult = []
-            l_maxn = []
-            l_free = []
-            indices = []
-            for mult, maxn, free, i_wp in zip(l_mult0, l_maxn0, l_free0, indices0):
-                if free is True:
-                    if mult not in l_mult:
-                        l_mult.append(mult)
-                        l_maxn.append(maxn)
-                        l_free.append(True)
-                        indices.append(i_wp)
-                elif free is False and i_wp not in used_indices:
-                    l_mult.append(mult)
-                    indices.append(i_wp)
-                    if mult <= numIon:
-                        l_maxn.append(1)
-                    elif mult > numIon:
-                        l_maxn.append(0)
-                    l_free.append(False)
-    
-            # Loop over possible combinations
-            p = 0  # Create pointer variable to move through lists
-    
-            # Store the number of each WP, used across possible WP combinations
-            n0 = [0] * len(l_mult)
-            n = deepcopy(n0)
-            for i, mult in enumerate(l_mult):
-                if l_maxn[i] != 0:
-                    p = i
-                    n[i] = l_maxn[i]
-                    break
-            p2 = p
-            if n == n0:
-                return False
-            while True:
-                num = np.dot(n, l_mult)
-                dobackwards = False
-                # The combination works: move to next species
-                if num == numIon:
-                    # Check if at least one degree of freedom exists
-                    for val, free, i_wp in zip(n, l_free, indices):
-                        if val > 0:
-                            if free is True:
-                                has_freedom = True
-                            elif free is False:
-                                used_indices.append(i_wp)
-                    break
-                # All combinations failed: return False
-                if n == n0 and p >= len(l_mult) - 1:
-                    return False
-                # Too few atoms
-                if num < numIon:
-                    # Forwards routine
-                    # Move p to the right and max out
-                    if p < len(l_mult) - 1:
-                        p += 1
-                        n[p] = min((numIon - num) // l_mult[p], l_maxn[p])
-                    elif p == len(l_mult) - 1:
-                        # p is already at last position: trigger backwards routine
-                        dobackwards = True
-                # Too many atoms
-                if num > numIon or dobackwards is True:
-                    # Backwards routine
-                    # Set n[p] to 0, move p backwards to non-zero, and decrease by 1
-                    n[p] = 0
-                    while p > 0 and p > p2:
-                        p -= 1
-                        if n[p] != 0:
-                            n[p] -= 1
-                            if n[p] == 0 and p == p2:
-                                p2 = p + 1
-                            break
-        # All species passed: return True
-        if has_freedom is True:
-            return True
-        # All species passed, but no degrees of freedom: return 0
-        elif has_freedom is False:
-            return 0
-    
+        The result is memoized (see symmetry.Stoichiometry_solver).
 
+        Returns:
+            True if a valid combination with degrees of freedom exists, 0 if
+            only combinations without freedom exist, and False otherwise
+        """
+        return get_stoichiometry_solver(group, numIons).verdict
 
     def check_consistency(self, site, numIon):
         num = 0
@@ -359,8 +281,9 @@ class random_crystal:
             a float value for the estimated volume
         """
         volume = 0
+        rng = random if self.random_state is None else self.random_state
         for numIon, specie in zip(self.numIons, self.species):
-            r = random.uniform(
+            r = rng.uniform(
                 Element(specie).covalent_radius, Element(specie).vdw_radius
             )
             volume += numIon * 4 / 3 * np.pi * r ** 3
@@ -447,6 +370,9 @@ class random_crystal:
         # Calculate a minimum vector length for generating a lattice
         # NOTE Comprhys: minvector never used?
         # minvector = max(self.tol_matrix.get_tol(s, s) for s in self.species)
+        # forget the previous structure, e.g., in generate_many
+        self.valid = False
+        self.atom_sites = []
         for cycle1 in range(self.lattice_attempts):
             self.cycle1 = cycle1
 
@@ -492,6 +418,45 @@ class random_crystal:
         self.valid = False
         return
 
+    def generate_many(self, n, max_failures=None):
+        """
+        Generates n new random crystals with the same settings. The group,
+        tolerance matrix, compatibility check and lattice settings are set up
+        only once; each yielded structure has its own lattice and sites.
+
+        Args:
+            n: the number of valid structures to generate
+            max_failures: the number of failed generations allowed before
+                stopping early. Defaults to n
+
+        Yields:
+            random_crystal objects. The numattempts attribute counts the
+            attempts spent on each structure, including those of the failed
+            generations since the previous structure
+        """
+        if max_failures is None:
+            max_failures = n
+        if self.check_compatible(self.group, self.numIons) is False:
+            printx(self.Msg1, priority=1)
+            return
+        failures = 0
+        numattempts = 0
+        count = 0
+        while count < n and failures <= max_failures:
+            self.generate_crystal()
+            numattempts += self.numattempts
+            if self.valid:
+                struc = copy(self)
+                struc.lattice = self.lattice.copy()
+                # keep sharing the stream rather than a copy of its state
+                struc.lattice.random_state = self.lattice.random_state
+                struc.numattempts = numattempts
+                numattempts = 0
+                count += 1
+                yield struc
+            else:
+                failures += 1
+
     def copy(self):
         """
         simply copy the structure
@@ -564,11 +529,15 @@ class random_crystal:
         generate coordinates for random crystal
         """
         wyckoff_sites_list = []
+        # the atoms placed in this attempt, binned for the distance checks
+        tols = [self.tol_matrix.get_tol(s1, s2) for s1 in self.species
+                for s2 in self.species]
+        cells = Cell_list(cell_matrix, max(tols), self.PBC)
 
         # generate coordinates for each ion type in turn
         for numIon, specie in zip(self.numIons, self.species):
             output = self._generate_ion_wyckoffs(
-                numIon, specie, cell_matrix, wyckoff_sites_list
+                numIon, specie, cell_matrix, wyckoff_sites_list, cells
             )
             if output is not None:
                 wyckoff_sites_list.extend(output)
@@ -580,7 +549,7 @@ class random_crystal:
         self.valid = True
         return wyckoff_sites_list
 
-    def _generate_ion_wyckoffs(self, numIon, specie, cell_matrix, wyks):
+    def _generate_ion_wyckoffs(self, numIon, specie, cell_matrix, wyks, cells):
         """
         generates a set of wyckoff positions to accomodate a given number
         of ions
@@ -589,6 +558,9 @@ class random_crystal:
             numIon: Number of ions to accomodate
             specie: Type of species being placed on wyckoff site
             cell_matrix: Matrix of lattice vectors
+            wyks: the list of wyckoff sites placed for the previous species
+            cells: a Cell_list holding the atoms placed so far. The accepted
+                sites are added to it
 
         Returns:
             Sucess:
@@ -605,8 +577,9 @@ class random_crystal:
         wyckoff_sites_tmp = []
 
         # Now we start to add the specie to the wyckoff position
-        sites_list = deepcopy(self.sites[specie]) # the list of Wyckoff site
+        sites_list = self.sites[specie] # the list of Wyckoff site
         if sites_list is not None: 
+            sites_list = list(sites_list)
             wyckoff_attempts = max(len(sites_list)*2, 10)
         else:
             # the minimum numattempts is to put all atoms to the general WPs
@@ -621,7 +594,9 @@ class random_crystal:
             else: # Selecting the merging 
                 site = None
             
-            wp = choose_wyckoff(self.group, numIon - numIon_added, site, self.dim)
+            wp = choose_wyckoff(
+                self.group, numIon - numIon_added, site, self.dim, self.random_state
+            )
             if wp is not False:
                 # Generate a list of coords from ops
                 mult = wp.multiplicity # remember the original multiplicity
@@ -637,13 +612,9 @@ class random_crystal:
                     # Use a Wyckoff_site object for the current site
                     new_site = atom_site(wp, pt, specie)
 
-                    # Check current WP against existing WP's
-                    passed_wp_check = True
-                    for ws in wyckoff_sites_tmp + wyks:
-                        if not check_atom_sites(new_site, ws, cell_matrix, tol_matrix):
-                            passed_wp_check = False
-
-                    if passed_wp_check:
+                    # Check current WP against the atoms placed so far
+                    if check_atom_site_neighbors(new_site, cells, tol_matrix):
+                        cells.add(new_site.coords, new_site.number)
                         if sites_list is not None:
                             sites_list.pop(0)
                         wyckoff_sites_tmp.append(new_site)
@@ -680,6 +651,8 @@ class random_crystal_2D(random_crystal):
             object to define the unit cell
         tm (optional): the `pyxtal.tolerance.Tol_matrix <pyxtal.tolerance.Tol_matrix.html>`_ 
             object to define the distances
+        random_state (optional): a seed or `numpy.random.Generator` for the
+            random generation. If None, the global random state is used
  
     """
 
@@ -693,15 +666,18 @@ class random_crystal_2D(random_crystal):
         lattice=None,
         sites = None,
         tm=Tol_matrix(prototype="atomic"),
+        random_state=None,
     ):
         self.dim = 2
         self.PBC = [1, 1, 0]
 
         if type(group) != Group:
-            group = Group(group, self.dim)
+            group = get_group(group, self.dim)
         number = group.number  # The layer group number of the crystal
         self.thickness = thickness  # in Angstroms, in the 3rd dimenion of unit cell
-        self.init_common(species, numIons, factor, number, lattice, sites, tm)
+        self.init_common(
+            species, numIons, factor, number, lattice, sites, tm, random_state
+        )
 
 
 class random_crystal_1D(random_crystal):
@@ -723,6 +699,8 @@ class random_crystal_1D(random_crystal):
             object to define the unit cell
         tm (optional): the `pyxtal.tolerance.Tol_matrix <pyxtal.tolerance.Tol_matrix.html>`_ 
             object to define the distances
+        random_state (optional): a seed or `numpy.random.Generator` for the
+            random generation. If None, the global random state is used
  
     """
 
@@ -736,12 +714,15 @@ class random_crystal_1D(random_crystal):
         lattice=None,
         sites = None,
         tm=Tol_matrix(prototype="atomic"),
+        random_state=None,
     ):
         self.dim = 1
         self.PBC = [0, 0, 1]
         self.sg = None
         self.area = area  # the effective cross-sectional area, in A^2, of the unit cell.
-        self.init_common(species, numIons, factor, group, lattice, sites, tm)
+        self.init_common(
+            species, numIons, factor, group, lattice, sites, tm, random_state
+        )
 
 
 class random_cluster(random_crystal):
@@ -765,6 +746,8 @@ class random_cluster(random_crystal):
             object to define the unit cell
         tm (optional): the `pyxtal.tolerance.Tol_matrix <pyxtal.tolerance.Tol_matrix.html>`_ 
             object to define the distances
+        random_state (optional): a seed or `numpy.random.Generator` for the
+            random generation. If None, the global random state is used
     """
 
     def __init__(
@@ -776,10 +759,13 @@ class random_cluster(random_crystal):
         lattice=None,
         sites = None,
         tm=Tol_matrix(prototype="atomic", factor=0.7),
+        random_state=None,
     ):
         # NOTE tol_m unused?
         tol_m = 0.1
         self.dim = 0
         self.PBC = [0, 0, 0]
         self.sg = None
-        self.init_common(species, numIons, factor, group, lattice, sites, tm)
+        self.init_common(
+            species, numIons, factor, group, lattice, sites, tm, random_state
+        )
@@ -1,6 +1,8 @@
 from pymatgen.core.structure import Molecule
 import json
+import os
 import os.path as op
+import numpy as np
 
 
 class Collection:
@@ -19,8 +21,15 @@ class Collection:
     >>> list(test)
     ['C60', 'H2O', 'CH4', 'NH3', 'benzene', 'naphthalene', 'anthracene', 'tetracene', 'pentacene', 'coumarin', 'resorcinol', 'benzamide', 'aspirin', 'ddt', 'lindane', 'glycine', 'glucose', 'ROY']
 
+    Larger libraries of molecules can be stored as a directory of .npy files
+    with write_collection, and are then memory-mapped:
+
+    >>> write_collection('my_mols', {'H2O': test['H2O']})
+    >>> Collection('my_mols')['H2O']
+
     Args:
-        name: the type of collection to get. Defaults to "molecules"
+        name: the type of collection to get. Defaults to "molecules". Either
+            "molecules", "clusters" or the path of a user collection
     """
 
     def __init__(self, name="molecules"):
@@ -29,7 +38,8 @@ class Collection:
         Will read data from json file when needed.
 
         A collection can be iterated over to get the Atoms objects and indexed
-        with names to get individual members.
+        with names to get individual members. Each entry is parsed on first
+        access, and a new Molecule is built from it on every access.
 
         Attributes:
 
@@ -38,47 +48,127 @@ class Collection:
         data: object
             Pymetgen molecule object
         filename: str
-            Location of json file.
+            Location of json file, or directory of the user collection.
         """
 
         self.name = name
         self._data = {}
-        self.filename = op.join(op.dirname(__file__), name + ".json")
-        with open(self.filename, "r") as f:
-            self.content = json.load(f)
+        self._index = None
+        if name in ["molecules", "clusters"]:
+            self.filename = op.join(op.dirname(__file__), name + ".json")
+        elif op.isdir(name):
+            self.filename = name
+        else:
+            raise NameError("{:s} is not a valid collection".format(name))
+
+    @property
+    def content(self):
+        """The list of raw entries of a json collection, parsed on first use"""
+        if not hasattr(self, "_content"):
+            with open(self.filename, "r") as f:
+                self._content = json.load(f)
+        return self._content
+
+    def _get_index(self):
+        """
+        Returns a dictionary from the (lower case) names to the positions of
+        the entries, built on first use
+        """
+        if self._index is None:
+            if self.name == "clusters":
+                self._index = {dct["name"]: i for i, dct in enumerate(self.content)}
+            elif self.name == "molecules":
+                self._index = {
+                    dct["name"].lower(): i for i, dct in enumerate(self.content)
+                }
+            else:
+                self._arrays = {}
+                for key in ["names", "numbers", "coords", "offsets", "charges"]:
+                    filename = op.join(self.filename, key + ".npy")
+                    # charges are optional
+                    if key != "charges" or op.exists(filename):
+                        self._arrays[key] = np.load(filename, mmap_mode="r")
+                self._index = {
+                    str(n).lower(): i for i, n in enumerate(self._arrays["names"])
+                }
+        return self._index
 
     def __getitem__(self, name):
-        self._read(name)
-        if len(self._data) == 0:
-            names = ""
-            for dct in self.content:
-                names += dct["name"] + ", "
-            msg = name + " is not supported\n"
-            msg += "Available molecules are:\n"
-            msg += names
-            raise NameError(msg)
-        else:
-            return self._data
+        key = int(name) if self.name == "clusters" else name.lower()
+        if key not in self._data:
+            index = self._get_index()
+            if key not in index:
+                names = ""
+                for n in self:
+                    names += str(n) + ", "
+                msg = str(name) + " is not supported\n"
+                msg += "Available molecules are:\n"
+                msg += names
+                raise NameError(msg)
+            self._data[key] = self._read(index[key])
+        if self.name == "clusters":
+            return self._data[key]
+        species, coords, charge = self._data[key]
+        return Molecule(species, coords, charge=charge)
 
     def __iter__(self):
-        for dct in self.content:
-            yield dct["name"]
+        if self.name in ["molecules", "clusters"]:
+            for dct in self.content:
+                yield dct["name"]
+        else:
+            self._get_index()
+            for n in self._arrays["names"]:
+                yield str(n)
 
-    def _read(self, name):
+    def _read(self, i):
+        """
+        read the i-th entry: the species, coordinates and charge of a
+        molecule, or the dictionary of a cluster
+        """
         if self.name == "molecules":
-            """
-            read the data by name and convert it to pymatgen format
-            """
-            for dct in self.content:
-                if dct["name"].lower() == name.lower():
-                    pos = dct["xyz"]
-                    symbols = dct["elements"]
-                    self._data = Molecule(symbols, pos)
+            dct = self.content[i]
+            return dct["elements"], np.array(dct["xyz"], dtype=float), 0
         elif self.name == "clusters":
-            for dct in self.content:
-                if dct["name"] == int(name):
-                    self._data = dct
+            return self.content[i]
+        else:
+            start, end = self._arrays["offsets"][i:i+2]
+            numbers = self._arrays["numbers"][start:end].tolist()
+            coords = np.array(self._arrays["coords"][start:end])
+            charge = 0
+            if "charges" in self._arrays:
+                charge = float(self._arrays["charges"][i])
+            return numbers, coords, charge
 
     def show_names(self):
-        for dct in self.content:
-            print(dct["name"])
+        for name in self:
+            print(name)
+
+
+def write_collection(path, molecules):
+    """
+    Stores molecules as a user collection: a directory of .npy files which
+    are memory-mapped by Collection. The atoms of all molecules are packed
+    into single arrays, and the atoms of the i-th molecule are found between
+    offsets[i] and offsets[i+1]. The names, atomic numbers, coordinates and
+    charges are stored; site properties and spin multiplicities are not.
+
+    Args:
+        path: the directory of the collection
+        molecules: a dictionary of pymatgen Molecule objects by name
+    """
+    names = list(molecules.keys())
+    mols = [molecules[name] for name in names]
+    offsets = np.zeros(len(mols) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(mol) for mol in mols])
+    if len(mols) > 0:
+        numbers = np.concatenate([mol.atomic_numbers for mol in mols])
+        coords = np.concatenate([mol.cart_coords for mol in mols])
+    else:
+        numbers, coords = np.zeros(0), np.zeros([0, 3])
+    charges = np.array([mol.charge for mol in mols], dtype=np.float64)
+    os.makedirs(path, exist_ok=True)
+    np.save(op.join(path, "names.npy"), np.array(names, dtype=str))
+    np.save(op.join(path, "numbers.npy"), numbers.astype(np.int64))
+    np.save(op.join(path, "coords.npy"), coords.astype(np.float64))
+    np.save(op.join(path, "offsets.npy"), offsets)
+    np.save(op.join(path, "charges.npy"), charges)
@@ -0,0 +1,258 @@
+"""
+Build step for the binary symmetry archive (symmetry.npz).
+
+The Wyckoff tables are maintained as human-readable csv files, where each row
+stores a Python literal of xyz strings (or affine matrices for the point
+groups). Parsing these strings at runtime is slow, so this module compiles all
+of them once into a single NumPy archive of 4x4 affine matrices.
+
+For each table, the archive holds a packed (N, 4, 4) array of operations and
+one offset array per nesting level, so that the operations of group g are
+recovered by slicing. Run this module after editing any of the csv files:
+
+    $ python -m pyxtal.database.compile_symmetry
+"""
+import csv
+import os.path as op
+import sys
+
+import numpy as np
+from pymatgen.core.operations import SymmOp
+
+# Column layout of the archive: table name -> (csv file, nesting depth)
+tables = {
+    "space": ("wyckoff_list", 2),
+    "space_symmetry": ("wyckoff_symmetry", 3),
+    "space_generators": ("wyckoff_generators", 2),
+    "layer": ("layer", 2),
+    "layer_symmetry": ("layer_symmetry", 3),
+    "layer_generators": ("layer_generators", 2),
+    "rod": ("rod", 2),
+    "rod_symmetry": ("rod_symmetry", 3),
+    "rod_generators": ("rod_generators", 2),
+    "point": ("point", 2),
+    "point_symmetry": ("point_symmetry", 3),
+    "point_generators": ("point_generators", 2),
+}
+
+# Range of group numbers with non-orthogonal (trigonal/hexagonal) operations
+hexagonal = {"space": (143, 194), "layer": (65, 80), "rod": (42, 75)}
+
+# Crystal dimension of each kind of group
+dims = {"space": 3, "layer": 2, "rod": 1, "point": 0}
+
+P = SymmOp.from_rotation_and_translation(
+    [[1, -0.5, 0], [0, np.sqrt(3) / 2, 0], [0, 0, 1]], [0, 0, 0]
+)
+
+
+def read_table(name):
+    """
+    Read the raw python literals from one of the csv tables
+
+    Args:
+        name: the name of the csv file, without extension
+
+    Returns:
+        a list indexed by group number (0 is an empty placeholder)
+    """
+    filename = op.join(op.dirname(__file__), name + ".csv")
+    csv.field_size_limit(sys.maxsize)
+    rows = []
+    with open(filename, "r") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            if len(row) == 0:
+                continue
+            elif row[1] == "":
+                rows.append([])
+            else:
+                rows.append(eval(row[1]))
+    return rows
+
+
+def to_matrix(item):
+    """
+    Convert an xyz string or a nested list into a 4x4 affine matrix
+    """
+    if isinstance(item, str):
+        return SymmOp.from_xyz_string(item).affine_matrix
+    else:
+        return SymmOp(item).affine_matrix
+
+
+def to_molecular(m, convert):
+    """
+    Return the Euclidean point operation used for molecular orientations:
+    non-orthogonal operations are converted to pure rotations and the
+    translation is removed
+    """
+    op = SymmOp(m)
+    if convert:
+        op = P * op * P.inverse
+    return SymmOp.from_rotation_and_translation(
+        op.rotation_matrix, [0, 0, 0]
+    ).affine_matrix
+
+
+def pack(nested, depth):
+    """
+    Pack a list of nested lists of 4x4 matrices into flat arrays
+
+    Args:
+        nested: list indexed by group, each entry nested depth times
+        depth: the number of list levels below the group level
+
+    Returns:
+        ops: a (N, 4, 4) array of all matrices
+        offsets: a list of depth offset arrays, one for each level
+    """
+    offsets = [[0] for i in range(depth)]
+    ops = []
+
+    def add(item, level):
+        if level == depth:
+            ops.append(item)
+        else:
+            for sub in item:
+                add(sub, level + 1)
+            if level + 1 == depth:
+                offsets[level].append(len(ops))
+            else:
+                offsets[level].append(len(offsets[level + 1]) - 1)
+
+    for entry in nested:
+        add(entry, 0)
+    ops = np.array(ops, dtype=float).reshape([-1, 4, 4])
+    return ops, [np.array(o, dtype=np.int32) for o in offsets]
+
+
+def compile_symmetry(filename=None):
+    """
+    Compile all csv Wyckoff tables into a single binary archive.
+    Besides the raw tables, the molecular versions of the site symmetry and
+    generators (Euclidean rotations without translation) are stored under
+    the keys ending with "_m". The Hermann-Mauguin site symmetry symbols of
+    all Wyckoff positions are derived from the Euclidean operations and
+    stored under "<group type>_ss".
+
+    Args:
+        filename: the path of the output archive. Defaults to symmetry.npz
+            next to this module
+    """
+    if filename is None:
+        filename = op.join(op.dirname(__file__), "symmetry.npz")
+    data = {}
+    for key, (name, depth) in tables.items():
+        rows = read_table(name)
+        matrices = [convert_nested(row, depth, to_matrix) for row in rows]
+        prefix = key.split("_")[0]
+        store(data, key, matrices, depth)
+        if key == "point_symmetry":
+            store_symbols(data, prefix + "_ss", matrices, dims[prefix])
+        if key == "space":
+            keys, values = compile_symops_index(matrices)
+            data["symops_keys"] = keys
+            data["symops_values"] = values
+
+        if key.endswith("_symmetry") or key.endswith("_generators"):
+            if prefix == "point":
+                continue
+            lo, hi = hexagonal[prefix]
+            matrices_m = []
+            for number, row in enumerate(matrices):
+                convert = lo <= number <= hi
+                fun = lambda m: to_molecular(m, convert)
+                matrices_m.append(convert_nested(row, depth, fun))
+            store(data, key + "_m", matrices_m, depth)
+            if key.endswith("_symmetry"):
+                store_symbols(data, prefix + "_ss", matrices_m, dims[prefix])
+
+    np.savez_compressed(filename, **data)
+    return filename
+
+
+def compile_symops_index(wyckoffs):
+    """
+    Build the index used by Wyckoff_position.from_symops, which maps the
+    canonical key of a set of operations (see symmetry.get_symops_key) to the
+    Wyckoff positions of the space groups. For P21/c, Pc and C2/c, the
+    operations in the n-glide setting (P21/n, Pn and C2/n) are also indexed.
+
+    Args:
+        wyckoffs: a list of Wyckoff positions (lists of 4x4 matrices) indexed
+            by space group number
+
+    Returns:
+        keys: an array of key strings
+        values: an (N, 4) array of [group, Wyckoff index, multiplicity, setting],
+            where setting is 0 for the standard and 1 for the n-glide setting
+    """
+    from pyxtal.symmetry import get_symops_key
+
+    trans = np.array([[1, 0, 0], [0, 1, 0], [1, 0, 1]])
+    keys = []
+    values = []
+    for number in range(1, 231):
+        for i, wp in enumerate(wyckoffs[number]):
+            ops = [SymmOp(m) for m in wp]
+            keys.append(get_symops_key([op.as_xyz_string() for op in ops]))
+            values.append([number, i, len(ops), 0])
+            if number in [7, 14, 15]:
+                strs = []
+                for op in ops:
+                    vec = op.translation_vector.dot(trans)
+                    vec -= np.floor(vec)
+                    op = op.from_rotation_and_translation(op.rotation_matrix, vec)
+                    strs.append(op.as_xyz_string().replace("-1/2", "+1/2"))
+                keys.append(get_symops_key(strs))
+                values.append([number, i, len(ops), 1])
+    return np.array(keys), np.array(values, dtype=np.int32)
+
+
+def compile_symbols(symmetry, dim):
+    """
+    Derive the site symmetry symbol of each Wyckoff position from the site
+    symmetry operations of its first point
+
+    Args:
+        symmetry: a list of site symmetry tables (4x4 matrices) indexed by
+            group number
+        dim: the dimension of the groups
+
+    Returns:
+        a list of lists of symbol strings, indexed by group number
+    """
+    from pyxtal.symmetry import ss_string_from_ops
+
+    symbols = []
+    for number, row in enumerate(symmetry):
+        symbols.append(
+            [ss_string_from_ops([SymmOp(m) for m in wp[0]], number, dim=dim)
+             for wp in row]
+        )
+    return symbols
+
+
+def convert_nested(item, depth, fun):
+    if depth == 0:
+        return fun(item)
+    return [convert_nested(sub, depth - 1, fun) for sub in item]
+
+
+def store(data, key, nested, depth):
+    ops, offsets = pack(nested, depth)
+    data[key + "_ops"] = ops
+    for i, offset in enumerate(offsets):
+        data[key + "_offsets" + str(i)] = offset
+
+
+def store_symbols(data, key, symmetry, dim):
+    symbols = compile_symbols(symmetry, dim)
+    data[key] = np.array([symbol for row in symbols for symbol in row])
+    data[key + "_offsets"] = np.cumsum([0] + [len(row) for row in symbols])
+
+
+if __name__ == "__main__":
+    print("Wrote", compile_symmetry())
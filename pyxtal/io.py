@@ -3,7 +3,7 @@ This module handles reading and write crystal files.
 """
 from pyxtal.constants import deg, logo
 import numpy as np
-from pyxtal.symmetry import Group
+from pyxtal.symmetry import get_group
 
 def write_cif(struc, filename=None, header="", permission='w', sym_num=None):
     """
@@ -21,12 +21,12 @@ def write_cif(struc, filename=None, header="", permission='w', sym_num=None):
         l_type = struc.group.lattice_type
         symbol = struc.group.symbol
         number = struc.group.number
-        G1 = struc.group.Wyckoff_positions[0]
+        G1 = struc.group.Wyckoff_positions[0].copy()
     else: #P1 symmetry
         l_type = 'triclinic'
         symbol = 'P1'
         number = 1
-        G1 = Group(1).Wyckoff_positions[0]
+        G1 = get_group(1).Wyckoff_positions[0]
 
     if hasattr(struc, 'mol_sites'):
         sites = struc.mol_sites
@@ -111,7 +111,7 @@ from pymatgen.core.structure import Structure, Molecule
 from pymatgen.core.bonds import CovalentBond
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pyxtal.wyckoff_site import mol_site, WP_merge
-from pyxtal.molecule import pyxtal_molecule, Orientation, compare_mol_connectivity
+from pyxtal.molecule import get_pyxtal_molecule, Orientation, compare_mol_connectivity
 from pyxtal.symmetry import Wyckoff_position, Group
 from pyxtal.lattice import Lattice
 
@@ -160,7 +160,7 @@ class structure_from_ext():
         print(self.wyc)
 
         if self.wyc is not None:
-            self.group = Group(self.wyc.number)
+            self.group = get_group(self.wyc.number)
             if isinstance(perm, list):
                 if perm != [0,1,2]:
                     lattice = Lattice.from_matrix(pmg_struc.lattice.matrix, self.group.lattice_type)
@@ -207,7 +207,7 @@ class structure_from_ext():
             mol = self.molecule
             ori = Orientation(np.eye(3))
         mol = self.add_site_props(mol)
-        pmol = pyxtal_molecule(mol)
+        pmol = get_pyxtal_molecule(mol)
         site = mol_site(pmol, self.position, ori, self.wyc, self.lattice, self.diag)
         return site
 
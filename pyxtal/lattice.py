@@ -38,6 +38,8 @@ class Lattice:
                 set_matrix() or set_para
             'unique_axis': the axis ('a', 'b', or 'c') which is not symmetrically
                 equivalent to the other two
+            'random_state': a numpy.random.Generator used for the random
+                lattices and points. If not given, the global random state is used
             'min_l': the smallest allowed cell vector. The smallest vector must
                 be larger than this.
             'mid_l': the second smallest allowed cell vector. The second
@@ -72,6 +74,7 @@ class Lattice:
         self.dim = sum(PBC)
         self.kwargs = {}
         self.random = True
+        self.random_state = kwargs.pop("random_state", None)
         # Set optional values
         self.allow_volume_reset = True
         for key, value in kwargs.items():
@@ -191,7 +194,8 @@ class Lattice:
         """
         mutate the lattice object
         """
-        rand = 1 + degree*(np.random.sample(6)-0.5)
+        rng = np.random if self.random_state is None else self.random_state
+        rand = 1 + degree*(rng.random(6)-0.5)
         a, b, c, alpha, beta, gamma = self.get_para()
         a *= rand[0]
         b *= rand[1]
@@ -220,14 +224,15 @@ class Lattice:
         return lat
 
     def generate_para(self):
+        kwargs = dict(self.kwargs, random_state=self.random_state)
         if self.dim == 3:
-            return generate_lattice(self.ltype, self.volume, **self.kwargs)
+            return generate_lattice(self.ltype, self.volume, **kwargs)
         elif self.dim == 2:
-            return generate_lattice_2D(self.ltype, self.volume, **self.kwargs)
+            return generate_lattice_2D(self.ltype, self.volume, **kwargs)
         elif self.dim == 1:
-            return generate_lattice_1D(self.ltype, self.volume, **self.kwargs)
+            return generate_lattice_1D(self.ltype, self.volume, **kwargs)
         elif self.dim == 0:
-            return generate_lattice_0D(self.ltype, self.volume, **self.kwargs)
+            return generate_lattice_0D(self.ltype, self.volume, **kwargs)
 
     def generate_matrix(self):
         """
@@ -401,15 +406,20 @@ class Lattice:
 
 
     def generate_point(self):
-        point = np.random.RandomState().rand(3)
+        if self.random_state is None:
+            point = np.random.RandomState().rand(3)
+        else:
+            point = self.random_state.random(3)
         if self.ltype in ["spherical", "ellipsoidal"]:
+            rng = np.random if self.random_state is None else self.random_state
             # Choose a point within an octant of the unit sphere
             while point.dot(point) > 1:  # squared
-                point = np.random.random(3)
+                point = rng.random(3)
             # Randomly flip some coordinates
+            rng = random if self.random_state is None else self.random_state
             for index, x in enumerate(point):
                 # Scale the point by the max radius
-                if random.uniform(0, 1) < 0.5:
+                if rng.uniform(0, 1) < 0.5:
                     point[index] *= -1
         else:
             for i, a in enumerate(self.PBC):
@@ -611,18 +621,21 @@ def generate_lattice(
                 must be larger than this.
             'max_l': the third smallest allowed cell vector. The largest cell vector must
                 be larger than this.
+            'random_state': a numpy.random.Generator. If not given, the global
+                random state is used
 
     Returns:
         a 3x3 matrix representing the lattice vectors of the unit cell. If
         generation fails, outputs a warning message and returns empty
     """
+    random_state = kwargs.get("random_state")
     maxangle = np.pi - minangle
     for n in range(maxattempts):
         # Triclinic
         # if sg <= 2:
         if ltype == "triclinic":
             # Derive lattice constants from a random matrix
-            mat = random_shear_matrix(width=0.2)
+            mat = random_shear_matrix(width=0.2, random_state=random_state)
             a, b, c, alpha, beta, gamma = matrix2para(mat)
             x = np.sqrt(
                 1
@@ -631,7 +644,7 @@ def generate_lattice(
                 - np.cos(gamma) ** 2
                 + 2 * (np.cos(alpha) * np.cos(beta) * np.cos(gamma))
             )
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             abc = volume / x
             xyz = vec[0] * vec[1] * vec[2]
             a = vec[0] * np.cbrt(abc) / np.cbrt(xyz)
@@ -640,9 +653,9 @@ def generate_lattice(
         # Monoclinic
         elif ltype in ["monoclinic", "Monoclinic"]:
             alpha, gamma = np.pi / 2, np.pi / 2
-            beta = gaussian(minangle, maxangle)
+            beta = gaussian(minangle, maxangle, random_state=random_state)
             x = np.sin(beta)
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             xyz = vec[0] * vec[1] * vec[2]
             abc = volume / x
             a = vec[0] * np.cbrt(abc) / np.cbrt(xyz)
@@ -653,7 +666,7 @@ def generate_lattice(
         elif ltype in ["orthorhombic", "Orthorhombic"]:
             alpha, beta, gamma = np.pi / 2, np.pi / 2, np.pi / 2
             x = 1
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             xyz = vec[0] * vec[1] * vec[2]
             abc = volume / x
             a = vec[0] * np.cbrt(abc) / np.cbrt(xyz)
@@ -664,7 +677,7 @@ def generate_lattice(
         elif ltype in ["tetragonal", "Tetragonal"]:
             alpha, beta, gamma = np.pi / 2, np.pi / 2, np.pi / 2
             x = 1
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             c = vec[2] / (vec[0] * vec[1]) * np.cbrt(volume / x)
             a = b = np.sqrt((volume / x) / c)
         # Trigonal/Rhombohedral/Hexagonal
@@ -672,7 +685,7 @@ def generate_lattice(
         elif ltype in ["hexagonal", "trigonal", "rhombohedral"]:
             alpha, beta, gamma = np.pi / 2, np.pi / 2, np.pi / 3 * 2
             x = np.sqrt(3.0) / 2.0
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             c = vec[2] / (vec[0] * vec[1]) * np.cbrt(volume / x)
             a = b = np.sqrt((volume / x) / c)
         # Cubic
@@ -783,11 +796,14 @@ def generate_lattice_2D(
                 must be larger than this.
             'max_l': the third smallest allowed cell vector. The largest cell vector must
                 be larger than this.
+            'random_state': a numpy.random.Generator. If not given, the global
+                random state is used
 
     Returns:
         a 3x3 matrix representing the lattice vectors of the unit cell. If
         generation fails, outputs a warning message and returns empty
     """
+    random_state = kwargs.get("random_state")
     if "unique_axis" not in kwargs:
         unique_axis = "c"
     else:
@@ -801,7 +817,7 @@ def generate_lattice_2D(
     for n in range(maxattempts):
         abc = np.ones([3])
         if thickness is None:
-            v = random_vector()
+            v = random_vector(random_state=random_state)
             thickness1 = np.cbrt(volume) * (v[0] / (v[0] * v[1] * v[2]))
         else:
             thickness1 = thickness
@@ -810,7 +826,7 @@ def generate_lattice_2D(
         # Triclinic
         # if num <= 2:
         if ltype == "triclinic":
-            mat = random_shear_matrix(width=0.2)
+            mat = random_shear_matrix(width=0.2, random_state=random_state)
             a, b, c, alpha, beta, gamma = matrix2para(mat)
             x = np.sqrt(
                 1
@@ -835,15 +851,15 @@ def generate_lattice_2D(
         # Monoclinic
         # elif num <= 18:
         elif ltype == "monoclinic":
-            a, b, c = random_vector()
+            a, b, c = random_vector(random_state=random_state)
             if unique_axis == "a":
-                alpha = gaussian(minangle, maxangle)
+                alpha = gaussian(minangle, maxangle, random_state=random_state)
                 x = np.sin(alpha)
             elif unique_axis == "b":
-                beta = gaussian(minangle, maxangle)
+                beta = gaussian(minangle, maxangle, random_state=random_state)
                 x = np.sin(beta)
             elif unique_axis == "c":
-                gamma = gaussian(minangle, maxangle)
+                gamma = gaussian(minangle, maxangle, random_state=random_state)
                 x = np.sin(gamma)
             ab = volume / (abc[NPA - 1] * x)
             ratio = a / b
@@ -860,7 +876,7 @@ def generate_lattice_2D(
         # Orthorhombic
         # elif num <= 48:
         elif ltype == "orthorhombic":
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             if NPA == 3:
                 ratio = abs(vec[0] / vec[1])  # ratio a/b
                 abc[1] = np.sqrt(volume / (thickness1 * ratio))
@@ -1004,11 +1020,14 @@ def generate_lattice_1D(
                 must be larger than this.
             'max_l': the third smallest allowed cell vector. The largest cell vector must
                 be larger than this.
+            'random_state': a numpy.random.Generator. If not given, the global
+                random state is used
 
     Returns:
         a 3x3 matrix representing the lattice vectors of the unit cell. If
         generation fails, outputs a warning message and returns empty
     """
+    random_state = kwargs.get("random_state")
     try:
         unique_axis = kwargs["unique_axis"]
     except:
@@ -1022,7 +1041,7 @@ def generate_lattice_1D(
     for n in range(maxattempts):
         abc = np.ones([3])
         if area is None:
-            v = random_vector()
+            v = random_vector(random_state=random_state)
             thickness1 = np.cbrt(volume) * (v[0] / (v[0] * v[1] * v[2]))
         else:
             thickness1 = volume / area
@@ -1031,7 +1050,7 @@ def generate_lattice_1D(
         # Triclinic
         # if num <= 2:
         if ltype == "triclinic":
-            mat = random_shear_matrix(width=0.2)
+            mat = random_shear_matrix(width=0.2, random_state=random_state)
             a, b, c, alpha, beta, gamma = matrix2para(mat)
             x = np.sqrt(
                 1
@@ -1056,15 +1075,15 @@ def generate_lattice_1D(
         # Monoclinic
         # elif num <= 12:
         elif ltype == "monoclinic":
-            a, b, c = random_vector()
+            a, b, c = random_vector(random_state=random_state)
             if unique_axis == "a":
-                alhpa = gaussian(minangle, maxangle)
+                alhpa = gaussian(minangle, maxangle, random_state=random_state)
                 x = np.sin(alpha)
             elif unique_axis == "b":
-                beta = gaussian(minangle, maxangle)
+                beta = gaussian(minangle, maxangle, random_state=random_state)
                 x = np.sin(beta)
             elif unique_axis == "c":
-                gamma = gaussian(minangle, maxangle)
+                gamma = gaussian(minangle, maxangle, random_state=random_state)
                 x = np.sin(gamma)
             ab = volume / (abc[PA - 1] * x)
             ratio = a / b
@@ -1081,7 +1100,7 @@ def generate_lattice_1D(
         # Orthorhombic
         # lif num <= 22:
         elif ltype == "orthorhombic":
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             if PA == 3:
                 ratio = abs(vec[0] / vec[1])  # ratio a/b
                 abc[1] = np.sqrt(volume / (thickness1 * ratio))
@@ -1218,11 +1237,14 @@ def generate_lattice_0D(
                 must be larger than this.
             'max_l': the third smallest allowed cell vector. The largest cell vector must
                 be larger than this.
+            'random_state': a numpy.random.Generator. If not given, the global
+                random state is used
 
     Returns:
         a 3x3 matrix representing the lattice vectors of the unit cell. If
         generation fails, outputs a warning message and returns empty
     """
+    random_state = kwargs.get("random_state")
     if ltype == "spherical":
         # Use a cubic lattice with altered volume
         a = b = c = np.cbrt((3 * volume) / (4 * np.pi))
@@ -1239,7 +1261,7 @@ def generate_lattice_0D(
         alpha, beta, gamma = np.pi / 2, np.pi / 2, np.pi / 2
         x = (4.0 / 3.0) * np.pi
         for numattempts in range(maxattempts):
-            vec = random_vector()
+            vec = random_vector(random_state=random_state)
             c = vec[2] / (vec[0] * vec[1]) * np.cbrt(volume / x)
             a = b = np.sqrt((volume / x) / c)
             if (a / c < 10.0) and (c / a < 10.0):
@@ -1468,7 +1490,7 @@ def cellsize(group, dim=3):
             return 1  # P
 
 
-def gaussian(min, max, sigma=3.0):
+def gaussian(min, max, sigma=3.0, random_state=None):
     """
     Choose a random number from a Gaussian probability distribution centered
     between min and max. sigma is the number of standard deviations that min
@@ -1481,20 +1503,29 @@ def gaussian(min, max, sigma=3.0):
         min: the minimum acceptable value
         max: the maximum acceptable value
         sigma: the number of standard deviations between the center and min or max
+        random_state: a numpy.random.Generator. If None, the global random
+            state is used
 
     Returns:
         a value chosen randomly between min and max
     """
+    rng = np.random if random_state is None else random_state
     center = (max + min) * 0.5
     delta = np.fabs(max - min) * 0.5
     ratio = delta / sigma
     while True:
-        x = np.random.normal(scale=ratio, loc=center)
+        x = rng.normal(scale=ratio, loc=center)
         if x > min and x < max:
             return x
 
 
-def random_vector(minvec=[0.0, 0.0, 0.0], maxvec=[1.0, 1.0, 1.0], width=0.35, unit=False):
+def random_vector(
+    minvec=[0.0, 0.0, 0.0],
+    maxvec=[1.0, 1.0, 1.0],
+    width=0.35,
+    unit=False,
+    random_state=None,
+):
     """
     Generate a random vector for lattice constant generation. The ratios between
     x, y, and z of the returned vector correspond to the ratios between a, b,
@@ -1506,15 +1537,18 @@ def random_vector(minvec=[0.0, 0.0, 0.0], maxvec=[1.0, 1.0, 1.0], width=0.35, un
         width: the width of the normal distribution to use when choosing values.
             Passed to np.random.normal
         unit: whether or not to normalize the vector to determinant 1
+        random_state: a numpy.random.Generator. If None, the global random
+            state is used
 
     Returns:
         a 1x3 numpy array of floats
     """
+    rng = np.random if random_state is None else random_state
     vec = np.array(
         [
-            np.exp(np.random.normal(scale=width)),
-            np.exp(np.random.normal(scale=width)),
-            np.exp(np.random.normal(scale=width)),
+            np.exp(rng.normal(scale=width)),
+            np.exp(rng.normal(scale=width)),
+            np.exp(rng.normal(scale=width)),
         ]
     )
     if unit:
@@ -1524,7 +1558,7 @@ def random_vector(minvec=[0.0, 0.0, 0.0], maxvec=[1.0, 1.0, 1.0], width=0.35, un
 
 
 
-def random_shear_matrix(width=1.0, unitary=False):
+def random_shear_matrix(width=1.0, unitary=False, random_state=None):
     """
     Generate a random symmetric shear matrix with Gaussian elements. If unitary
     is True, normalize to determinant 1
@@ -1533,17 +1567,20 @@ def random_shear_matrix(width=1.0, unitary=False):
         width: the width of the normal distribution to use when choosing values.
             Passed to np.random.normal
         unitary: whether or not to normalize the matrix to determinant 1
+        random_state: a numpy.random.Generator. If None, the global random
+            state is used
     
     Returns:
         a 3x3 numpy array of floats
     """
+    rng = np.random if random_state is None else random_state
     mat = np.zeros([3, 3])
     determinant = 0
     while determinant == 0:
         a, b, c = (
-            np.random.normal(scale=width),
-            np.random.normal(scale=width),
-            np.random.normal(scale=width),
+            rng.normal(scale=width),
+            rng.normal(scale=width),
+            rng.normal(scale=width),
         )
         mat = np.array([[1, a, b], [a, 1, c], [b, c, 1]])
         determinant = np.linalg.det(mat)
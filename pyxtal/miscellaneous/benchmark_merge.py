@@ -0,0 +1,34 @@
+"""
+Benchmark of WP_merge over all 230 space groups: random points in the general
+position are merged into special positions with a random cell and tolerance.
+
+    $ python pyxtal/miscellaneous/benchmark_merge.py [number of points per group]
+"""
+import sys
+import time
+import numpy as np
+from pyxtal.symmetry import get_group
+from pyxtal.lattice import Lattice
+from pyxtal.wyckoff_site import WP_merge
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+rng = np.random.default_rng(0)
+times = []
+merged = 0
+for sg in range(1, 231):
+    group = get_group(sg)
+    lattice = Lattice(group.lattice_type, 200.0, random_state=rng)
+    matrix = lattice.get_matrix()
+    t0 = time.time()
+    for i in range(n):
+        pt, wp, _ = WP_merge(rng.random(3), matrix, group[0], 2.0)
+        if wp is not False and wp.index > 0:
+            merged += 1
+    times.append(time.time() - t0)
+
+times = np.array(times)
+print("{:d} merges ({:d} into special positions) in {:.2f} s".format(
+    230 * n, merged, times.sum()))
+print("mean time per merge: {:.3f} ms".format(1000 * times.sum() / (230 * n)))
+for sg in np.argsort(times)[::-1][:5]:
+    print("space group {:3d}: {:.3f} ms".format(sg + 1, 1000 * times[sg] / n))
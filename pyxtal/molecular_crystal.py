@@ -1,8 +1,7 @@
 # Standard Libraries
 import os
-import random
 import numpy as np
-from copy import deepcopy
+from copy import copy, deepcopy
 
 # External Libraries
 
@@ -11,11 +10,19 @@ from pyxtal.constants import max1, max2, max3, max4
 from pyxtal.msg import printx
 from pyxtal.tolerance import Tol_matrix
 from pyxtal.lattice import Lattice, cellsize
+from pyxtal.operations import get_random_state, random_choice
 from pyxtal.io import write_cif, structure_from_ext
 from pyxtal.database.element import Element
 from pyxtal.wyckoff_site import mol_site, check_mol_sites, WP_merge
-from pyxtal.molecule import pyxtal_molecule, orientation_in_wyckoff_position
-from pyxtal.symmetry import Group, jk_from_i, choose_wyckoff_molecular, Wyckoff_position
+from pyxtal.molecule import pyxtal_molecule, get_pyxtal_molecule, get_orientations_in_group
+from pyxtal.symmetry import (
+    Group,
+    get_group,
+    jk_from_i,
+    choose_wyckoff_molecular,
+    Wyckoff_position,
+    get_stoichiometry_solver,
+)
 
 
 
@@ -50,6 +57,8 @@ class molecular_crystal:
             object to define the unit cell
         tm (optional): the `pyxtal.tolerance.Tol_matrix <pyxtal.tolerance.tolerance.html>`_ 
             object to define the distances
+        random_state (optional): a seed or `numpy.random.Generator` for the
+            random generation. If None, the global random state is used
         seed (optional): the cif file from user
         diag (optional): if use the nonstandart setting (P21/n, Pn, C2/n)?
     """
@@ -68,6 +77,7 @@ class molecular_crystal:
         seed = None,
         diag = False,
         relax_h = False,
+        random_state=None,
     ):
 
         self.dim = 3 # The number of periodic dimensions (1,2,3)
@@ -75,7 +85,7 @@ class molecular_crystal:
         self.diag = diag
 
         if type(group) != Group:
-            group = Group(group, self.dim)
+            group = get_group(group, self.dim)
 
         self.sg = group.number
         self.selec_high = select_high
@@ -92,6 +102,7 @@ class molecular_crystal:
             group,
             lattice,
             tm,
+            random_state,
         )
 
     def init_common(
@@ -105,15 +116,17 @@ class molecular_crystal:
         group,
         lattice,
         tm,
+        random_state=None,
     ):
         # init functionality which is shared by 3D, 2D, and 1D crystals
         self.numattempts = 0 # number of attempts to generate the crystal.
+        self.random_state = get_random_state(random_state)
         if type(group) == Group:
             self.group = group
             """A pyxtal.symmetry.Group object storing information about the space/layer
             /Rod/point group, and its Wyckoff positions."""
         else:
-            self.group = Group(group, dim=self.dim)
+            self.group = get_group(group, dim=self.dim)
         self.number = self.group.number
         """
         The international group number of the crystal:
@@ -150,7 +163,7 @@ class molecular_crystal:
 
         self.molecules = []  # A pyxtal_molecule objects,
         for mol in molecules:
-            self.molecules.append(pyxtal_molecule(mol, self.tol_matrix))
+            self.molecules.append(get_pyxtal_molecule(mol, self.tol_matrix))
 
         # if seeds, directly parse the structure from cif
         # At the moment, we only support one specie
@@ -158,9 +171,9 @@ class molecular_crystal:
             seed = structure_from_ext(self.seed, self.molecules[0].mol, relax_h=self.relax_h)
             if seed.match():
                 self.mol_sites = [seed.make_mol_site()]
-                self.group = Group(seed.wyc.number)
+                self.group = get_group(seed.wyc.number)
                 self.lattice = seed.lattice
-                self.molecules = [pyxtal_molecule(seed.molecule)]
+                self.molecules = [get_pyxtal_molecule(seed.molecule)]
                 self.diag = seed.diag
                 self.valid = True # Need to add a check function
             else:
@@ -185,6 +198,8 @@ class molecular_crystal:
                 if lattice.PBC != self.PBC:
                     self.lattice.PBC = self.PBC
                     printx("\n  Warning: converting custom lattice PBC to " + str(self.PBC))
+                if self.random_state is not None:
+                    self.lattice.random_state = self.random_state
             else:
                 # Determine the unique axis
                 if self.dim == 2:
@@ -223,6 +238,7 @@ class molecular_crystal:
                         min_l=max(minls),
                         mid_l=max(midls),
                         max_l=max(maxls),
+                        random_state=self.random_state,
                     )
                 elif self.dim == 2:
                     self.lattice = Lattice(
@@ -233,6 +249,7 @@ class molecular_crystal:
                         min_l=max(minls),
                         mid_l=max(midls),
                         max_l=max(maxls),
+                        random_state=self.random_state,
                         thickness=self.thickness,
                     )
                 elif self.dim == 1:
@@ -244,6 +261,7 @@ class molecular_crystal:
                         min_l=max(minls),
                         mid_l=max(midls),
                         max_l=max(maxls),
+                        random_state=self.random_state,
                         area=self.area,
                     )
 
@@ -308,133 +326,39 @@ class molecular_crystal:
         For example, self.valid_orientations[i][j][k] would be a list of valid
         orientations for self.molecules[i], in the Wyckoff position
         self.group.wyckoffs_organized[j][k]
+
+        The orientations are cached in memory and on disk for each molecule and
+        group (see molecule.get_orientations_in_group)
         """
         self.valid_orientations = []
         for pyxtal_mol in self.molecules:
-            self.valid_orientations.append([])
-            wp_index = -1
-            for i, x in enumerate(self.group.wyckoffs_organized):
-                self.valid_orientations[-1].append([])
-                for j, wp in enumerate(x):
-                    wp_index += 1
-                    allowed = orientation_in_wyckoff_position(
-                        pyxtal_mol.mol,
-                        wp,
-                        already_oriented=True,
-                        allow_inversion=self.allow_inversion,
-                    )
-
-                    if allowed is not False:
-                        self.valid_orientations[-1][-1].append(allowed)
-                    else:
-                        self.valid_orientations[-1][-1].append([])
+            self.valid_orientations.append(
+                get_orientations_in_group(
+                    pyxtal_mol.mol, self.group, self.allow_inversion
+                )
+            )
 
     def check_compatible(self, group, numMols, valid_orientations):
         """
         Checks if the number of molecules is compatible with the Wyckoff
         positions. Considers the number of degrees of freedom for each Wyckoff
         position, and makes sure at least one valid combination of WP's exists.
+        Only the Wyckoff positions admitting a valid orientation of each
+        molecule are considered. The result is memoized (see
+        symmetry.Stoichiometry_solver).
+
+        Returns:
+            True if a valid combination with degrees of freedom exists, 0 if
+            only combinations without freedom exist, and False otherwise
         """
-        # Store whether or not at least one degree of freedom exists
-        has_freedom = False
-        # Store the wp's already used that don't have any freedom
-        used_indices = []
-        # Loop over species
-        for i_mol, numIon in enumerate(numMols):
-            # Get lists of multiplicity, maxn and freedom
-            l_mult0 = []
-            l_maxn0 = []
-            l_free0 = []
-            indices0 = []
-            for i_wp, wp in enumerate(group):
-                # Check that at least one valid orientation exists
+        masks = []
+        for orientations in valid_orientations:
+            mask = []
+            for i_wp in range(len(group)):
                 j, k = jk_from_i(i_wp, group.wyckoffs_organized)
-                if len(valid_orientations[i_mol][j][k]) > 0:
-                    indices0.append(i_wp)
-                    l_mult0.append(len(wp))
-                    l_maxn0.append(numIon // len(wp))
-                    if np.allclose(wp[0].rotation_matrix, np.zeros([3, 3])):
-                        l_free0.append(False)
-                    else:
-                        l_free0.append(True)
-            # Remove redundant multiplicities:
-            l_mult = []
-            l_maxn = []
-            l_free = []
-            indices = []
-            for mult, maxn, free, i_wp in zip(l_mult0, l_maxn0, l_free0, indices0):
-                if free is True:
-                    if mult not in l_mult:
-                        l_mult.append(mult)
-                        l_maxn.append(maxn)
-                        l_free.append(True)
-                        indices.append(i_wp)
-                elif free is False and i_wp not in used_indices:
-                    l_mult.append(mult)
-                    l_maxn.append(1)
-                    l_free.append(False)
-                    indices.append(i_wp)
-            # Loop over possible combinations
-            # Create pointer variable to move through lists
-            p = 0
-            # Store the number of each WP, used across possible WP combinations
-            n0 = [0] * len(l_mult)
-            n = deepcopy(n0)
-            for i, mult in enumerate(l_mult):
-                if l_maxn[i] != 0:
-                    p = i
-                    n[i] = l_maxn[i]
-                    break
-            p2 = p
-
-            if n == n0:
-                print("n == n0", n, n0)
-                return False
-            while True:
-                num = np.dot(n, l_mult)
-                dobackwards = False
-                # The combination works: move to next species
-                if num == numIon:
-                    # Check if at least one degree of freedom exists
-                    for val, free, i_wp in zip(n, l_free, indices):
-                        if val > 0:
-                            if free is True:
-                                has_freedom = True
-                            elif free is False:
-                                indices.append(i_wp)
-                    break
-                # All combinations failed: return False
-                if n == n0 and p >= len(l_mult) - 1:
-                    print("All combinations failed: return False")
-                    return False
-                # Too few atoms
-                if num < numIon:
-                    # Forwards routine
-                    # Move p to the right and max out
-                    if p < len(l_mult) - 1:
-                        p += 1
-                        n[p] = min((numIon - num) // l_mult[p], l_maxn[p])
-                    else:
-                        # p is already at last position: trigger backwards routine
-                        dobackwards = True
-                # Too many atoms
-                if num > numIon or dobackwards is True:
-                    # Backwards routine
-                    # Set n[p] to 0, move p backwards to non-zero, and decrease by 1
-                    n[p] = 0
-                    while p > 0 and p > p2:
-                        p -= 1
-                        if n[p] != 0:
-                            n[p] -= 1
-                            if n[p] == 0 and p == p2:
-                                p2 = p + 1
-                            break
-        # All species passed: return True
-        if has_freedom is True:
-            return True
-        # All species passed, but no degrees of freedom: return 0
-        elif has_freedom is False:
-            return 0
+                mask.append(len(orientations[j][k]) > 0)
+            masks.append(mask)
+        return get_stoichiometry_solver(group, numMols, masks).verdict
 
     def to_file(self, filename=None, fmt="cif", permission='w', **kwargs):
         """
@@ -461,6 +385,41 @@ class molecular_crystal:
         else:
             printx("Cannot create file: structure did not generate.", priority=1)
 
+    def generate_many(self, n, max_failures=None):
+        """
+        Generates n new random molecular crystals with the same settings. The
+        group, molecules, valid orientations, tolerance matrix and lattice
+        settings are set up only once; each yielded structure has its own
+        lattice and molecular sites.
+
+        Args:
+            n: the number of valid structures to generate
+            max_failures: the number of failed generations allowed before
+                stopping early. Defaults to n
+
+        Yields:
+            molecular_crystal objects. The numattempts attribute counts the
+            attempts spent on each structure, including those of the failed
+            generations since the previous structure
+        """
+        if max_failures is None:
+            max_failures = n
+        failures = 0
+        count = 0
+        self.numattempts = 0
+        while count < n and failures <= max_failures:
+            self.generate_crystal()
+            if self.valid:
+                struc = copy(self)
+                struc.lattice = self.lattice.copy()
+                # keep sharing the stream rather than a copy of its state
+                struc.lattice.random_state = self.lattice.random_state
+                self.numattempts = 0
+                count += 1
+                yield struc
+            else:
+                failures += 1
+
     def copy(self):
         """
         simply copy the structure
@@ -481,11 +440,13 @@ class molecular_crystal:
                     site.lattice = lattice
                     # for P21/c, Pc, C2/c, check if opt the inclination angle
                     if self.group.number in [7, 14, 15]:
+                        site.wp = site.wp.copy()
                         for j, op in enumerate(site.wp.ops):
                             vec = op.translation_vector.dot(trans)
                             vec -= np.floor(vec)
                             op1 = op.from_rotation_and_translation(op.rotation_matrix, vec)
                             site.wp.ops[j] = op1
+                        site.wp.set_affine_matrices()
                 #to do needs to update diag if necessary
                 _, perm = Wyckoff_position.from_symops(site.wp.ops, self.group.number)            
                 if not isinstance(perm, list):                                                    
@@ -644,6 +605,7 @@ class molecular_crystal:
                                 numMol - numMol_added,
                                 valid_ori,
                                 self.select_high,
+                                self.random_state,
                             )
                             if wp is not False:
                                 # Generate a list of coords from the wyckoff position
@@ -651,13 +613,13 @@ class molecular_crystal:
                                 pt = self.lattice.generate_point()
 
                                 # merge coordinates if the atoms are close
-                                mtol = mol.radius * 0.5
+                                mtol = pyxtal_mol.radius * 0.5
                                 pt, wp, oris = WP_merge(pt, self.lattice.matrix, wp, mtol, valid_ori)
 
                                 if wp is not False:
                                     # Use a Wyckoff_site object for the current site
-                                    ori = random.choice(oris).copy()
-                                    ori.change_orientation()
+                                    ori = random_choice(oris, self.random_state).copy()
+                                    ori.change_orientation(random_state=self.random_state)
                                     ms0 = mol_site(pyxtal_mol, pt, ori, wp, self.lattice, self.diag)
                                     # Check distances within the WP
                                     if not ms0.check_distances():
@@ -665,37 +627,14 @@ class molecular_crystal:
                                         # positions if needed
                                         passed_ori = False
                                         if len(pyxtal_mol.mol) > 1 and ori.degrees > 0:
-                                            # bisection method
-                                            def fun_dist(angle, ori, mo, pt):
-                                                ori0 = ori.copy()
-                                                ori.change_orientation(angle)
-                                                ms0 = mol_site(
-                                                    mo,
-                                                    pt,
-                                                    ori,
-                                                    wp,
-                                                    self.lattice,
-                                                    self.diag,
-                                                )
-                                                d = ms0.compute_distances()
-                                                return d
-
-                                            angle_lo = ori.angle
-                                            angle_hi = angle_lo + np.pi
-                                            fun_lo = fun_dist(angle_lo, ori, pyxtal_mol, pt)
-                                            fun_hi = fun_dist(angle_hi, ori, pyxtal_mol, pt)
-                                            fun = fun_hi
-                                            for it in range(max4):
-                                                if (fun > 0.8) & (ms0.check_distances()):
-                                                    passed_ori = True
-                                                    break
-                                                angle = (angle_lo + angle_hi) / 2
-                                                fun = fun_dist(angle, ori, pyxtal_mol, pt)
-                                                #print('Bisection: ', it, fun)
-                                                if fun_lo > fun_hi:
-                                                    angle_hi, fun_hi = angle, fun
-                                                else:
-                                                    angle_lo, fun_lo = angle, fun
+                                            # batched search over the orientations,
+                                            # refined up to max4 times
+                                            ms0.optimize_orientation(
+                                                n_refine=max4 - 1,
+                                                target=1.0,
+                                                random_state=self.random_state,
+                                            )
+                                            passed_ori = ms0.check_distances()
                                     else:
                                         passed_ori = True
                                     if not passed_ori:
@@ -777,6 +716,8 @@ class molecular_crystal_2D(molecular_crystal):
             object to define the unit cell
         tm (optional): the `pyxtal.tolerance.Tol_matrix <pyxtal.tolerance.tolerance.html>`_ 
             object to define the distances
+        random_state (optional): a seed or `numpy.random.Generator` for the
+            random generation. If None, the global random state is used
     """
 
     def __init__(
@@ -792,13 +733,14 @@ class molecular_crystal_2D(molecular_crystal):
         lattice=None,
         tm=Tol_matrix(prototype="molecular"),
         seed = None,
+        random_state=None,
     ):
 
         self.dim = 2
         self.numattempts = 0
         self.seed = None
         if type(group) != Group:
-            group = Group(group, self.dim)
+            group = get_group(group, self.dim)
         number = group.number  # The layer group number of the crystal."""
         self.diag = False
         self.thickness = thickness  # the thickness in Angstroms
@@ -813,6 +755,7 @@ class molecular_crystal_2D(molecular_crystal):
             group,
             lattice,
             tm,
+            random_state,
         )
 
 
@@ -850,6 +793,8 @@ class molecular_crystal_1D(molecular_crystal):
             object to define the unit cell
         tm (optional): the `pyxtal.tolerance.Tol_matrix <pyxtal.tolerance.tolerance.html>`_ 
             object to define the distances
+        random_state (optional): a seed or `numpy.random.Generator` for the
+            random generation. If None, the global random state is used
     """
 
     def __init__(
@@ -864,6 +809,7 @@ class molecular_crystal_1D(molecular_crystal):
         area=None,
         lattice=None,
         tm=Tol_matrix(prototype="molecular"),
+        random_state=None,
     ):
         self.dim = 1
         self.area = area  # the effective cross-sectional area in A^2
@@ -880,5 +826,6 @@ class molecular_crystal_1D(molecular_crystal):
             orientations,
             group,
             lattice,
-            tm
+            tm,
+            random_state,
         )
@@ -9,8 +9,12 @@ constraints.
 
 """
 # Imports
+import os
+import json
 import numpy as np
+from collections import OrderedDict
 from copy import deepcopy
+from hashlib import sha1
 from scipy.spatial.transform import Rotation
 import networkx as nx
 
@@ -22,14 +26,28 @@ from pymatgen.core.bonds import CovalentBond
 
 # PyXtal imports
 from pyxtal.msg import printx
+from pyxtal.version import __version__
 from pyxtal.tolerance import Tol_matrix
-from pyxtal.database.element import Element
+from pyxtal.database.element import Element, vdw_radii
 from pyxtal.operations import SymmOp, OperationAnalyzer, rotate_vector, angle
 from pyxtal.database.collection import Collection
 
 # Define functions
 # ------------------------------
 molecule_collection = Collection("molecules")
+# Valid orientations of molecules in groups, see get_orientations_in_group
+orientation_cache = {}
+# Version of the orientation solver and of its on-disk cache format, part of
+# get_orientation_key. Increase it whenever the results may change
+orientation_cache_version = 3
+# Orientations of point groups in site symmetries, see get_canonical_orientations
+canonical_orientation_cache = {}
+# Shared pyxtal_molecule objects, see get_pyxtal_molecule. The least
+# recently used ones are dropped beyond molecule_registry_size
+molecule_registry = OrderedDict()
+molecule_registry_size = 256
+# The default tolerance matrix of molecules
+molecular_tm = Tol_matrix(prototype="molecular")
 
 
 class pyxtal_molecule:
@@ -45,34 +63,13 @@ class pyxtal_molecule:
     Args:
         mol: a string to reprent the molecule
         tm: tolerance matrix
-   
-    """
-
-    def __init__(self, mol, tm=Tol_matrix(prototype="molecular")):
-        mo = None
-        if type(mol) == str:
-            # Parse molecules: either file or molecule name
-            tmp = mol.split(".")
-            if len(tmp) > 1:
-                # Load the molecule from the given file
-                if tmp[-1] in ["xyz", "gjf", "g03", "json"]:
-                    import os
-                    if os.path.exists(mol):
-                        mo = Molecule.from_file(mol)
-                    else:
-                        raise NameError("{:s} is not a valid path".format(mol))
-                else:
-                    raise NameError("{:s} is not a supported format".format(tmp[-1]))
-            else:
-                # print('\nLoad the molecule {:s} from collections'.format(mol))
-                mo = molecule_collection[mol]
-        elif hasattr(mol, "sites"):  # pymatgen molecule
-            mo = mol
 
-        if mo is None:
-            msg = "Could not create molecules from given input: {:s}".format(mol)
-            raise NameError(msg)
+    To avoid analyzing the same molecule many times, use get_pyxtal_molecule,
+    which returns shared (frozen) objects.
+    """
 
+    def __init__(self, mol, tm=molecular_tm):
+        mo = parse_molecule(mol)
         self.props = mo.site_properties
 
         if len(mo) > 1:
@@ -88,6 +85,27 @@ class pyxtal_molecule:
         self.get_symbols()
         self.get_tols_matrix()
 
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            msg = "pyxtal_molecule is shared and cannot be modified, "
+            msg += "use deepcopy to get a private copy"
+            raise AttributeError(msg)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        # copies are private, thus not frozen
+        state = self.__dict__.copy()
+        state.pop("_frozen", None)
+        return state
+
+    def freeze(self):
+        """
+        Makes the object read-only, as it is shared by get_pyxtal_molecule.
+        Note that self.mol itself is not protected
+        """
+        self.tols_matrix.flags.writeable = False
+        self._frozen = True
+
     def swap_axis(self, ax):
         """
         swap the molecular axis
@@ -96,7 +114,7 @@ class pyxtal_molecule:
         mo = Molecule(self.symbols, coords)
         mo = self.add_site_props(mo)
 
-        return pyxtal_molecule(mo, self.tm)
+        return get_pyxtal_molecule(mo, self.tm)
 
 
     def add_site_props(self, mo):
@@ -119,33 +137,18 @@ class pyxtal_molecule:
             a Box object
         """
         mol, _ = reoriented_molecule(self.mol)
-        minx, miny, minz, maxx, maxy, maxz = 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        for p in mol:
-            x, y, z = p.coords
-            r = Element(p.species_string).vdw_radius
-            if x - r < minx:
-                minx = x - r
-            if y - r < miny:
-                miny = y - r
-            if z - r < minz:
-                minz = z - r
-            if x + r > maxx:
-                maxx = x + r
-            if y + r > maxy:
-                maxy = y + r
-            if z + r > maxz:
-                maxz = z + r
+        coords = mol.cart_coords
+        r = vdw_radii[np.array(mol.atomic_numbers)][:, None]
+        # the box always contains the origin
+        minx, miny, minz = np.minimum((coords - r).min(axis=0), 0.0)
+        maxx, maxy, maxz = np.maximum((coords + r).max(axis=0), 0.0)
         self.box = Box(minx, maxx, miny, maxy, minz, maxz)
 
     def get_radius(self):
-        r_max = 0
-        for coord, number in zip(self.mol.cart_coords, self.mol.atomic_numbers):
-            radius = (
-                np.sqrt(np.sum(coord * coord)) + self.tm.get_tol(number, number) * 0.5
-            )
-            if radius > r_max:
-                r_max = radius
-        self.radius = r_max
+        numbers = self.mol.atomic_numbers
+        tols = self.tm.get_tols(numbers, numbers).diagonal()
+        radii = np.linalg.norm(self.mol.cart_coords, axis=1) + tols * 0.5
+        self.radius = max(radii.max(), 0.0)
 
     def get_symbols(self):
         self.symbols = [specie.name for specie in self.mol.species]
@@ -155,10 +158,7 @@ class pyxtal_molecule:
         Returns: a 2D matrix which is used internally for distance checking.
         """
         numbers = self.mol.atomic_numbers
-        tols = np.zeros((len(numbers), len(numbers)))
-        for i1, number1 in enumerate(numbers):
-            for i2, number2 in enumerate(numbers):
-                tols[i1][i2] = self.tm.get_tol(number1, number2)
+        tols = self.tm.get_tols(numbers, numbers)
         if len(self.mol)==1:
             tols *= 0.8 # if only one atom, reduce the tolerance
         self.tols_matrix = tols
@@ -168,6 +168,95 @@ class pyxtal_molecule:
         return display_molecules([self.mol])
 
 
+def parse_molecule(mol):
+    """
+    Parses the input of pyxtal_molecule
+
+    Args:
+        mol: the name of a molecule in the collection, a file name (xyz, gjf,
+            g03 or json) or a pymatgen Molecule object
+
+    Returns:
+        a pymatgen Molecule object
+    """
+    mo = None
+    if type(mol) == str:
+        # Parse molecules: either file or molecule name
+        tmp = mol.split(".")
+        if len(tmp) > 1:
+            # Load the molecule from the given file
+            if tmp[-1] in ["xyz", "gjf", "g03", "json"]:
+                if os.path.exists(mol):
+                    mo = Molecule.from_file(mol)
+                else:
+                    raise NameError("{:s} is not a valid path".format(mol))
+            else:
+                raise NameError("{:s} is not a supported format".format(tmp[-1]))
+        else:
+            # print('\nLoad the molecule {:s} from collections'.format(mol))
+            mo = molecule_collection[mol]
+    elif hasattr(mol, "sites"):  # pymatgen molecule
+        mo = mol
+
+    if mo is None:
+        msg = "Could not create molecules from given input: {:s}".format(mol)
+        raise NameError(msg)
+    return mo
+
+
+def get_molecule_key(mol):
+    """
+    Returns the key of a molecule: the sha1 digest of the atomic numbers,
+    the coordinates (rounded to 1e-4 Angstrom) and the site properties
+
+    Args:
+        mol: a pymatgen Molecule object
+
+    Returns:
+        a hexadecimal string
+    """
+    h = sha1()
+    h.update(np.array(mol.atomic_numbers, dtype=np.int64).tobytes())
+    # adding 0 turns -0.0 into 0.0
+    h.update((np.round(mol.cart_coords, 4) + 0.0).tobytes())
+    h.update(repr(sorted(mol.site_properties.items())).encode())
+    return h.hexdigest()
+
+
+def get_pyxtal_molecule(mol, tm=molecular_tm):
+    """
+    Returns the pyxtal_molecule of the input, built only once for each
+    geometry and tolerance. The tolerance is compared by content (the
+    prototype, the factor and the tolerances between the elements of the
+    molecule), so that equal Tol_matrix objects share the same entries and
+    a Tol_matrix modified with set_tol gets a new one. The objects are
+    shared (see molecule_registry) and frozen, deepcopy them before any
+    modification. Their tm is the Tol_matrix they were first built with.
+
+    Args:
+        mol: the name of a molecule in the collection, a file name or a
+            pymatgen Molecule object, see parse_molecule
+        tm: a Tol_matrix object
+
+    Returns:
+        a frozen pyxtal_molecule object
+    """
+    mo = parse_molecule(mol)
+    numbers = mo.atomic_numbers
+    h = sha1(get_molecule_key(mo).encode())
+    h.update("{:s}-{:.6f}".format(str(tm.prototype), tm.f).encode())
+    h.update(np.ascontiguousarray(tm.get_tols(numbers, numbers)).tobytes())
+    key = h.hexdigest()
+    if key in molecule_registry:
+        molecule_registry.move_to_end(key)
+    else:
+        pmol = pyxtal_molecule(mo, tm)
+        pmol.freeze()
+        molecule_registry[key] = pmol
+        if len(molecule_registry) > molecule_registry_size:
+            molecule_registry.popitem(last=False)
+    return molecule_registry[key]
+
 
 
 class Box:
@@ -257,7 +346,7 @@ class Orientation:
     def copy(self):
         return deepcopy(self)
 
-    def change_orientation(self, angle="random"):
+    def change_orientation(self, angle="random", random_state=None):
         """
         Allows for specification of an angle (possibly random) to
         rotate about the constraint axis.
@@ -268,17 +357,20 @@ class Orientation:
             If self.degrees==2, chooses a random rotation matrix. 
             If self.degrees==1, only apply on angle
             If self.degrees==0, no change
+            random_state: a numpy.random.Generator. If None, the global
+            random state is used
 
         """
         if self.degrees >= 1:
+            rng = np.random if random_state is None else random_state
             # choose the axis
             if self.axis is None:
-                axis = np.random.RandomState().rand(3) - 0.5
+                axis = rng.random(3) - 0.5
                 self.axis = axis / np.linalg.norm(axis)
  
             # parse the angle
             if angle == "random":
-                angle = np.random.RandomState().rand() * np.pi * 2
+                angle = rng.random() * np.pi * 2
             self.angle = angle
     
             # update the matrix
@@ -309,7 +401,7 @@ class Orientation:
         matrix = matrix.dot(self.matrix)
         return Orientation(matrix, self.degrees, axis)
 
-    def get_matrix(self, angle="random"):
+    def get_matrix(self, angle="random", random_state=None):
         """
         Generate a 3x3 rotation matrix consistent with the orientation's
         constraints. Allows for specification of an angle (possibly random) to
@@ -320,22 +412,25 @@ class Orientation:
                 chooses a random rotation angle. If self.degrees==2, chooses a
                 random 3d rotation matrix to multiply by. If the original matrix
                 is wanted, set angle=0, or call self.matrix
+            random_state: a numpy.random.Generator. If None, the global
+                random state is used
 
         Returns:
             a 3x3 rotation (and/or inversion) matrix (numpy array)
         """
+        rng = np.random if random_state is None else random_state
         if self.degrees == 2:
             if angle == "random":
-                axis = np.random.sample(3)
+                axis = rng.random(3)
                 axis = axis / np.linalg.norm(axis)
-                angle = np.random.random() * np.pi * 2
+                angle = rng.random() * np.pi * 2
             else:
                 axis = self.axis
             return Rotation.from_rotvec(angle * axis).as_matrix()
 
         elif self.degrees == 1:
             if angle == "random":
-                angle = np.random.random() * np.pi * 2
+                angle = rng.random() * np.pi * 2
             else:
                 angle = self.angle
             return Rotation.from_rotvec(angle * self.axis).as_matrix()
@@ -413,16 +508,20 @@ class Orientation:
             printx("Error: Generated incorrect rotation: " + str(theta), priority=1)
         return Orientation(T2, degrees=0)
 
-    def random_orientation(self):
+    def random_orientation(self, random_state=None):
         """
         Applies random rotation (if possible) and returns a new orientation with
         the new base matrix.
 
+        Args:
+            random_state: a numpy.random.Generator. If None, the global
+                random state is used
+
         Returns:
             a new orientation object with a different base rotation matrix
         """
 
-        self.change_orientation()
+        self.change_orientation(random_state=random_state)
         return self
 
     def get_Euler_angles(self):
@@ -651,6 +750,65 @@ def orientation_in_wyckoff_position(
 
     # Obtain molecular symmetry, exact_orientation==False
     symm_m = get_symmetry(mol, already_oriented=already_oriented)
+    improper = any(np.linalg.det(op.rotation_matrix) < 0 for op in wyckoffs)
+    allowed = solve_orientations(
+        symm_m, symm_w, improper, pga.is_valid_op, allow_inversion, rtol
+    )
+    #Return the array of allowed orientations. If there are none, return False
+    if allowed == []:
+        return False
+    else:
+        return allowed
+
+
+def solve_orientations(symm_m, symm_w, improper, is_valid_op,
+                       allow_inversion=True, rtol=1e-2):
+    """
+    Finds the orientations of a molecule which satisfy the site symmetry of
+    a Wyckoff position: the candidates of get_candidate_orientations are
+    checked against the molecule with check_orientations. Used by
+    orientation_in_wyckoff_position.
+
+    Args:
+        symm_m: a list of SymmOp objects, the molecular point group
+        symm_w: a list of SymmOp objects, the site symmetry (symmetry_m[0])
+        improper: whether the Wyckoff position has operations with a
+            negative determinant
+        is_valid_op: a function returning whether a SymmOp leaves the
+            molecule unchanged
+        allow_inversion: whether or not to allow chiral molecules to be
+            inverted
+        rtol: the tolerance for comparing axes and angles
+
+    Returns:
+        a list of operations.Orientation objects, possibly empty
+    """
+    orientations = get_candidate_orientations(
+        symm_m, symm_w, improper, allow_inversion, rtol
+    )
+    return check_orientations(orientations, symm_w, is_valid_op)
+
+
+def get_candidate_orientations(symm_m, symm_w, improper, allow_inversion=True,
+                               rtol=1e-2):
+    """
+    Generates the candidate orientations of a molecule in a Wyckoff position,
+    which align the molecular symmetry axes with those of the site symmetry.
+    Only the point group operations of the molecule are used, the candidates
+    still need to be checked against the molecule (see check_orientations).
+
+    Args:
+        symm_m: a list of SymmOp objects, the molecular point group
+        symm_w: a list of SymmOp objects, the site symmetry (symmetry_m[0])
+        improper: whether the Wyckoff position has operations with a
+            negative determinant
+        allow_inversion: whether or not to allow chiral molecules to be
+            inverted
+        rtol: the tolerance for comparing axes and angles
+
+    Returns:
+        a list of operations.Orientation objects, possibly empty
+    """
     # Store OperationAnalyzer objects for each molecular SymmOp
     chiral = True
     opa_m = []
@@ -665,13 +823,11 @@ def orientation_in_wyckoff_position(
     # If molecule is chiral and allow_inversion is False,
     # check if WP breaks symmetry
     if chiral is True:
-        if allow_inversion is False:
-            for op in wyckoffs:
-                if np.linalg.det(op.rotation_matrix) < 0:
-                    printx(
-                        "Warning: cannot place chiral molecule in spagegroup", priority=2,
-                    )
-                    return False
+        if allow_inversion is False and improper is True:
+            printx(
+                "Warning: cannot place chiral molecule in spagegroup", priority=2,
+            )
+            return []
 
     # Store OperationAnalyzer objects for each Wyckoff symmetry SymmOp
     opa_w = []
@@ -805,7 +961,24 @@ def orientation_in_wyckoff_position(
     if constraints_m == []:
         o = Orientation(np.identity(3), degrees=2)
         orientations.append(o)
+    return orientations
+
+
+def check_orientations(orientations, symm_w, is_valid_op):
+    """
+    Removes the redundant orientations, i.e., those related by a symmetry
+    operation of the molecule, and those which break the site symmetry.
+
+    Args:
+        orientations: a list of Orientation objects, see
+            get_candidate_orientations
+        symm_w: a list of SymmOp objects, the site symmetry (symmetry_m[0])
+        is_valid_op: a function returning whether a SymmOp leaves the
+            molecule unchanged
 
+    Returns:
+        a list of the valid Orientation objects
+    """
     # Remove redundancy from orientations
     list_i = list(range(len(orientations)))
     list_j = list(range(len(orientations)))
@@ -822,7 +995,7 @@ def orientation_in_wyckoff_position(
                     )
                     P = SymmOp.from_rotation_and_translation(np.linalg.inv(m1), [0, 0, 0])
                     old_op = P * new_op * P.inverse
-                    if pga.is_valid_op(old_op):
+                    if is_valid_op(old_op):
                         list_i.remove(j)
                         list_j.remove(j)
     copy = deepcopy(orientations)
@@ -834,19 +1007,208 @@ def orientation_in_wyckoff_position(
     #If consistent, put into an array of valid orientations
     allowed = []
     for o in orientations:
-        if randomize is True:
-            op = o.get_op("random")
-        elif randomize is False:
-            op = o.get_op() #do not change
-        mo = deepcopy(mol)
-        mo.apply_operation(op)
-        if orientation_in_wyckoff_position(mo, wyckoff_position, exact_orientation=True, randomize=False, allow_inversion=allow_inversion) is True:
+        # The rotated molecule is invariant under op_w if the molecule is
+        # invariant under the conjugated operation
+        P = SymmOp.from_rotation_and_translation(np.linalg.inv(o.matrix), [0, 0, 0])
+        if all(is_valid_op(P * op_w * P.inverse) for op_w in symm_w):
             allowed.append(o)
-    #Return the array of allowed orientations. If there are none, return False
-    if allowed == []:
-        return False
-    else:
-        return allowed
+    return allowed
+
+
+def get_canonical_symmetry(mol):
+    """
+    Returns the point group of a molecule in the frame of its principal axes
+    (those of the second moment of the coordinates, in ascending order). In
+    this frame, molecules with the same point group often share the same
+    operations, so that their orientations can be solved once (see
+    get_canonical_orientations).
+
+    Args:
+        mol: a pymatgen Molecule object, e.g., pyxtal_molecule.mol
+
+    Returns:
+        (P, rots): the rotation matrix P taking mol to the principal frame
+        and a sorted (n, 3, 3) array of the rotation matrices of the
+        operations in that frame. None for single atoms and linear molecules
+    """
+    if len(mol) == 1:
+        return None
+    pga = PointGroupAnalyzer(mol)
+    if "*" in pga.sch_symbol:
+        return None
+    coords = mol.cart_coords - mol.cart_coords.mean(axis=0)
+    _, vecs = np.linalg.eigh(np.dot(coords.T, coords))
+    P = vecs.T
+    if np.linalg.det(P) < 0:
+        P[2] *= -1
+    rots = [np.dot(np.dot(P, op.rotation_matrix), P.T) for op in pga.get_pointgroup()]
+    rots = np.array(sorted(rots, key=lambda r: get_rotations_key(r)))
+    return P, rots
+
+
+def get_rotations_key(rots):
+    """
+    Returns the bytes of rotation matrices rounded to 1e-4, used to compare
+    point groups and site symmetries up to numerical noise
+    """
+    # adding 0 turns -0.0 into 0.0
+    return (np.round(rots, 4) + 0.0).tobytes()
+
+
+def get_canonical_orientations(rots, wp, is_valid_op, allow_inversion=True):
+    """
+    Returns the orientations of a molecule in a Wyckoff position. The
+    candidates of get_candidate_orientations only depend on the point group
+    operations and the site symmetry, and are cached for all molecules which
+    share them (up to 1e-4, see get_rotations_key). They are then checked
+    against the molecule itself, so that molecules which are only
+    approximately symmetric are handled as in orientation_in_wyckoff_position.
+
+    Args:
+        rots: an (n, 3, 3) array of the molecular point group operations,
+            see get_canonical_symmetry
+        wp: a Wyckoff_position object
+        is_valid_op: a function returning whether a SymmOp leaves the
+            molecule (in the frame of rots) unchanged
+        allow_inversion: whether or not chiral molecules may be inverted
+
+    Returns:
+        a list of [matrix, degrees, axis] lists, in the frame of rots
+    """
+    symm_w = wp.symmetry_m[0]
+    rots_w = np.array([op.rotation_matrix for op in symm_w])
+    improper = any(np.linalg.det(op.rotation_matrix) < 0 for op in wp.ops)
+    key = (get_rotations_key(rots), get_rotations_key(rots_w), improper, allow_inversion)
+    if key not in canonical_orientation_cache:
+        symm_m = [SymmOp.from_rotation_and_translation(r, [0, 0, 0]) for r in rots]
+        canonical_orientation_cache[key] = get_candidate_orientations(
+            symm_m, symm_w, improper, allow_inversion
+        )
+    # check_orientations builds a new list, the cached candidates are kept
+    allowed = check_orientations(canonical_orientation_cache[key], symm_w, is_valid_op)
+    return [[o.matrix, o.degrees, o.axis] for o in allowed]
+
+
+def get_orientation_key(mol, group, allow_inversion=True):
+    """
+    Returns the key of the valid orientations of a molecule in a group: the
+    sha1 digest of the atomic numbers and coordinates (rounded to 1e-4
+    Angstrom), the group number and dimension, allow_inversion, and the
+    versions of pyxtal and of the solver (orientation_cache_version), so
+    that the entries of older versions are not used
+
+    Args:
+        mol: a pymatgen Molecule object, e.g., pyxtal_molecule.mol
+        group: a pyxtal.symmetry.Group object
+        allow_inversion: whether or not chiral molecules may be inverted
+
+    Returns:
+        a hexadecimal string
+    """
+    h = sha1()
+    h.update(np.array(mol.atomic_numbers, dtype=np.int64).tobytes())
+    # adding 0 turns -0.0 into 0.0
+    h.update((np.round(mol.cart_coords, 4) + 0.0).tobytes())
+    h.update("{:d}-{:d}-{:d}".format(group.number, group.dim, allow_inversion).encode())
+    h.update("{:s}-{:d}".format(__version__, orientation_cache_version).encode())
+    return h.hexdigest()
+
+
+def get_orientation_cache_dir():
+    """
+    Returns the directory of the on-disk cache of valid orientations, given
+    by the environment variable PYXTAL_CACHE_DIR (~/.cache/pyxtal by
+    default). Setting PYXTAL_CACHE_DIR to an empty string disables it.
+
+    Returns:
+        a path, or None
+    """
+    default = os.path.join(os.path.expanduser("~"), ".cache", "pyxtal")
+    return os.environ.get("PYXTAL_CACHE_DIR", default) or None
+
+
+def get_orientations_in_group(mol, group, allow_inversion=True):
+    """
+    Calculates the valid orientations of a molecule in every Wyckoff position
+    of a group. The point group of the molecule is found once, and the
+    orientations are mapped from those of get_canonical_orientations (linear
+    molecules and single atoms use orientation_in_wyckoff_position). As they
+    only depend on the molecule and the group, the results are cached in
+    memory and on disk (see get_orientation_key and
+    get_orientation_cache_dir).
+
+    Args:
+        mol: a pymatgen Molecule object, e.g., pyxtal_molecule.mol
+        group: a pyxtal.symmetry.Group object
+        allow_inversion: whether or not chiral molecules may be inverted
+
+    Returns:
+        a list of lists of lists of Orientation objects, where [i][j] holds
+        the orientations in the Wyckoff position group.wyckoffs_organized[i][j]
+        (empty if there are none). New objects are returned on every call
+    """
+    key = get_orientation_key(mol, group, allow_inversion)
+    path = get_orientation_cache_dir()
+    if path is not None:
+        path = os.path.join(path, "orientations-{:s}.json".format(key))
+    if key not in orientation_cache and path is not None and os.path.exists(path):
+        try:
+            with open(path) as f:
+                orientation_cache[key] = json.load(f)
+        except (OSError, ValueError):
+            printx("Warning: cannot read the orientation cache " + path, priority=2)
+    if key not in orientation_cache:
+        data = []
+        frame = get_canonical_symmetry(mol)
+        if frame is not None:
+            # the molecule in the principal frame, to check the orientations
+            P, rots = frame
+            mo = Molecule(mol.species, np.dot(mol.cart_coords, P.T))
+            is_valid_op = PointGroupAnalyzer(mo).is_valid_op
+        for wps in group.wyckoffs_organized:
+            data.append([])
+            for wp in wps:
+                if frame is None:
+                    allowed = orientation_in_wyckoff_position(
+                        mol,
+                        wp,
+                        already_oriented=True,
+                        allow_inversion=allow_inversion,
+                    )
+                    allowed = [[o.matrix, o.degrees, o.axis] for o in allowed or []]
+                else:
+                    # rotate mol to the principal frame first
+                    allowed = [
+                        [np.dot(m, P), d, ax]
+                        for m, d, ax in get_canonical_orientations(
+                            rots, wp, is_valid_op, allow_inversion
+                        )
+                    ]
+                data[-1].append([
+                    [m.tolist(), d, None if ax is None else list(ax)]
+                    for m, d, ax in allowed
+                ])
+        orientation_cache[key] = data
+        if path is not None:
+            # write to a temporary file first, for concurrent processes
+            tmp = "{:s}.{:d}".format(path, os.getpid())
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp, path)
+            except OSError:
+                printx("Warning: cannot write the orientation cache " + path, priority=2)
+
+    return [
+        [
+            [Orientation(np.array(m), d, None if ax is None else np.array(ax))
+             for m, d, ax in oris]
+            for oris in wps
+        ]
+        for wps in orientation_cache[key]
+    ]
+
 
 def make_graph(mol, tol=0.2):
     """
@@ -10,7 +10,9 @@ constraints.
 # ------------------------------
 # Standard libraries
 import numpy as np
+import random
 from copy import deepcopy
+from functools import lru_cache
 from scipy.spatial.distance import cdist
 from scipy.spatial.transform import Rotation
 
@@ -20,6 +22,7 @@ from pymatgen.core.operations import SymmOp
 # PyXtal imports
 from pyxtal.msg import printx
 from pyxtal.tolerance import Tol_matrix
+from pyxtal.database.element import Element, covalent_radii
 from pyxtal.constants import rad, deg, pyxtal_verbosity
 
 # ------------------------------
@@ -38,7 +41,8 @@ def check_distance(
     Check the distances between two set of atoms. Distances between coordinates
     within the first set are not checked, and distances between coordinates within
     the second set are not checked. Only distances between points from different
-    sets are checked.
+    sets are checked. The check stops at the first pair of atoms which is too
+    close (see find_short_contact).
 
     Args:
         coord1: a list of fractional coordinates e.g. [[.1,.6,.4]
@@ -63,19 +67,80 @@ def check_distance(
     if len(coord1) < 1 or len(coord2) < 1:
         return True
 
-    # Create tolerance matrix from subset of tm
-    tols = np.zeros((len(species1), len(species2)))
-    for i1, specie1 in enumerate(species1):
-        for i2, specie2 in enumerate(species2):
-            tols[i1][i2] = tm.get_tol(specie1, specie2)
+    contact = find_short_contact(
+        coord1, coord2, species1, species2, lattice, PBC, tm, d_factor
+    )
+    return contact is None
 
-    # Calculate the distance between each i, j pair
-    d = distance_matrix(coord1, coord2, lattice, PBC=PBC)
 
-    if (np.array(d) < np.array(tols)).any():
-        return False
-    else:
-        return True
+def find_short_contact(
+    coord1,
+    coord2,
+    species1,
+    species2,
+    lattice,
+    PBC=[1, 1, 1],
+    tm=Tol_matrix(prototype="atomic"),
+    d_factor=1.0,
+):
+    """
+    Finds the first pair of atoms from two sets which is closer than the
+    allowed tolerance. Unlike comparing a full distance matrix against a full
+    tolerance matrix, the search stops at the first short contact.
+
+    Args:
+        coord1: a list of fractional coordinates
+        coord2: a list of fractional coordinates
+        species1: a list of atomic species or numbers for coord1
+        species2: a list of atomic species or numbers for coord2
+        lattice: matrix describing the unit cell vectors
+        PBC: A periodic boundary condition list, 
+            where 1 means periodic, 0 means not periodic.
+        tm: a Tol_matrix object
+        d_factor: the tolerance is multiplied by this amount
+
+    Returns:
+        None if all distances are large enough. Otherwise, a tuple (i, j,
+        specie1, specie2, distance) describing the first short contact, with
+        i and j the indices of the atoms in coord1 and coord2
+    """
+    tols = d_factor * get_tols(tm, species1, species2)
+    pair = find_short_pair(coord1, coord2, lattice, tols, PBC)
+    if pair is None:
+        return None
+    i, j = pair
+    d = distance_matrix([coord1[i]], [coord2[j]], lattice, PBC=PBC, single=True)
+    return i, j, species1[i], species2[j], d
+
+
+def get_numbers(species):
+    """
+    Converts a list of species to an array of atomic numbers. Each distinct
+    specie is looked up only once.
+
+    Args:
+        species: a list of atomic species or numbers
+
+    Returns:
+        an integer array of atomic numbers
+    """
+    numbers = {s: Element.number_from_specie(s) for s in dict.fromkeys(species)}
+    return np.array([numbers[s] for s in species], dtype=int)
+
+
+def get_tols(tm, species1, species2):
+    """
+    Returns the matrix of tolerances between two lists of species.
+
+    Args:
+        tm: a Tol_matrix object
+        species1: a list of atomic species or numbers
+        species2: a list of atomic species or numbers
+
+    Returns:
+        a (len(species1), len(species2)) array
+    """
+    return tm.get_tols(get_numbers(species1), get_numbers(species2))
 
 
 def verify_distances(coordinates, species, lattice, factor=1.0, PBC=[1, 1, 1]):
@@ -95,18 +160,11 @@ def verify_distances(coordinates, species, lattice, factor=1.0, PBC=[1, 1, 1]):
     Returns:
         True if no atoms are too close together, False if any pair is too close
     """
-    for i, c1 in enumerate(coordinates):
-        specie1 = species[i]
-        for j, c2 in enumerate(coordinates):
-            if j > i:
-                specie2 = species[j]
-                diff = np.array(c2) - np.array(c1)
-                d_min = distance(diff, lattice, PBC=PBC)
-                rad = Element(specie1).covalent_radius + Element(specie2).covalent_radius
-                tol = factor * 0.5 * rad
-                if d_min < tol:
-                    return False
-    return True
+    radii = covalent_radii[[Element.number_from_specie(s) for s in species]]
+    tols = factor * 0.5 * (radii[:, None] + radii[None, :])
+    # only check each pair once
+    tols[np.tril_indices(len(radii))] = 0
+    return find_short_pair(coordinates, coordinates, lattice, tols, PBC) is None
 
 
 def check_images(
@@ -120,6 +178,7 @@ def check_images(
 ):
     """
     Given a set of (unfiltered) frac coordinates, checks if the periodic images are too close.
+    The check stops at the first pair which is too close.
     
     Args:
         coords: a list of fractional coordinates
@@ -137,39 +196,18 @@ def check_images(
     # If no PBC, there are no images to check
     if PBC == [0, 0, 0]:
         return True
-    # Create image coords from given coords and PBC
+    # Create image coords from given coords and PBC, omitting the [0,0,0] vector
     coords = np.array(coords)
     m = create_matrix(PBC=PBC)
-    new_coords = []
-    new_species = []
-    for v in m:
-        # Omit the [0,0,0] vector
-        if (v == [0, 0, 0]).all():
-            continue
-        for v2 in coords + v:
-            new_coords.append(v2)
-    new_coords = np.array(new_coords)
-    # Create a distance matrix
-    dm = distance_matrix(coords, new_coords, lattice, PBC=[0, 0, 0])
+    m = m[(m != 0).any(axis=1)]
+    new_coords = (coords[None, :, :] + m[:, None, :]).reshape([-1, 3])
     # Define tolerances
     if tol is None:
-        tols = np.zeros((len(species), len(species)))
-        for i, s1 in enumerate(species):
-            for j, s2 in enumerate(species):
-                if i <= j:
-                    tols[i][j] = tm.get_tol(s1, s2)
-                    tols[j][i] = tm.get_tol(s1, s2)
-        tols2 = np.tile(tols, int(len(new_coords) / len(coords)))
-        if (dm < tols2).any():
-            return False
-        else:
-            return True
-    elif tol is not None:
-        if (dm < tol).any():
-            return False
-        else:
-            return True
-    return True
+        tols = np.tile(d_factor * get_tols(tm, species, species), len(m))
+    else:
+        tols = tol
+    pair = find_short_pair(coords, new_coords, lattice, tols, PBC=[0, 0, 0])
+    return pair is None
 
 
 def distance(xyz, lattice, PBC=[1, 1, 1]):
@@ -179,17 +217,22 @@ def distance(xyz, lattice, PBC=[1, 1, 1]):
     boundary conditions, including up to one non-periodic axis.
     
     Args:
-        xyz: a fractional 3d displacement vector. Can be obtained by
-            subtracting one fractional vector from another
+        xyz: a fractional 3d displacement vector, or an (n, 3) array of
+            them. Can be obtained by subtracting one fractional vector from
+            another
         lattice: a 3x3 matrix describing a unit cell's lattice vectors
         PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
             Ex: [1,1,1] -> full 3d periodicity, [0,0,1] -> periodicity along the z axis
 
     Returns:
-        a scalar for the distance of the point from the origin
+        a scalar for the distance of the point from the origin, or an array
+        of n distances
     """
     xyz = filtered_coords(xyz, PBC=PBC)
     matrix = create_matrix(PBC=PBC)
+    if xyz.ndim > 1:
+        matrix = np.dot(xyz[:, None, :] + matrix, lattice)
+        return np.linalg.norm(matrix, axis=-1).min(axis=1)
     matrix += xyz
     matrix = np.dot(matrix, lattice)
     return np.min(cdist(matrix, [[0, 0, 0]]))
@@ -201,6 +244,9 @@ def distance_matrix(
     """
     Returns the distances between two sets of fractional coordinates.
     Takes into account the lattice metric and periodic boundary conditions.
+    For the euclidean metric, the minimum image of each pair is taken
+    directly; the 27 neighboring images are only searched for the pairs
+    that are farther apart than half of the shortest plane spacing.
     
     Args:
         points1: a list of fractional coordinates
@@ -215,53 +261,317 @@ def distance_matrix(
     Returns:
         a scalor or distance matrix
     """
-    if lattice is not None:
-        if (np.array(lattice) == np.eye(3)).all():
-            lattice = None
-
-    if lattice is not None:
-        if PBC != [0, 0, 0]:
-            l1 = filtered_coords(points1, PBC=PBC)
-            l2 = filtered_coords(points2, PBC=PBC)
-            l2 = np.dot(l2, lattice)
-            matrix = create_matrix(PBC=PBC)
-            m1 = np.array([(l1 + v) for v in matrix])
-            m1 = np.dot(m1, lattice)
-            all_distances = np.array([cdist(l, l2, metric) for l in m1])
-            if single:
-                return np.min(all_distances)
-            else:
-                return np.apply_along_axis(np.min, 0, all_distances)
+    if lattice is None:
+        lattice = np.eye(3)
+    lattice = np.array(lattice, dtype=float)
+    points1 = np.array(points1, dtype=float).reshape([-1, 3])
+    points2 = np.array(points2, dtype=float).reshape([-1, 3])
 
-        else:
-            l1 = np.dot(points1, lattice)
-            l2 = np.dot(points2, lattice)
-            d = cdist(l1, l2, metric)
-            if single:
-                return np.min(d)
-            else:
-                return d
+    if PBC == [0, 0, 0]:
+        d = cdist(np.dot(points1, lattice), np.dot(points2, lattice), metric)
+    elif metric == "euclidean":
+        d = periodic_distances(points1, points2, lattice, PBC)
     else:
-        if PBC != [0, 0, 0]:
-            l1 = filtered_coords(points1, PBC=PBC)
-            l2 = filtered_coords(points2, PBC=PBC)
-            matrix = create_matrix(PBC=PBC)
-            m1 = np.array([(l1 + v) for v in matrix])
-            all_distances = np.array([cdist(l, l2, metric) for l in m1])
-            if single:
-                return all_distances
-            else:
-                return np.apply_along_axis(np.min, 0, all_distances)
+        l1 = filtered_coords(points1, PBC=PBC)
+        l2 = np.dot(filtered_coords(points2, PBC=PBC), lattice)
+        m1 = np.dot([l1 + v for v in create_matrix(PBC=PBC)], lattice)
+        d = np.min([cdist(l, l2, metric) for l in m1], axis=0)
+
+    if single:
+        return np.min(d)
+    else:
+        return d
+
+
+def get_plane_spacings(lattice, PBC=[1, 1, 1]):
+    """
+    Returns the spacing between the lattice planes of each axis, i.e., the
+    height of the cell along the direction normal to the other two vectors.
+    Non-periodic axes get an infinite spacing.
+
+    Args:
+        lattice: a 3x3 matrix describing a unit cell's lattice vectors
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        an array of 3 spacings
+    """
+    heights = 1 / np.linalg.norm(np.linalg.inv(lattice), axis=0)
+    heights[np.array(PBC) != 1] = np.inf
+    return heights
+
+
+def periodic_distances(points1, points2, lattice, PBC=[1, 1, 1]):
+    """
+    Returns the minimum-image Euclidean distances between two sets of
+    fractional coordinates. The differences are first wrapped into [-0.5, 0.5)
+    along the periodic axes. This is the minimum image for every pair closer
+    than half of the shortest plane spacing; the other pairs are compared to
+    the images within their wrapped distance.
+
+    Args:
+        points1: an (m, 3) array of fractional coordinates
+        points2: an (n, 3) array of fractional coordinates
+        lattice: a 3x3 matrix describing a unit cell's lattice vectors
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        an (m, n) array of distances
+    """
+    pbc = np.array(PBC) == 1
+    d = points2[None, :, :] - points1[:, None, :]
+    d[..., pbc] -= np.round(d[..., pbc])
+    dist = np.linalg.norm(np.dot(d, lattice), axis=-1)
+    heights = get_plane_spacings(lattice, PBC)
+    far = dist >= np.min(heights) / 2
+    if far.any():
+        # a closer image differs by less than dist/height along each axis
+        ranges = np.floor(dist[far].max() / heights + 0.5).astype(int)
+        images = np.array(
+            [[i, j, k] for i in range(-ranges[0], ranges[0] + 1)
+             for j in range(-ranges[1], ranges[1] + 1)
+             for k in range(-ranges[2], ranges[2] + 1)]
+        )
+        images = d[far][:, None, :] + images
+        dist[far] = np.linalg.norm(np.dot(images, lattice), axis=-1).min(axis=1)
+    return dist
+
+
+def find_short_pair(points1, points2, lattice, tol, PBC=[1, 1, 1]):
+    """
+    Finds the first pair of points closer than a tolerance, using the same
+    distances as distance_matrix. The search stops at the first short pair;
+    if numba is installed, the loop over the pairs is compiled.
+
+    Args:
+        points1: a list of fractional coordinates
+        points2: another list of fractional coordinates
+        lattice: a 3x3 matrix describing a unit cell's lattice vectors
+        tol: the tolerance, a scalar or an array of shape (len(points1),
+            len(points2)) with one tolerance per pair
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        the indices (i, j) of the first short pair, or None if all distances
+        are greater than or equal to the tolerance
+    """
+    lattice = np.array(lattice, dtype=float)
+    points1 = np.array(points1, dtype=float).reshape([-1, 3])
+    points2 = np.array(points2, dtype=float).reshape([-1, 3])
+    tols = np.broadcast_to(np.array(tol, dtype=float), [len(points1), len(points2)])
+    kernel = _get_short_pair_kernel()
+    if kernel is None:
+        if PBC == [0, 0, 0]:
+            dist = cdist(np.dot(points1, lattice), np.dot(points2, lattice))
         else:
-            if single:
-                return np.min(cdist(points1, points2, metric))
-            else:
-                return cdist(points1, points2, metric)
+            dist = periodic_distances(points1, points2, lattice, PBC)
+        pairs = np.argwhere(dist < tols)
+        return tuple(pairs[0]) if len(pairs) > 0 else None
+    # a single block of points, without cutoff on the centers
+    centers = np.zeros([1, 3])
+    i, j = kernel(
+        points1,
+        points2,
+        centers,
+        centers,
+        lattice,
+        np.ascontiguousarray(tols),
+        np.inf,
+        np.array(PBC, dtype=np.int64),
+        get_plane_spacings(lattice, PBC),
+    )
+    return (i, j) if i >= 0 else None
+
+
+def find_short_molecule_pair(coords1, center1, coords2, centers2, lattice, tol,
+                             cutoff, PBC=[1, 1, 1]):
+    """
+    Finds the first pair of atoms closer than a tolerance between a molecule
+    and a set of molecules. The check has two stages: the atomic distances
+    to a molecule are only computed if its center is closer than the cutoff
+    (at any periodic image), i.e., if the bounding spheres overlap.
+
+    Args:
+        coords1: a (m1, 3) array of fractional coordinates of the first
+            molecule
+        center1: the fractional coordinates of its center
+        coords2: a (n, m2, 3) array of fractional coordinates of n molecules
+        centers2: a (n, 3) array of their centers
+        lattice: a 3x3 matrix describing a unit cell's lattice vectors
+        tol: a (m1, m2) array of tolerances between the atoms
+        cutoff: the distance between two centers beyond which the molecules
+            cannot have short contacts
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        the indices (i, j) of the first short pair, with j the index in the
+        flattened coords2, or None if all distances are large enough
+    """
+    lattice = np.array(lattice, dtype=float)
+    coords1 = np.array(coords1, dtype=float).reshape([-1, 3])
+    coords2 = np.array(coords2, dtype=float)
+    centers2 = np.array(centers2, dtype=float).reshape([-1, 3])
+    m2 = coords2.shape[1]
+    tols = np.broadcast_to(np.array(tol, dtype=float), [len(coords1), m2])
+    kernel = _get_short_pair_kernel()
+    if kernel is None:
+        indices, images = get_close_images(center1, centers2, lattice, cutoff, PBC)
+        if len(indices) == 0:
+            return None
+        coords = (coords2[indices] + images[:, None, :]).reshape([-1, 3])
+        dist = cdist(np.dot(coords1, lattice), np.dot(coords, lattice))
+        pairs = np.argwhere(dist < np.tile(tols, len(indices)))
+        if len(pairs) == 0:
+            return None
+        i, j = pairs[0]
+        return i, indices[j // m2] * m2 + j % m2
+    i, j = kernel(
+        coords1,
+        coords2.reshape([-1, 3]),
+        np.array(center1, dtype=float).reshape([1, 3]),
+        centers2,
+        lattice,
+        np.ascontiguousarray(tols),
+        float(cutoff),
+        np.array(PBC, dtype=np.int64),
+        get_plane_spacings(lattice, PBC),
+    )
+    return (i, j) if i >= 0 else None
+
+
+def _is_short_image(w0, w1, w2, lattice, PBC, heights, tol):
+    """
+    Whether any periodic image of the fractional vector (w0, w1, w2) is
+    shorter than tol. Written with scalars only, so that no array is
+    allocated per call; compiled with numba on first use
+    """
+    if PBC[0] == 1:
+        w0 -= np.floor(w0 + 0.5)
+    if PBC[1] == 1:
+        w1 -= np.floor(w1 + 0.5)
+    if PBC[2] == 1:
+        w2 -= np.floor(w2 + 0.5)
+    c0 = w0 * lattice[0, 0] + w1 * lattice[1, 0] + w2 * lattice[2, 0]
+    c1 = w0 * lattice[0, 1] + w1 * lattice[1, 1] + w2 * lattice[2, 1]
+    c2 = w0 * lattice[0, 2] + w1 * lattice[1, 2] + w2 * lattice[2, 2]
+    # compare the distances themselves, as in distance_matrix
+    d = np.sqrt(c0 * c0 + c1 * c1 + c2 * c2)
+    if d < tol:
+        return True
+    # the minimum image may be another one
+    r_safe = min(heights[0], heights[1], heights[2]) / 2
+    if tol > r_safe and d >= r_safe:
+        n0 = int(np.floor(d / heights[0] + 0.5))
+        n1 = int(np.floor(d / heights[1] + 0.5))
+        n2 = int(np.floor(d / heights[2] + 0.5))
+        for a in range(-n0, n0 + 1):
+            for b in range(-n1, n1 + 1):
+                for e in range(-n2, n2 + 1):
+                    v0 = w0 + a
+                    v1 = w1 + b
+                    v2 = w2 + e
+                    c0 = v0 * lattice[0, 0] + v1 * lattice[1, 0] + v2 * lattice[2, 0]
+                    c1 = v0 * lattice[0, 1] + v1 * lattice[1, 1] + v2 * lattice[2, 1]
+                    c2 = v0 * lattice[0, 2] + v1 * lattice[1, 2] + v2 * lattice[2, 2]
+                    if np.sqrt(c0 * c0 + c1 * c1 + c2 * c2) < tol:
+                        return True
+    return False
+
+
+def _find_short_pair(points1, points2, centers1, centers2, lattice, tols,
+                     cutoff, PBC, heights):
+    """
+    The loop of find_short_pair and find_short_molecule_pair, compiled with
+    numba on first use. points2 is split into len(centers2) blocks, which
+    are skipped if their center is not within the cutoff of centers1[0].
+    The tolerances are given per block, as a (len(points1), block) array
+    """
+    block = points2.shape[0] // centers2.shape[0]
+    for k in range(centers2.shape[0]):
+        w = centers2[k] - centers1[0]
+        if not _is_short_image_nb(w[0], w[1], w[2], lattice, PBC, heights, cutoff):
+            continue
+        for i in range(points1.shape[0]):
+            for j in range(block):
+                l = k * block + j
+                w0 = points2[l, 0] - points1[i, 0]
+                w1 = points2[l, 1] - points1[i, 1]
+                w2 = points2[l, 2] - points1[i, 2]
+                if _is_short_image_nb(w0, w1, w2, lattice, PBC, heights, tols[i, j]):
+                    return i, l
+    return -1, -1
+
+
+# The helper called by _find_short_pair: _is_short_image itself in Python,
+# replaced by its compiled version in _get_short_pair_kernel
+_is_short_image_nb = _is_short_image
+_kernels = {}
+
+
+def _get_short_pair_kernel():
+    """
+    Returns the numba-compiled loop of find_short_pair, or None if numba is
+    not installed
+    """
+    global _is_short_image_nb
+    if "short_pair" not in _kernels:
+        try:
+            import numba as nb
+
+            # the kernel calls the compiled version of the helper, which is
+            # resolved when the kernel is compiled
+            _is_short_image_nb = nb.njit(cache=True)(_is_short_image)
+            _kernels["short_pair"] = nb.njit(cache=True)(_find_short_pair)
+        except ImportError:
+            _kernels["short_pair"] = None
+    return _kernels["short_pair"]
 
 
 # ------------------------------
 
 
+def get_close_images(point, points, lattice, cutoff, PBC=[1, 1, 1]):
+    """
+    Finds all periodic images of a set of points which are closer than a
+    cutoff to a given point. The lattice translations are searched over
+    the range allowed by the plane spacings, so no image is missed.
+
+    Args:
+        point: a fractional 3-vector
+        points: a (n, 3) array of fractional coordinates
+        lattice: a 3x3 matrix describing a unit cell's lattice vectors
+        cutoff: the largest distance
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        indices: the indices of the close points
+        images: the lattice translations, so that `points[indices] + images`
+            are the close images
+    """
+    points = np.asarray(points, dtype=float)
+    pbc = np.array(PBC) == 1
+    d = points - np.asarray(point, dtype=float)
+    shifts = np.zeros(d.shape)
+    shifts[:, pbc] = -np.round(d[:, pbc])
+    d += shifts
+    # after wrapping, an image k is within the cutoff only if |k| <= n
+    n = np.floor(cutoff / get_plane_spacings(lattice, PBC) + 0.5).astype(int)
+    images = _get_image_grid(*n)
+    v = (d[:, None, :] + images[None, :, :]).dot(lattice)
+    indices, k = np.nonzero(np.einsum("ijk,ijk->ij", v, v) < cutoff ** 2)
+    return indices, shifts[indices] + images[k]
+
+
+@lru_cache(maxsize=64)
+def _get_image_grid(n0, n1, n2):
+    """
+    Returns the lattice translations [a, b, c] with |a| <= n0, |b| <= n1 and
+    |c| <= n2, as a (k, 3) float array
+    """
+    grid = np.mgrid[-n0:n0 + 1, -n1:n1 + 1, -n2:n2 + 1]
+    return grid.reshape([3, -1]).T.astype(float)
+
+
 def create_matrix(PBC=[1, 1, 1]):
     """
     Used for calculating distances in lattices with periodic boundary
@@ -311,11 +621,8 @@ def filtered_coords(coords, PBC=[1, 1, 1]):
         an array of filtered coords with the same shape as coords
     """
 
-    def filter_vector(vector):
-        f = np.floor(vector)
-        return vector - np.multiply(f, PBC)
-
-    return np.apply_along_axis(filter_vector, -1, coords)
+    coords = np.array(coords, dtype=float)
+    return coords - np.floor(coords) * PBC
 
 
 def filtered_coords_euclidean(coords, PBC=[1, 1, 1]):
@@ -334,15 +641,119 @@ def filtered_coords_euclidean(coords, PBC=[1, 1, 1]):
         an array of filtered coords with the same shape as coords
     """
 
-    def filter_vector_euclidean(vector):
-        for i, a in enumerate(PBC):
-            if a:
-                vector[i] -= np.floor(vector[i])
-                if vector[i] > 0.5:
-                    vector[i] = 1 - vector[i]
-        return vector
+    coords = np.array(coords, dtype=float)
+    for i, a in enumerate(PBC):
+        if a:
+            v = coords[..., i] - np.floor(coords[..., i])
+            coords[..., i] = np.where(v > 0.5, 1 - v, v)
+    return coords
+
+
+def periodic_sqdistances(points1, points2, PBC=[1, 1, 1]):
+    """
+    Returns the squared minimum-image distances between two sets of
+    fractional coordinates, measured in a Euclidean (unit cube) metric.
+    Leading dimensions are broadcast, so many sets can be compared at once.
+
+    Args:
+        points1: an (..., m, 3) array of fractional coordinates
+        points2: an (..., n, 3) array of fractional coordinates
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        an (..., m, n) array of squared distances
+    """
+    points1 = np.asarray(points1, dtype=float)
+    points2 = np.asarray(points2, dtype=float)
+    d = points1[..., :, None, :] - points2[..., None, :, :]
+    d = filtered_coords_euclidean(d, PBC)
+    return (d ** 2).sum(axis=-1)
+
+
+class Cell_list:
+    """
+    A periodic cell list (spatial hash) for neighbor searches within a fixed
+    cutoff. The unit cell is divided into bins whose widths are at least the
+    cutoff, so that all neighbors of a point are found in the 27 (or fewer)
+    bins around it. Points are added incrementally, e.g., the orbit of each
+    accepted Wyckoff site during one generation attempt.
+
+    Args:
+        lattice: a 3x3 matrix describing a unit cell's lattice vectors
+        cutoff: the largest distance that will be queried
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+    """
+
+    def __init__(self, lattice, cutoff, PBC=[1, 1, 1]):
+        self.lattice = np.array(lattice, dtype=float)
+        self.cutoff = cutoff
+        self.PBC = np.array(PBC)
+        # the spacing between lattice planes along each axis
+        heights = 1 / np.linalg.norm(np.linalg.inv(self.lattice), axis=0)
+        nbins = np.floor(heights / max(cutoff, 1e-8)).astype(int)
+        self.nbins = np.maximum(1, np.minimum(nbins, 50))
+        r = [-1, 0, 1]
+        self.offsets = np.array([[i, j, k] for i in r for j in r for k in r])
+        self.bins = {}
+        self.cart = np.zeros([16, 3])
+        self.labels = []
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _get_bins(self, frac):
+        b = np.floor(frac * self.nbins).astype(int)
+        return np.where(self.PBC == 1, b % self.nbins, b)
+
+    def add(self, points, label=None):
+        """
+        Add a set of points
+
+        Args:
+            points: an (n, 3) array of fractional coordinates
+            label: the label (e.g., the specie) of the points
+        """
+        frac = filtered_coords(np.reshape(points, [-1, 3]), PBC=self.PBC)
+        n0 = len(self.labels)
+        n1 = n0 + len(frac)
+        if n1 > len(self.cart):
+            cart = np.zeros([max(n1, 2 * len(self.cart)), 3])
+            cart[:n0] = self.cart[:n0]
+            self.cart = cart
+        self.cart[n0:n1] = np.dot(frac, self.lattice)
+        for i, b in enumerate(self._get_bins(frac)):
+            self.bins.setdefault(tuple(b), []).append(n0 + i)
+        self.labels.extend([label] * len(frac))
+
+    def get_neighbors(self, point):
+        """
+        Returns the distances to all stored points (or their periodic images)
+        within the cutoff of a given point
+
+        Args:
+            point: a fractional 3-vector
 
-    return np.apply_along_axis(filter_vector_euclidean, -1, coords)
+        Returns:
+            distances: an array of distances
+            labels: a list of the labels of the neighbors
+        """
+        frac = filtered_coords(point, PBC=self.PBC)
+        b = self._get_bins(frac)
+        indices = []
+        shifts = []
+        for o in self.offsets:
+            key = b + o
+            shift = np.floor_divide(key, self.nbins) * self.PBC
+            key = tuple(key - shift * self.nbins)
+            if key in self.bins:
+                indices.extend(self.bins[key])
+                shifts.extend([shift] * len(self.bins[key]))
+        if len(indices) == 0:
+            return np.zeros(0), []
+        cart = self.cart[indices] + np.dot(shifts, self.lattice)
+        d = np.linalg.norm(cart - np.dot(frac, self.lattice), axis=1)
+        mask = d < self.cutoff
+        return d[mask], [self.labels[i] for i in np.array(indices)[mask]]
 
 
 # def euler_from_matrix(m, radians=True):
@@ -403,7 +814,9 @@ def get_inverse_ops(ops):
 def project_point(point, op, lattice=np.eye(3), PBC=[1, 1, 1]):
     """
     Given a 3-vector and a Wyckoff position operator, returns the projection of that
-    point onto the axis, plane, or point.
+    point onto the axis, plane, or point. With PBC, the point is projected onto
+    all periodic images of the symmetry element at once, and the nearest
+    projection is returned. Many points can be projected in a single call.
 
     >>> from pyxtal.symmetry import Wyckoff_position
     >>> ops1 = Wyckoff_position.from_group_and_index(14,1)
@@ -418,8 +831,9 @@ def project_point(point, op, lattice=np.eye(3), PBC=[1, 1, 1]):
     array([0.5, 0. , 0.5])
 
     Args:
-        point: a 3-vector (numeric list, tuple, or array)
-        op: a SymmOp object representing a symmetry element within a symmetry group
+        point: a 3-vector (numeric list, tuple, or array), or an (n, 3) array
+        op: a SymmOp object representing a symmetry element within a symmetry
+            group, or its 4x4 affine matrix
         lattice: 3x3 matrix describing the unit cell vectors
         PBC: A periodic boundary condition list, 
             where 1 means periodic, 0 means not periodic.
@@ -427,40 +841,93 @@ def project_point(point, op, lattice=np.eye(3), PBC=[1, 1, 1]):
                 [0,0,1] -> periodicity along the z axis
 
     Returns:
-        a transformed 3-vector (numpy array)
+        a transformed 3-vector (numpy array), or an (n, 3) array
     """
-    if PBC == [0, 0, 0]:
-        # Temporarily move the point in the opposite direction of the translation
-        translation = op.translation_vector
-        point -= translation
-        new_vector = np.array([0.0, 0.0, 0.0])
-        # Loop over basis vectors of the symmetry element
-        for basis_vector in op.rotation_matrix.T:
-            # b = np.linalg.norm(basis_vector)
-            b = np.sqrt(basis_vector.dot(basis_vector))  # a faster version?
-            if not np.isclose(b, 0):
-                new_vector += basis_vector * (np.dot(point, basis_vector) / (b ** 2))
-        new_vector += translation
-        return new_vector
+    if hasattr(op, "affine_matrix"):
+        op = op.affine_matrix
+    point = np.array(point, dtype=float)
+    new_points = _project_points(point.reshape([-1, 3]), np.array([op]), lattice, PBC)
+    return new_points[0].reshape(point.shape)
+
+
+def project_point_ops(point, ops, lattice=np.eye(3), PBC=[1, 1, 1]):
+    """
+    Projects a 3-vector onto several Wyckoff position operators at once.
+    This gives the same result as calling project_point for each operator.
+
+    Args:
+        point: a 3-vector (numeric list, tuple, or array)
+        ops: a list of SymmOp objects, or an (n, 4, 4) array of their affine
+            matrices
+        lattice: 3x3 matrix describing the unit cell vectors
+        PBC: A periodic boundary condition list, 
+            where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        an (n, 3) array of projected points
+    """
+    point = np.array(point, dtype=float).reshape([1, 3])
+    return _project_points(point, get_affine_matrices(ops), lattice, PBC)[:, 0]
+
+
+def _project_points(points, ops, lattice, PBC):
+    """
+    Projects m points onto n symmetry elements, each given by the affine
+    matrix of a Wyckoff position operator. The projection onto the element
+    (rot, trans) is proj.(point - trans) + trans, where proj sums the
+    projections onto the nonzero columns of rot. With PBC, the element
+    shifted by a lattice vector v gives the same projection plus
+    (v - proj.v), so all images are obtained from a single projection.
+
+    Args:
+        points: an (m, 3) array of fractional coordinates
+        ops: an (n, 4, 4) array of affine matrices
+        lattice: 3x3 matrix describing the unit cell vectors
+        PBC: A periodic boundary condition list
+
+    Returns:
+        an (n, m, 3) array of projected points
+    """
+    rot = ops[:, :3, :3]
+    trans = ops[:, None, :3, 3]
+    norms = (rot ** 2).sum(axis=1)
+    weights = np.zeros(norms.shape)
+    nonzero = ~np.isclose(np.sqrt(norms), 0)
+    weights[nonzero] = 1 / norms[nonzero]
+    proj = np.einsum("nij,nj,nkj->nik", rot, weights, rot)
+
+    if not any(PBC):
+        return np.einsum("nij,nmj->nmi", proj, points - trans) + trans
+    # With PBC, the point could be projected onto multiple places on the symmetry element
+    points = filtered_coords(points)
+    base = np.einsum("nij,nmj->nmi", proj, points - trans) + trans
+    images = create_matrix(PBC=PBC)
+    shifts = images - np.einsum("nij,kj->nki", proj, images)
+    new_points = base[:, :, None, :] + shifts[:, None, :, :]
+    distances = np.linalg.norm(np.dot(new_points - points[:, None, :], lattice), axis=-1)
+    i = np.argmin(distances, axis=-1)
+    new_points = np.take_along_axis(new_points, i[..., None, None], axis=2)[:, :, 0]
+    return filtered_coords(new_points, PBC=PBC)
+
+
+def get_affine_matrices(ops):
+    """
+    Returns the affine matrices of a list of SymmOps as an (n, 4, 4) array.
+    Wyckoff_position objects carry precomputed arrays, which are returned
+    without copying.
+
+    Args:
+        ops: a list of SymmOps, a Wyckoff_position, or an (n, 4, 4) array
+
+    Returns:
+        an (n, 4, 4) numpy array
+    """
+    if isinstance(ops, np.ndarray):
+        return ops
+    elif hasattr(ops, "affine_ops"):
+        return ops.affine_ops
     else:
-        # With PBC, the point could be projected onto multiple places on the symmetry element
-        point = filtered_coords(point)
-        # Generate translation vectors for the equivalent symmetry elements
-        m = create_matrix(PBC=PBC)
-        # Create new symmetry elements for each of the PBC vectors
-        new_vectors = []
-        distances = []
-        for v in m:
-            # Get the direct projection onto each of the new symmetry elements
-            new_op = SymmOp.from_rotation_and_translation(
-                op.rotation_matrix, op.translation_vector + v
-            )
-            # Needs to replace
-            new_vector = project_point(point, new_op, lattice=lattice, PBC=[0, 0, 0])
-            new_vectors.append(new_vector)
-            distances.append(distance(new_vector - point, lattice=lattice, PBC=[0, 0, 0]))
-        i = np.argmin(distances)
-        return filtered_coords(new_vectors[i], PBC=PBC)
+        return np.array([op.affine_matrix for op in ops])
 
 
 def apply_ops(coord, ops):
@@ -470,14 +937,15 @@ def apply_ops(coord, ops):
 
     Args:
         coord: a 3-vector (list or numpy array)
-        ops: a list, tuple, or array of SymmOp objects
+        ops: a list, tuple, or array of SymmOp objects, a Wyckoff_position,
+            or an (n, 4, 4) array of affine matrices
 
     Returns:
         an np array of floating-point 3-vectors
     """
     coord = np.array(coord)
     affine_point = np.concatenate([coord, np.ones(coord.shape[:-1] + (1,))], axis=-1)
-    matrices = np.array([op.affine_matrix for op in ops])
+    matrices = get_affine_matrices(ops)
     return np.inner(affine_point, matrices)[..., :-1]
 
 
@@ -488,16 +956,52 @@ def apply_ops_diagonal(coords, ops):
 
     Args:
         coords: a list or array of 3-vectors
+        ops: a list of SymmOps or an (n, 4, 4) array of affine matrices
 
     Returns:
         a transformed numpy array of 3-vectors
     """
     coords = np.array(coords)
     affine_points = np.concatenate([coords, np.ones(coords.shape[:-1] + (1,))], axis=-1)
-    matrices = np.array([op.affine_matrix for op in ops])
+    matrices = get_affine_matrices(ops)
     return np.einsum("...ij,...j", matrices, affine_points)[:, :3]
 
 
+def get_random_state(seed=None):
+    """
+    Returns a numpy random Generator for the given seed, which is used by the
+    random structure generation. Passing None keeps the global random state.
+
+    Args:
+        seed: None, an integer, a numpy.random.SeedSequence, or a
+            numpy.random.Generator (returned as is)
+
+    Returns:
+        a numpy.random.Generator, or None
+    """
+    if seed is None or isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def random_choice(items, random_state=None):
+    """
+    Choose a random item from a list. Unlike numpy's choice, the items are
+    not converted to an array, so that lists of objects can be used.
+
+    Args:
+        items: a non-empty list
+        random_state: a numpy.random.Generator. If None, the global random
+            state (of the random module) is used
+
+    Returns:
+        an item of the list
+    """
+    if random_state is None:
+        return random.choice(items)
+    return items[random_state.integers(len(items))]
+
+
 def angle(v1, v2, radians=True):
     """
     Calculate the angle (in radians) between two vectors.
@@ -546,7 +1050,7 @@ def is_orthogonal(m, tol=0.001):
         return True
 
 
-def aa2matrix(axis, angle, radians=True, random=False):
+def aa2matrix(axis, angle, radians=True, random=False, random_state=None):
     """
     Given an axis and an angle, return a 3x3 rotation matrix.
     Based on:
@@ -559,6 +1063,8 @@ def aa2matrix(axis, angle, radians=True, random=False):
             or in degrees (False)
         random: whether or not to choose a random rotation matrix. If True, the
             axis and angle are ignored, and a random orientation is generated
+        random_state: a numpy.random.Generator (see get_random_state). If
+            None, the global numpy random state is used
 
     Returns:
         a 3x3 numpy array representing a rotation matrix
@@ -568,9 +1074,9 @@ def aa2matrix(axis, angle, radians=True, random=False):
         angle *= rad
     # Allow for generation of random rotations
     if random is True:
-        # a = np.random.random()
-        axis = np.random.sample(3)
-        angle = np.random.random() * np.pi * 2
+        rng = np.random if random_state is None else random_state
+        axis = rng.random(3)
+        angle = rng.random() * np.pi * 2
     # Ensure axis is a unit vector
     axis = axis / np.linalg.norm(axis)
     # Define quantities which are reused
@@ -599,7 +1105,9 @@ def rotate_vector(v1, v2):
     # (matrix should come after vector in np.dot)
     """
     Rotates a vector v1 to v2 about an axis perpendicular to both. Returns the
-    3x3 rotation matrix used to do so.
+    3x3 rotation matrix used to do so. For antiparallel vectors, the axis is
+    the (deterministic) cross product of v1 with the Cartesian axis that is
+    least aligned with it.
 
     Args:
         v1: a 1x3 vector (list or array) of floats
@@ -616,7 +1124,8 @@ def rotate_vector(v1, v2):
     if np.isclose(dot, 1, rtol=0.0001):
         return np.identity(3)
     elif np.isclose(dot, -1, rtol=0.0001):
-        r = [np.random.random(), np.random.random(), np.random.random()]
+        r = np.zeros(3)
+        r[np.argmin(np.abs(v1))] = 1.0
         v3 = np.cross(v1, r)
         v3 /= np.linalg.norm(v3)
         #return aa2matrix(v3, np.pi)
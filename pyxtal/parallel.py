@@ -0,0 +1,95 @@
+"""
+Module for generating many random crystals on several processes.
+
+Each batch of structures is generated by a worker process from its own
+random stream. The streams are spawned from a single seed with
+`numpy.random.SeedSequence`, so that the batches never share random numbers
+and a given seed always produces the same set of structures.
+"""
+# Standard Libraries
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import copy
+import numpy as np
+
+
+def _generate_batch(cls, args, kwargs, n, seed, max_failures=None):
+    """
+    Worker function: generate up to n structures from one random stream
+
+    Args:
+        cls: the generator class, e.g., `random_crystal` or `molecular_crystal`
+        args: the positional arguments of cls
+        kwargs: the keyword arguments of cls
+        n: the number of structures
+        seed: a `numpy.random.SeedSequence` for this batch
+        max_failures: the number of failed generations allowed
+
+    Returns:
+        a list of valid structures
+    """
+    rng = np.random.default_rng(seed)
+    struc = cls(*args, random_state=rng, **kwargs)
+    strucs = []
+    # the structure generated on initialization counts as the first one
+    if struc.valid and n > 0:
+        first = copy(struc)
+        first.lattice = struc.lattice.copy()
+        strucs.append(first)
+    strucs.extend(struc.generate_many(n - len(strucs), max_failures))
+    # the streams belong to the worker, do not send them back
+    for s in strucs:
+        s.random_state = None
+        s.lattice.random_state = None
+    return strucs
+
+
+def generate_parallel(cls, n, *args, seed=None, max_workers=None,
+                      batch_size=None, max_failures=None, ordered=False,
+                      **kwargs):
+    """
+    Generate n random structures on a pool of processes. The structures are
+    yielded as soon as their batch is finished.
+
+    Args:
+        cls: the generator class, e.g., `random_crystal` or `molecular_crystal`
+        n: the number of structures
+        *args: the positional arguments of cls, e.g., `225, ["C"], [4], 1.0`
+        seed (optional): the seed of the random streams. The same seed gives
+            the same structures (in any order, unless `ordered` is True)
+        max_workers (optional): the number of processes, defaults to the
+            number of CPUs
+        batch_size (optional): the number of structures per task
+        max_failures (optional): the number of failed generations allowed in
+            each batch, defaults to the batch size
+        ordered (optional): whether to yield the batches in submission order
+            rather than in order of completion
+        **kwargs: the keyword arguments of cls
+
+    Yields:
+        the valid structures. Fewer than n may be returned if some batches
+        reach `max_failures`
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = max(1, min(10, -(-n // max_workers)))
+    sizes = [batch_size] * (n // batch_size)
+    if n % batch_size > 0:
+        sizes.append(n % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        futures = [
+            executor.submit(
+                _generate_batch, cls, args, kwargs, size, s, max_failures
+            )
+            for size, s in zip(sizes, seeds)
+        ]
+        try:
+            for future in futures if ordered else as_completed(futures):
+                for struc in future.result():
+                    yield struc
+        finally:
+            for future in futures:
+                future.cancel()
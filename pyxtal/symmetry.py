@@ -6,22 +6,28 @@ a Wyckoff_Position class. These classes are used for generation of random struct
 # ------------------------------
 # Standard Libraries
 import numpy as np
-from pkg_resources import resource_filename
+import os
+import json
 from copy import deepcopy
+from functools import lru_cache
+from hashlib import sha1
 import random
 
 # External Libraries
 from pymatgen.symmetry.analyzer import generate_full_symmops
-from pandas import read_csv
-from monty.serialization import loadfn
 
 # PyXtal imports
 from pyxtal.msg import printx
 from pyxtal.operations import (
     SymmOp,
     apply_ops,
+    get_affine_matrices,
+    random_choice,
     get_inverse_ops,
+    filtered_coords,
+    create_matrix,
     filtered_coords_euclidean,
+    periodic_sqdistances,
     distance_matrix,
     OperationAnalyzer,
 )
@@ -31,27 +37,11 @@ from pyxtal.database.element import Element
 # ------------------------------
 letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
-wyckoff_df = read_csv(resource_filename("pyxtal", "database/wyckoff_list.csv"))
-wyckoff_symmetry_df = read_csv(
-    resource_filename("pyxtal", "database/wyckoff_symmetry.csv")
-)
-wyckoff_generators_df = read_csv(
-    resource_filename("pyxtal", "database/wyckoff_generators.csv")
-)
-layer_df = read_csv(resource_filename("pyxtal", "database/layer.csv"))
-layer_symmetry_df = read_csv(resource_filename("pyxtal", "database/layer_symmetry.csv"))
-layer_generators_df = read_csv(
-    resource_filename("pyxtal", "database/layer_generators.csv")
-)
-rod_df = read_csv(resource_filename("pyxtal", "database/rod.csv"))
-rod_symmetry_df = read_csv(resource_filename("pyxtal", "database/rod_symmetry.csv"))
-rod_generators_df = read_csv(resource_filename("pyxtal", "database/rod_generators.csv"))
-point_df = read_csv(resource_filename("pyxtal", "database/point.csv"))
-point_symmetry_df = read_csv(resource_filename("pyxtal", "database/point_symmetry.csv"))
-point_generators_df = read_csv(
-    resource_filename("pyxtal", "database/point_generators.csv")
-)
-symbols = loadfn(resource_filename("pyxtal", "database/symbols.json"))
+database = os.path.join(os.path.dirname(__file__), "database")
+
+symmetry_tables = {}
+"""Packed affine matrices of the Wyckoff tables (see database/compile_symmetry.py).
+Each table is read from symmetry.npz on first use"""
 
 Identity = SymmOp.from_xyz_string("x,y,z")
 Inversion = SymmOp.from_xyz_string("-x,-y,-z")
@@ -163,6 +153,66 @@ def symmetry_element_from_axis(axis):
     return SymmOp(m)
 
 
+def get_ops_from_table(name, number):
+    """
+    Read the operations of a single group from the binary symmetry tables.
+    The tables are compiled from the csv files by
+    pyxtal/database/compile_symmetry.py
+
+    Args:
+        name: the table name, e.g., "space", "layer_symmetry" or "rod_generators_m"
+        number: the international number of the group
+
+    Returns:
+        a nested list of SymmOp objects: one list per Wyckoff position (and
+        one more level per point in the Wyckoff position for site symmetry)
+    """
+    depth = 3 if "_symmetry" in name else 2
+    if name + "_ops" not in symmetry_tables:
+        keys = [name + "_ops"] + [name + "_offsets" + str(i) for i in range(depth)]
+        with np.load(os.path.join(database, "symmetry.npz")) as data:
+            for key in keys:
+                symmetry_tables[key] = data[key]
+    ops = symmetry_tables[name + "_ops"]
+    offsets = [symmetry_tables[name + "_offsets" + str(i)] for i in range(depth)]
+
+    def unpack(level, start, end):
+        if level == depth:
+            return [SymmOp(m) for m in ops[start:end]]
+        o = offsets[level]
+        return [unpack(level + 1, o[i], o[i + 1]) for i in range(start, end)]
+
+    return unpack(1, offsets[0][number], offsets[0][number + 1])
+
+
+def get_indices_for_PBC(wyckoffs, PBC):
+    """
+    Returns the indices of the Wyckoff positions which remain valid for a
+    non-periodic axis, i.e., those which can be placed at 0.5 along the
+    axes where PBC is 0.
+
+    Args:
+        wyckoffs: an unorganized list of Wyckoff positions
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+
+    Returns:
+        a list of integer indices
+    """
+    coor = np.array([0 if a else 0.5 for a in PBC])
+    indices = []
+    for i, wp in enumerate(wyckoffs):
+        coor1 = wp[0].operate(coor)
+        invalid = False
+        for j, a in enumerate(PBC):
+            if not a:
+                if not abs(coor1[j] - 0.5) < 1e-2:
+                    # invalid wyckoffs for layer group
+                    invalid = True
+        if invalid is False:
+            indices.append(i)
+    return indices
+
+
 def get_wyckoffs(sg, organized=False, PBC=[1, 1, 1]):
     """
     Returns a list of Wyckoff positions for a given space group. Has option to
@@ -194,43 +244,11 @@ def get_wyckoffs(sg, organized=False, PBC=[1, 1, 1]):
     Returns: 
         a list of Wyckoff positions, each of which is a list of SymmOp's
     """
+    wyckoffs = get_ops_from_table("space", sg)
     if PBC != [1, 1, 1]:
-        coor = [0, 0, 0]
-        for i, a in enumerate(PBC):
-            if not a:
-                coor[i] = 0.5
-        coor = np.array(coor)
-
-    wyckoff_strings = eval(wyckoff_df["0"][sg])
-    wyckoffs = []
-    for x in wyckoff_strings:
-        if PBC != [1, 1, 1]:
-            op = SymmOp.from_xyz_string(x[0])
-            coor1 = op.operate(coor)
-            invalid = False
-            for i, a in enumerate(PBC):
-                if not a:
-                    if not abs(coor1[i] - 0.5) < 1e-2:
-                        # invalid wyckoffs for layer group
-                        invalid = True
-            if invalid is False:
-                wyckoffs.append([])
-                for y in x:
-                    wyckoffs[-1].append(SymmOp.from_xyz_string(y))
-        else:
-            wyckoffs.append([])
-            for y in x:
-                wyckoffs[-1].append(SymmOp.from_xyz_string(y))
+        wyckoffs = [wyckoffs[i] for i in get_indices_for_PBC(wyckoffs, PBC)]
     if organized:
-        wyckoffs_organized = [[]]  # 2D Array of WP's organized by multiplicity
-        old = len(wyckoffs[0])
-        for wp in wyckoffs:
-            mult = len(wp)
-            if mult != old:
-                wyckoffs_organized.append([])
-                old = mult
-            wyckoffs_organized[-1].append(wp)
-        return wyckoffs_organized
+        return organized_wyckoffs(wyckoffs)
     else:
         return wyckoffs
 
@@ -267,22 +285,9 @@ def get_layer(num, organized=False):
     Returns: 
         a list of Wyckoff positions, each of which is a list of SymmOp's
     """
-    wyckoff_strings = eval(layer_df["0"][num])
-    wyckoffs = []
-    for x in wyckoff_strings:
-        wyckoffs.append([])
-        for y in x:
-            wyckoffs[-1].append(SymmOp.from_xyz_string(y))
+    wyckoffs = get_ops_from_table("layer", num)
     if organized:
-        wyckoffs_organized = [[]]  # 2D Array of WP's organized by multiplicity
-        old = len(wyckoffs[0])
-        for wp in wyckoffs:
-            mult = len(wp)
-            if mult != old:
-                wyckoffs_organized.append([])
-                old = mult
-            wyckoffs_organized[-1].append(wp)
-        return wyckoffs_organized
+        return organized_wyckoffs(wyckoffs)
     else:
         return wyckoffs
 
@@ -319,22 +324,9 @@ def get_rod(num, organized=False):
     Returns: 
         a list of Wyckoff positions, each of which is a list of SymmOp's
     """
-    wyckoff_strings = eval(rod_df["0"][num])
-    wyckoffs = []
-    for x in wyckoff_strings:
-        wyckoffs.append([])
-        for y in x:
-            wyckoffs[-1].append(SymmOp.from_xyz_string(y))
+    wyckoffs = get_ops_from_table("rod", num)
     if organized:
-        wyckoffs_organized = [[]]  # 2D Array of WP's organized by multiplicity
-        old = len(wyckoffs[0])
-        for wp in wyckoffs:
-            mult = len(wp)
-            if mult != old:
-                wyckoffs_organized.append([])
-                old = mult
-            wyckoffs_organized[-1].append(wp)
-        return wyckoffs_organized
+        return organized_wyckoffs(wyckoffs)
     else:
         return wyckoffs
 
@@ -359,23 +351,9 @@ def get_point(num, organized=False):
     Returns: 
         a list of Wyckoff positions, each of which is a list of SymmOp's
     """
-    wyckoff_strings = eval(point_df["0"][num])
-    wyckoffs = []
-    for x in wyckoff_strings:
-        wyckoffs.append([])
-        for y in x:
-            op = SymmOp(y)
-            wyckoffs[-1].append(op)
+    wyckoffs = get_ops_from_table("point", num)
     if organized:
-        wyckoffs_organized = [[]]  # 2D Array of WP's organized by multiplicity
-        old = len(wyckoffs[0])
-        for wp in wyckoffs:
-            mult = len(wp)
-            if mult != old:
-                wyckoffs_organized.append([])
-                old = mult
-            wyckoffs_organized[-1].append(wp)
-        return wyckoffs_organized
+        return organized_wyckoffs(wyckoffs)
     else:
         return wyckoffs
 
@@ -400,69 +378,13 @@ def get_wyckoff_symmetry(sg, PBC=[1, 1, 1], molecular=False):
         a 3d list of SymmOp objects representing the site symmetry of each
         point in each Wyckoff position
     """
-    if PBC != [1, 1, 1]:
-        coor = [0, 0, 0]
-        for i, a in enumerate(PBC):
-            if not a:
-                coor[i] = 0.5
-        coor = np.array(coor)
-    wyckoffs = get_wyckoffs(sg, PBC=PBC)
-
-    P = SymmOp.from_rotation_and_translation(
-        [[1, -0.5, 0], [0, np.sqrt(3) / 2, 0], [0, 0, 1]], [0, 0, 0]
-    )
-    symmetry_strings = eval(wyckoff_symmetry_df["0"][sg])
-    symmetry = []
-    convert = False
     if molecular is True:
-        if sg >= 143 and sg <= 194:
-            convert = True
-    # Loop over Wyckoff positions
-    for x, w in zip(symmetry_strings, wyckoffs):
-        if PBC != [1, 1, 1]:
-            op = w[0]
-            coor1 = op.operate(coor)
-            invalid = False
-            for i, a in enumerate(PBC):
-                if not a:
-                    if not abs(coor1[i] - 0.5) < 1e-2:
-                        invalid = True
-            if invalid == False:
-                symmetry.append([])
-                # Loop over points in WP
-                for y in x:
-                    symmetry[-1].append([])
-                    # Loop over ops
-                    for z in y:
-                        op = SymmOp.from_xyz_string(z)
-                        if convert is True:
-                            # Convert non-orthogonal trigonal/hexagonal operations
-                            op = P * op * P.inverse
-                        if molecular is False:
-                            symmetry[-1][-1].append(op)
-                        elif molecular is True:
-                            op = SymmOp.from_rotation_and_translation(
-                                op.rotation_matrix, [0, 0, 0]
-                            )
-                            symmetry[-1][-1].append(op)
-        else:
-            symmetry.append([])
-            # Loop over points in WP
-            for y in x:
-                symmetry[-1].append([])
-                # Loop over ops
-                for z in y:
-                    op = SymmOp.from_xyz_string(z)
-                    if convert is True:
-                        # Convert non-orthogonal trigonal/hexagonal operations
-                        op = P * op * P.inverse
-                    if molecular is False:
-                        symmetry[-1][-1].append(op)
-                    elif molecular is True:
-                        op = SymmOp.from_rotation_and_translation(
-                            op.rotation_matrix, [0, 0, 0]
-                        )
-                        symmetry[-1][-1].append(op)
+        symmetry = get_ops_from_table("space_symmetry_m", sg)
+    else:
+        symmetry = get_ops_from_table("space_symmetry", sg)
+    if PBC != [1, 1, 1]:
+        indices = get_indices_for_PBC(get_ops_from_table("space", sg), PBC)
+        symmetry = [symmetry[i] for i in indices]
     return symmetry
 
 
@@ -485,35 +407,10 @@ def get_layer_symmetry(num, molecular=False):
         a 3d list of SymmOp objects representing the site symmetry of each
         point in each Wyckoff position
     """
-
-    P = SymmOp.from_rotation_and_translation(
-        [[1, -0.5, 0], [0, np.sqrt(3) / 2, 0], [0, 0, 1]], [0, 0, 0]
-    )
-    symmetry_strings = eval(layer_symmetry_df["0"][num])
-    symmetry = []
-    convert = False
     if molecular is True:
-        if num >= 65:
-            convert = True
-    # Loop over Wyckoff positions
-    for x in symmetry_strings:
-        symmetry.append([])
-        # Loop over points in WP
-        for y in x:
-            symmetry[-1].append([])
-            # Loop over ops
-            for z in y:
-                op = SymmOp.from_xyz_string(z)
-                if convert is True:
-                    # Convert non-orthogonal trigonal/hexagonal operations
-                    op = P * op * P.inverse
-                if molecular is False:
-                    symmetry[-1][-1].append(op)
-                elif molecular is True:
-                    op = SymmOp.from_rotation_and_translation(
-                        op.rotation_matrix, [0, 0, 0]
-                    )
-                    symmetry[-1][-1].append(op)
+        symmetry = get_ops_from_table("layer_symmetry_m", num)
+    else:
+        symmetry = get_ops_from_table("layer_symmetry", num)
     return symmetry
 
 
@@ -536,35 +433,10 @@ def get_rod_symmetry(num, molecular=False):
         a 3d list of SymmOp objects representing the site symmetry of each
         point in each Wyckoff position
     """
-
-    P = SymmOp.from_rotation_and_translation(
-        [[1, -0.5, 0], [0, np.sqrt(3) / 2, 0], [0, 0, 1]], [0, 0, 0]
-    )
-    symmetry_strings = eval(rod_symmetry_df["0"][num])
-    symmetry = []
-    convert = False
     if molecular is True:
-        if num >= 42:
-            convert = True
-    # Loop over Wyckoff positions
-    for x in symmetry_strings:
-        symmetry.append([])
-        # Loop over points in WP
-        for y in x:
-            symmetry[-1].append([])
-            # Loop over ops
-            for z in y:
-                op = SymmOp.from_xyz_string(z)
-                if convert is True:
-                    # Convert non-orthogonal trigonal/hexagonal operations
-                    op = P * op * P.inverse
-                if molecular is False:
-                    symmetry[-1][-1].append(op)
-                elif molecular is True:
-                    op = SymmOp.from_rotation_and_translation(
-                        op.rotation_matrix, [0, 0, 0]
-                    )
-                    symmetry[-1][-1].append(op)
+        symmetry = get_ops_from_table("rod_symmetry_m", num)
+    else:
+        symmetry = get_ops_from_table("rod_symmetry", num)
     return symmetry
 
 
@@ -584,19 +456,7 @@ def get_point_symmetry(num):
         a 3d list of SymmOp objects representing the site symmetry of each
         point in each Wyckoff position
     """
-    symmetry_strings = eval(point_symmetry_df["0"][num])
-    symmetry = []
-    # Loop over Wyckoff positions
-    for wp in symmetry_strings:
-        symmetry.append([])
-        # Loop over points in WP
-        for point in wp:
-            symmetry[-1].append([])
-            # Loop over ops
-            for m in point:
-                op = SymmOp(m)
-                symmetry[-1][-1].append(op)
-    return symmetry
+    return get_ops_from_table("point_symmetry", num)
 
 
 def get_wyckoff_generators(sg, PBC=[1, 1, 1], molecular=False):
@@ -623,62 +483,13 @@ def get_wyckoff_generators(sg, PBC=[1, 1, 1], molecular=False):
         a 2d list of SymmOp objects which can be used to generate a Wyckoff position given a
         single fractional (x,y,z) coordinate
     """
-    if PBC != [1, 1, 1]:
-        coor = [0, 0, 0]
-        for i, a in enumerate(PBC):
-            if not a:
-                coor[i] = 0.5
-        coor = np.array(coor)
-    wyckoffs = get_wyckoffs(sg, PBC=PBC)
-
-    P = SymmOp.from_rotation_and_translation(
-        [[1, -0.5, 0], [0, np.sqrt(3) / 2, 0], [0, 0, 1]], [0, 0, 0]
-    )
-    generator_strings = eval(wyckoff_generators_df["0"][sg])
-    generators = []
-    convert = False
     if molecular is True:
-        if sg >= 143 and sg <= 194:
-            convert = True
-    # Loop over Wyckoff positions
-    for x, w in zip(generator_strings, wyckoffs):
-        if PBC != [1, 1, 1]:
-            op = w[0]
-            coor1 = op.operate(coor)
-            invalid = False
-            for i, a in enumerate(PBC):
-                if not a:
-                    if not abs(coor1[i] - 0.5) < 1e-2:
-                        invalid = True
-            if invalid == False:
-                generators.append([])
-                # Loop over ops
-                for y in x:
-                    op = SymmOp.from_xyz_string(y)
-                    if convert is True:
-                        # Convert non-orthogonal trigonal/hexagonal operations
-                        op = P * op * P.inverse
-                    if molecular is False:
-                        generators[-1].append(op)
-                    elif molecular is True:
-                        op = SymmOp.from_rotation_and_translation(
-                            op.rotation_matrix, [0, 0, 0]
-                        )
-                        generators[-1].append(op)
-        else:
-            generators.append([])
-            for y in x:
-                op = SymmOp.from_xyz_string(y)
-                if convert is True:
-                    # Convert non-orthogonal trigonal/hexagonal operations
-                    op = P * op * P.inverse
-                if molecular is False:
-                    generators[-1].append(op)
-                elif molecular is True:
-                    op = SymmOp.from_rotation_and_translation(
-                        op.rotation_matrix, [0, 0, 0]
-                    )
-                    generators[-1].append(op)
+        generators = get_ops_from_table("space_generators_m", sg)
+    else:
+        generators = get_ops_from_table("space_generators", sg)
+    if PBC != [1, 1, 1]:
+        indices = get_indices_for_PBC(get_ops_from_table("space", sg), PBC)
+        generators = [generators[i] for i in indices]
     return generators
 
 
@@ -704,30 +515,10 @@ def get_layer_generators(num, molecular=False):
         a 2d list of SymmOp objects which can be used to generate a Wyckoff position given a
         single fractional (x,y,z) coordinate
     """
-
-    P = SymmOp.from_rotation_and_translation(
-        [[1, -0.5, 0], [0, np.sqrt(3) / 2, 0], [0, 0, 1]], [0, 0, 0]
-    )
-    generator_strings = eval(layer_generators_df["0"][num])
-    generators = []
-    convert = False
     if molecular is True:
-        if num >= 65:
-            convert = True
-    # Loop over Wyckoff positions
-    for x in generator_strings:
-        generators.append([])
-        # Loop over ops
-        for y in x:
-            op = SymmOp.from_xyz_string(y)
-            if convert is True:
-                # Convert non-orthogonal trigonal/hexagonal operations
-                op = P * op * P.inverse
-            if molecular is False:
-                generators[-1].append(op)
-            elif molecular is True:
-                op = SymmOp.from_rotation_and_translation(op.rotation_matrix, [0, 0, 0])
-                generators[-1].append(op)
+        generators = get_ops_from_table("layer_generators_m", num)
+    else:
+        generators = get_ops_from_table("layer_generators", num)
     return generators
 
 
@@ -753,30 +544,10 @@ def get_rod_generators(num, molecular=False):
         a 2d list of SymmOp objects which can be used to generate a Wyckoff position given a
         single fractional (x,y,z) coordinate
     """
-
-    P = SymmOp.from_rotation_and_translation(
-        [[1, -0.5, 0], [0, np.sqrt(3) / 2, 0], [0, 0, 1]], [0, 0, 0]
-    )
-    generator_strings = eval(rod_generators_df["0"][num])
-    generators = []
-    convert = False
     if molecular is True:
-        if num >= 42:
-            convert = True
-    # Loop over Wyckoff positions
-    for x in generator_strings:
-        generators.append([])
-        # Loop over ops
-        for y in x:
-            op = SymmOp.from_xyz_string(y)
-            if convert is True:
-                # Convert non-orthogonal trigonal/hexagonal operations
-                op = P * op * P.inverse
-            if molecular is False:
-                generators[-1].append(op)
-            elif molecular is True:
-                op = SymmOp.from_rotation_and_translation(op.rotation_matrix, [0, 0, 0])
-                generators[-1].append(op)
+        generators = get_ops_from_table("rod_generators_m", num)
+    else:
+        generators = get_ops_from_table("rod_generators", num)
     return generators
 
 
@@ -799,16 +570,7 @@ def get_point_generators(num):
         a 2d list of SymmOp objects which can be used to generate a Wyckoff position given a
         single fractional (x,y,z) coordinate
     """
-    generator_strings = eval(point_generators_df["0"][num])
-    generators = []
-    # Loop over Wyckoff positions
-    for x in generator_strings:
-        generators.append([])
-        # Loop over ops
-        for y in x:
-            op = SymmOp(y)
-            generators[-1].append(op)
-    return generators
+    return get_ops_from_table("point_generators", num)
 
 
 def general_position(number, dim=3):
@@ -826,6 +588,71 @@ def general_position(number, dim=3):
     return Wyckoff_position.from_group_and_index(number, 0, dim=dim)
 
 
+def site_symm_indices(points, gen_pos, tol=1e-3, lattice=np.eye(3), PBC=None):
+    """
+    Array version of site_symm. Evaluates all operations of the general
+    position against one or several points at once, and returns the indices
+    of the operations which leave each point invariant, together with the
+    corrected translation vectors (see site_symm).
+
+    Args:
+        points: a 1x3 coordinate, an nx3 array of coordinates, or a SymmOp
+            object. If a SymmOp is given, the operations must also preserve
+            the point's orientation
+        gen_pos: the general position of the spacegroup. Can be a
+            Wyckoff_position object, a list of SymmOp objects, or an (m, 4, 4)
+            array of affine matrices
+        tol: the numerical tolerance for determining equivalent positions
+        lattice: a 3x3 matrix representing the lattice vectors of the unit cell
+        PBC: A periodic boundary condition list, where 1 means periodic, 0 means not periodic.
+            Need not be defined here if gen_pos is a Wyckoff_position object.
+
+    Returns:
+        indices: an array of operation indices
+        translations: a (len(indices), 3) array of translation vectors
+        For an nx3 array of points, lists of n such arrays are returned
+    """
+    if PBC is None:
+        if type(gen_pos) == Wyckoff_position:
+            PBC = gen_pos.PBC
+        else:
+            PBC = [1, 1, 1]
+    matrices = get_affine_matrices(gen_pos)
+    single = True
+    if type(points) == SymmOp:
+        point = points.affine_matrix
+        difference = np.matmul(matrices, point) - point
+        # The rotation of the point must be unaltered by the operation
+        valid = np.all(np.abs(difference[:, :3, :3]) <= 1e-3, axis=(1, 2))
+        displacements = difference[None, :, :3, 3]
+        valid = valid[None, :]
+    else:
+        points = np.array(points, dtype=float)
+        if points.ndim > 1:
+            single = False
+        points = points.reshape([-1, 3])
+        displacements = np.einsum("mij,nj->nmi", matrices[:, :3, :3], points)
+        displacements += matrices[None, :, :3, 3] - points[:, None, :]
+        valid = np.ones(displacements.shape[:2], dtype=bool)
+
+    # Shortest periodic image of each displacement, as in operations.distance
+    images = create_matrix(PBC=PBC)
+    vectors = filtered_coords(displacements, PBC=PBC)[:, :, None, :] + images
+    dists = np.linalg.norm(np.dot(vectors, lattice), axis=-1).min(axis=-1)
+    valid &= dists <= tol
+
+    indices = []
+    translations = []
+    for i in range(len(valid)):
+        ids = np.where(valid[i])[0]
+        indices.append(ids)
+        translations.append(matrices[ids, :3, 3] - np.round(displacements[i, ids]))
+    if single:
+        return indices[0], translations[0]
+    else:
+        return indices, translations
+
+
 def site_symm(point, gen_pos, tol=1e-3, lattice=np.eye(3), PBC=None):
     """
     Given a point and a general Wyckoff position, return the list of symmetry
@@ -854,45 +681,23 @@ def site_symm(point, gen_pos, tol=1e-3, lattice=np.eye(3), PBC=None):
     Returns:
         a list of SymmOp objects which leave the given point invariant
     """
-    if PBC == None:
-        if type(gen_pos) == Wyckoff_position:
-            PBC = gen_pos.PBC
-        else:
-            PBC = [1, 1, 1]
-    # Convert point into a SymmOp
-    if type(point) != SymmOp:
-        point = SymmOp.from_rotation_and_translation(
-            [[0, 0, 0], [0, 0, 0], [0, 0, 0]], np.array(point)
-        )
+    indices, translations = site_symm_indices(point, gen_pos, tol, lattice, PBC)
+    """The actual site symmetry's translation vector may vary from op by
+    a factor of +1 or -1 (especially when op contains +-1/2).
+    We record this to distinguish between special Wyckoff positions.
+    As an example, consider the point (-x+1/2,-x,x+1/2) in position 16c
+    of space group Ia-3(206). The site symmetry includes the operations
+    (-z+1,x-1/2,-y+1/2) and (y+1/2,-z+1/2,-x+1). These operations are
+    not listed in the general position, but correspond to the operations
+    (-z,x+1/2,-y+1/2) and (y+1/2,-z+1/2,-x), respectively, just shifted
+    by (+1,-1,0) and (0,0,+1), respectively.
+    """
+    matrices = get_affine_matrices(gen_pos)
     symmetry = []
-    for op in gen_pos:
-        is_symmetry = True
-        # Calculate the effect of applying op to point
-        difference = SymmOp((op * point).affine_matrix - point.affine_matrix)
-        # Check that the rotation matrix is unaltered by op
-        if not np.allclose(
-            difference.rotation_matrix, np.zeros((3, 3)), rtol=1e-3, atol=1e-3
-        ):
-            is_symmetry = False
-        # Check that the displacement is less than tol
-        displacement = difference.translation_vector
-        if distance(displacement, lattice, PBC=PBC) > tol:
-            is_symmetry = False
-        if is_symmetry:
-            """The actual site symmetry's translation vector may vary from op by
-            a factor of +1 or -1 (especially when op contains +-1/2).
-            We record this to distinguish between special Wyckoff positions.
-            As an example, consider the point (-x+1/2,-x,x+1/2) in position 16c
-            of space group Ia-3(206). The site symmetry includes the operations
-            (-z+1,x-1/2,-y+1/2) and (y+1/2,-z+1/2,-x+1). These operations are
-            not listed in the general position, but correspond to the operations
-            (-z,x+1/2,-y+1/2) and (y+1/2,-z+1/2,-x), respectively, just shifted
-            by (+1,-1,0) and (0,0,+1), respectively.
-            """
-            el = SymmOp.from_rotation_and_translation(
-                op.rotation_matrix, op.translation_vector - np.round(displacement)
-            )
-            symmetry.append(el)
+    for i, trans in zip(indices, translations):
+        symmetry.append(
+            SymmOp.from_rotation_and_translation(matrices[i, :3, :3], trans)
+        )
     return symmetry
 
 
@@ -902,9 +707,10 @@ def check_wyckoff_position(points, group, tol=1e-3):
     position in the space group. Checks the site symmetry of each supplied
     point against the site symmetry for each point in the Wyckoff position.
     Also returns a point which can be used to generate the rest using the
-    Wyckoff position operators
+    Wyckoff position operators.
+
     Args:
-        points: a list of 3d coordinates or SymmOps to check
+        points: a list of 3d coordinates to check
         group: a Group object
         tol: the max distance between equivalent points
     Returns:
@@ -913,60 +719,75 @@ def check_wyckoff_position(points, group, tol=1e-3):
         coordinate taken from the list points. When plugged into the Wyckoff
         position, it will generate all the other points.
     """
-    points = np.array(points)
-    wyckoffs = group.wyckoffs
-    w_symm_all = group.w_symm
+    points = np.array(points, dtype=float)
     PBC = group.PBC
-    # new method
     # Store the squared distance tolerance
     t = tol ** 2
     # Loop over Wyckoff positions
-    for i, wp in enumerate(wyckoffs):
+    for i, wp in enumerate(group):
         # Check that length of points and wp are equal
         if len(wp) != len(points):
             continue
-        failed = False
-
-        # Search for a generating point
-        for p in points:
-            failed = False
-            # Check that point works as x,y,z value for wp
-            xyz = filtered_coords_euclidean(wp[0].operate(p) - p, PBC=PBC)
+        # Check which points work as x,y,z value for wp
+        xyz = filtered_coords_euclidean(apply_ops(points, wp[:1])[:, 0] - points, PBC)
+        candidates = points[(xyz ** 2).sum(axis=1) <= t]
+        if len(candidates) == 0:
+            continue
 
-            if xyz.dot(xyz) > t:
+        ss = wp.symmetry[0]
+        for p in candidates:
+            # Distances between generated (n) and original points (m)
+            close = periodic_sqdistances(wp.apply_ops(p), points, PBC) < t
+            # Each original and each generated point must have a match
+            if not (close.any(axis=0).all() and close.any(axis=1).all()):
                 continue
-            # Calculate distances between original and generated points
-            pw = np.array([op.operate(p) for op in wp])
-            dw = distance_matrix(points, pw, None, PBC=PBC, metric="sqeuclidean")
-
-            # Check each row for a zero
-            for row in dw:
-                num = (row < t).sum()
-                if num < 1:
-                    failed = True
-                    break
+            # The site symmetry must leave the point invariant
+            ds = periodic_sqdistances([p], apply_ops(p, ss), PBC)
+            if (ds <= t).all():
+                return i, p
+    return False, None
 
-            if failed is True:
-                continue
-            # Check each column for a zero
-            for column in dw.T:
-                num = (column < t).sum()
-                if num < 1:
-                    failed = True
-                    break
 
-            # Calculate distance between original and generated points
-            ps = np.array([op.operate(p) for op in w_symm_all[i][0]])
-            ds = distance_matrix([p], ps, None, PBC=PBC, metric="sqeuclidean")
-            # Check whether any generated points are too far away
-            num = (ds > t).sum()
-            if num > 0:
-                failed = True
+def assign_wyckoff_positions(points, group, tol=1e-3, species=None):
+    """
+    Given the fractional coordinates of a whole structure, split them into
+    orbits of the general position and assign each orbit to its Wyckoff
+    position (see check_wyckoff_position).
 
-            if failed is True:
-                continue
-            return i, p
-    return False, None
+    Args:
+        points: an (N, 3) array of fractional coordinates
+        group: a Group object
+        tol: the max distance between equivalent points
+        species: optional list of N species; only equal species are grouped
+            into the same orbit
+
+    Returns:
+        a list of (index, p, ids) tuples, one per orbit: index is the index of
+        the Wyckoff position (False if no match), p is the generating point
+        and ids is an array of the indices of the orbit within points
+    """
+    points = np.array(points, dtype=float)
+    if species is not None:
+        species = np.array(species)
+    PBC = group.PBC
+    t = tol ** 2
+    unassigned = np.ones(len(points), dtype=bool)
+    # Apply all ops of the general position to all points at once
+    images = group[0].apply_ops(points)
+    results = []
+    for i in range(len(points)):
+        if not unassigned[i]:
+            continue
+        members = (periodic_sqdistances(images[i], points, PBC) < t).any(axis=0)
+        members &= unassigned
+        if species is not None:
+            members &= species == species[i]
+        members[i] = True
+        ids = np.where(members)[0]
+        unassigned[ids] = False
+        index, p = check_wyckoff_position(points[ids], group, tol)
+        results.append((index, p, ids))
+    return results
 
 
 # TODO: Use Group object instead of organized array
@@ -1460,8 +1281,92 @@ class Wyckoff_position:
         wp = Wyckoff_position()
         for key in dictionary:
             setattr(wp, key, dictionary[key])
+        wp.set_affine_matrices()
         return wp
 
+    # the list attributes, stored as tuples once the object is frozen
+    frozen_lists = [
+        "ops",
+        "generators",
+        "generators_m",
+        "inverse_generators",
+        "inverse_generators_m",
+        "symmetry",
+        "symmetry_m",
+    ]
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            msg = "Wyckoff_position is shared and cannot be modified, "
+            msg += "use copy() to get a private copy"
+            raise AttributeError(msg)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        # copies are private, thus not frozen and with lists again
+        state = self.__dict__.copy()
+        if state.pop("_frozen", False):
+            for key in self.frozen_lists:
+                if key in state:
+                    state[key] = _to_lists(state[key])
+        return state
+
+    def freeze(self):
+        """
+        Makes the Wyckoff position read-only, as it is shared by get_group:
+        the list attributes become tuples and the arrays are not writeable
+        """
+        for key in self.frozen_lists:
+            if hasattr(self, key):
+                setattr(self, key, _to_tuples(getattr(self, key)))
+        for ops in [self.ops, self.generators, self.generators_m,
+                    self.inverse_generators, self.inverse_generators_m]:
+            for op in ops:
+                op.affine_matrix.flags.writeable = False
+        for key in ["affine_ops", "affine_generators", "affine_generators_m",
+                    "affine_inverse_generators", "affine_inverse_generators_m"]:
+            getattr(self, key).flags.writeable = False
+        self._frozen = True
+
+    def set_affine_matrices(self):
+        """
+        Store the operations, generators and inverse generators as contiguous
+        (n, 4, 4) arrays of affine matrices, which are used by apply_ops.
+        Needs to be called again after the operations are modified.
+        """
+        self.affine_ops = np.array([op.affine_matrix for op in self.ops])
+        self.affine_generators = np.array(
+            [op.affine_matrix for op in self.generators]
+        )
+        self.affine_generators_m = np.array(
+            [op.affine_matrix for op in self.generators_m]
+        )
+        self.affine_inverse_generators = np.array(
+            [op.affine_matrix for op in self.inverse_generators]
+        )
+        self.affine_inverse_generators_m = np.array(
+            [op.affine_matrix for op in self.inverse_generators_m]
+        )
+
+    def apply_ops(self, points):
+        """
+        Generate the full orbits of one or many generating points with a single
+        einsum over the precomputed affine matrices
+
+        Args:
+            points: a 3-vector, or an (m, 3) array of generating points
+
+        Returns:
+            an (n, 3) array for a single point, or an (m, n, 3) array, where n
+            is the multiplicity of the Wyckoff position
+        """
+        points = np.asarray(points, dtype=float)
+        affine_points = np.ones(points.shape[:-1] + (4,))
+        affine_points[..., :3] = points
+        if points.ndim == 1:
+            return np.einsum("nij,j->ni", self.affine_ops, affine_points)[:, :3]
+        return np.einsum("nij,mj->mni", self.affine_ops, affine_points)[..., :3]
+
     def __str__(self):
         if self.dim not in list(range(4)):
             return "Error: invalid crystal dimension. Must be a number between 0 and 3."
@@ -1476,17 +1381,23 @@ class Wyckoff_position:
             s += "Point group " + self.symbol
         if self.dim != 0:
             s += "group " + str(self.number)
-        s += " with site symmetry " + ss_string_from_ops(
-            self.symmetry_m[0], self.number, dim=self.dim
-        )
+        s += " with site symmetry " + self.get_site_symmetry()
         for op in self.ops:
             s += "\n" + op.as_xyz_string()
-        self.string = s
+        # a derived cache, which is also allowed on frozen objects
+        object.__setattr__(self, "string", s)
         return self.string
 
     def __repr__(self):
         return str(self)
 
+    def copy(self):
+        """
+        simply copy the Wyckoff position. Wyckoff positions taken from a
+        shared Group (see get_group) must be copied before being modified
+        """
+        return deepcopy(self)
+
     def diagonalize_symops(self):
         """
         Obtain the symmetry in n representation for P21/c, Pc, C2/c
@@ -1497,21 +1408,25 @@ class Wyckoff_position:
                 vec = op.translation_vector.dot(trans)
                 vec -= np.floor(vec) 
                 op1 = op.from_rotation_and_translation(op.rotation_matrix, vec)
-                self.ops[j] = op1    
+                self.ops[j] = op1
+            self.set_affine_matrices()
 
 
     def from_symops(ops, group=None):
         """
         search Wyckoff Position by symmetry operations
         Now only supports space group symmetry
+        The search is a lookup in a prebuilt index of all Wyckoff positions
+        (see get_symops_index), allowing for the permutation of axes and for
+        the n-glide settings of P21/c, Pc and C2/c
 
         Args:
         ops: a list of symmetry operations
         group: the space group number
-        gen_only: boolean, check general positions only?
 
         Returns:
-        Wyckoff_position
+        Wyckoff_position, and the axis permutation (list) or the monoclinic
+        transformation matrix (array). (None, None) if no match is found
 
         """
         if isinstance(ops[0], str):
@@ -1524,40 +1439,32 @@ class Wyckoff_position:
         N_sym = len(str1)
         # sometimes, we allow the permutation
         permutations = [[0,1,2],[1,0,2],[2,1,0],[0,2,1]]
-        if group is None:
-            groups = range(1,231)
+        index = get_symops_index()
+
+        # candidates are sorted as (group, Wyckoff index, setting)
+        matches = []
+        for p, perm in enumerate(permutations):
+            key = get_symops_key(permutate_xyz_string(str1, perm))
+            for (number, i, mult, setting) in index.get(key, []):
+                if setting == 0:
+                    matches.append((number, i, p, mult))
+        # Try monoclinic space groups (P21/n, Pn, C2/n)
+        for (number, i, mult, setting) in index.get(get_symops_key(str1), []):
+            if setting == 1:
+                matches.append((number, i, len(permutations), mult))
+
+        matches = [m for m in matches if m[3] == N_sym]
+        if group is not None:
+            matches = [m for m in matches if m[0] == group]
+        if len(matches) == 0:
+            return None, None
+
+        number, i, p, _ = min(matches)
+        wyc = get_group(number)[i]
+        if p < len(permutations):
+            return wyc, permutations[p]
         else:
-            groups = [group]
-
-        for i in groups:
-            for wyc in Group(i):
-                if len(wyc) == N_sym:
-                    # Try permutation first
-                    str2 = [op.as_xyz_string() for op in wyc.ops]
-                    for perm in permutations:
-                        str_perm = permutate_xyz_string(str1, perm)
-                        # Compare the pure rotation and then 
-                        if set(str_perm) == set(str2):
-                            return wyc, perm
-
-                    # Try monoclinic space groups (P21/n, Pn, C2/n) 
-                    if i in [7, 14, 15]:
-                        trans = np.array([[1,0,0],[0,1,0],[1,0,1]])
-                        str3 = []
-                        for j, op in enumerate(wyc.ops):
-                            vec = op.translation_vector.dot(trans)
-                            vec -= np.floor(vec) 
-                            op3 = op.from_rotation_and_translation(op.rotation_matrix, vec)
-                            str3.append(op3.as_xyz_string().replace("-1/2","+1/2"))
-                            #wyc.ops[j] = op3
-                        if set(str3) == set(str1):
-                            return wyc, trans
-                elif len(wyc) < N_sym:
-                    continue #break since it won'
-
-
-        return None, None
-
+            return wyc, np.array([[1,0,0],[0,1,0],[1,0,1]])
 
     def from_group_and_index(group, index, dim=3, PBC=None):
         """
@@ -1737,7 +1644,7 @@ class Wyckoff_position:
                 )
                 return
             # Generate a Group and retrieve Wyckoff position from it
-            g = Group(group, dim=0)
+            g = get_group(group, dim=0)
             try:
                 wp = g[index]
             except:
@@ -1745,6 +1652,8 @@ class Wyckoff_position:
                     "Error while generating Wyckoff_position: index out of range for specified group",
                     priority=1,
                 )
+            return wp
+        wp.set_affine_matrices()
         return wp
 
     def wyckoff_from_generating_op(gen_op, gen_pos):
@@ -1871,7 +1780,15 @@ class Wyckoff_position:
         return self.multiplicity
 
     def get_site_symmetry(self):
-        return ss_string_from_ops(self.symmetry_m[0], self.number, dim=self.dim)
+        """
+        Returns the site symmetry symbol, from the precompiled table when the
+        Wyckoff position is tabulated, or from the site symmetry operations
+        otherwise
+        """
+        symbol = get_site_symmetry_symbol(self.number, self.index, self.dim)
+        if symbol is None:
+            symbol = ss_string_from_ops(self.symmetry_m[0], self.number, dim=self.dim)
+        return symbol
 
 
 class Group:
@@ -2013,16 +1930,53 @@ class Group:
                     + str(wp.multiplicity)
                     + wp.letter
                     + "\tsite symm: "
-                    + ss_string_from_ops(wp.symmetry_m[0], self.number, dim=self.dim)
+                    + wp.get_site_symmetry()
                 )
                 # for op in wp.ops:
                 #    s += "\n" + op.as_xyz_string()
-            self.string = s
+            # a derived cache, which is also allowed on frozen objects
+            object.__setattr__(self, "string", s)
             return self.string
 
     def __repr__(self):
         return str(self)
 
+    def __reduce_ex__(self, protocol):
+        # the tables are rebuilt (or found in the registry) on unpickling,
+        # so that structures sent to other processes stay small
+        if self.dim > 0 and hasattr(self, "wyckoffs"):
+            return (get_group, (self.number, self.dim))
+        return super().__reduce_ex__(protocol)
+
+    def __deepcopy__(self, memo):
+        # unlike pickling, deepcopy gives a private and modifiable Group
+        g = Group.__new__(Group)
+        memo[id(self)] = g
+        state = self.__dict__.copy()
+        if state.pop("_frozen", False):
+            for key in ["Wyckoff_positions", "wyckoffs_organized"]:
+                state[key] = _to_lists(state[key])
+        g.__dict__.update(deepcopy(state, memo))
+        return g
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            msg = "Group is shared and cannot be modified, "
+            msg += "use deepcopy to get a private copy"
+            raise AttributeError(msg)
+        object.__setattr__(self, name, value)
+
+    def freeze(self):
+        """
+        Makes the Group and its Wyckoff positions read-only, as they are
+        shared by get_group
+        """
+        for wp in self.Wyckoff_positions:
+            wp.freeze()
+        self.Wyckoff_positions = tuple(self.Wyckoff_positions)
+        self.wyckoffs_organized = _to_tuples(self.wyckoffs_organized)
+        self._frozen = True
+
     def __init__(self, group, dim=3):
         self.dim = dim
         # TODO: get symbol from number
@@ -2602,6 +2556,9 @@ class Group:
                     letter = c
                     break
             index = index_from_letter(letter, self.wyckoffs, dim=self.dim)
+        symbol = get_site_symmetry_symbol(self.number, index, self.dim)
+        if symbol is not None:
+            return symbol
         if molecular is False:
             ops = self.w_symm[index][0]
         if molecular is True:
@@ -2648,10 +2605,10 @@ class Group:
             s += "group # " + str(self.number) + " (" + self.symbol + ")--"
             for wp in self.Wyckoff_positions:
                 s += "\n" + str(wp.multiplicity) + wp.letter + " site symm: "
-                s += ss_string_from_ops(wp.symmetry_m[0], self.number, dim=self.dim)
+                s += wp.get_site_symmetry()
                 for op in wp.ops:
                     s += "\n  " + op.as_xyz_string()
-            self.string_long = s
+            object.__setattr__(self, "string_long", s)
             print(self.string_long)
 
     def gen_pos(self):
@@ -2661,6 +2618,77 @@ class Group:
         return self.Wyckoff_positions[0]
 
 
+@lru_cache(maxsize=64)
+def _get_cached_group(number, dim):
+    symbol, _ = get_symbol_and_number(number, dim)
+    # point groups are initialized from their symbols
+    g = Group(symbol if dim == 0 else number, dim)
+    g.freeze()
+    return g
+
+
+def _to_tuples(x):
+    """
+    Recursively converts (nested) lists to tuples
+    """
+    if isinstance(x, (list, tuple)):
+        return tuple(_to_tuples(item) for item in x)
+    return x
+
+
+def _to_lists(x):
+    """
+    Recursively converts (nested) tuples to lists
+    """
+    if isinstance(x, (list, tuple)):
+        return [_to_lists(item) for item in x]
+    return x
+
+
+def get_group(group, dim=3):
+    """
+    Returns a shared Group object from a process-wide registry. Building a
+    Group from the tables is expensive, so repeated requests for the same
+    (number, dim) return the same instance. The periodic boundary conditions
+    are determined by the dimension. At most 64 groups are kept; the least
+    recently used ones are dropped first.
+
+    The returned Group and its Wyckoff positions are shared, thus frozen:
+    setting their attributes raises an AttributeError. Use
+    `Wyckoff_position.copy()` (or deepcopy for the Group) to get a private
+    copy before changing it (e.g., `diagonalize_symops`).
+
+    Args:
+        group: the group symbol or international number
+        dim: the periodic dimension of the group
+
+    Returns:
+        a Group object
+    """
+    if isinstance(group, Group):
+        return group
+    symbol, number = get_symbol_and_number(group, dim)
+    return _get_cached_group(number, dim)
+
+
+def clear_group_cache():
+    """
+    Empty the registry of shared Group objects used by get_group
+    """
+    _get_cached_group.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_group_symbols():
+    """
+    Returns the dictionary of group symbols, with the keys "space_group",
+    "layer_group", "rod_group" and "point_group". The data is read from
+    symbols.json on first use.
+    """
+    with open(os.path.join(database, "symbols.json"), "r") as f:
+        return json.load(f)
+
+
 def get_symbol_and_number(group, dim=3):
     """
     Function for quick conversion between symbols and numbers
@@ -2678,7 +2706,7 @@ def get_symbol_and_number(group, dim=3):
     }
 
     found = False
-    lists = symbols[keys[dim]]
+    lists = get_group_symbols()[keys[dim]]
     number = None
     symbol = None
     if dim not in [0, 1, 2, 3]:
@@ -2727,14 +2755,14 @@ def list_groups(dim=3):
         1: "rod_group",
         0: "point_group",
     }
-    data = symbols[keys[dim]]
+    data = get_group_symbols()[keys[dim]]
     df = pd.DataFrame(index=range(1, len(data) + 1), data=data, columns=[keys[dim]])
     pd.set_option("display.max_rows", len(df))
     # df.set_index('Number')
     print(df)
 
 
-def choose_wyckoff(group, number=None, site=None, dim=3):
+def choose_wyckoff(group, number=None, site=None, dim=3, random_state=None):
     """
     Choose a Wyckoff position to fill based on the current number of atoms
     needed to be placed within a unit cell
@@ -2747,6 +2775,8 @@ def choose_wyckoff(group, number=None, site=None, dim=3):
         group: a pyxtal.symmetry.Group object
         number: the number of atoms still needed in the unit cell
         site: the pre-assigned Wyckoff sites (e.g., 4a)
+        random_state: a numpy.random.Generator. If None, the global random
+            state is used
 
     Returns:
         a single index for the Wyckoff position. If no position is found,
@@ -2757,11 +2787,12 @@ def choose_wyckoff(group, number=None, site=None, dim=3):
         return Wyckoff_position.from_group_and_index(group.number, site, dim)
     else:
         wyckoffs_organized = group.wyckoffs_organized
+        rng = random if random_state is None else random_state
 
-        if random.uniform(0, 1) > 0.5:  # choose from high to low
+        if rng.uniform(0, 1) > 0.5:  # choose from high to low
             for wyckoff in wyckoffs_organized:
                 if len(wyckoff[0]) <= number:
-                    return random.choice(wyckoff)
+                    return random_choice(wyckoff, random_state)
             return False
         else:
             good_wyckoff = []
@@ -2770,11 +2801,13 @@ def choose_wyckoff(group, number=None, site=None, dim=3):
                     for w in wyckoff:
                         good_wyckoff.append(w)
             if len(good_wyckoff) > 0:
-                return random.choice(good_wyckoff)
+                return random_choice(good_wyckoff, random_state)
             else:
                 return False
 
-def choose_wyckoff_molecular(group, number, orientations, general_site_only=True):
+def choose_wyckoff_molecular(
+    group, number, orientations, general_site_only=True, random_state=None
+):
     """
     Choose a Wyckoff position to fill based on the current number of molecules
     needed to be placed within a unit cell
@@ -2790,14 +2823,17 @@ def choose_wyckoff_molecular(group, number, orientations, general_site_only=True
         number: the number of molecules still needed in the unit cell
         orientations: the valid orientations for a given molecule. Obtained
             from get_sg_orientations, which is called within molecular_crystal
+        random_state: a numpy.random.Generator. If None, the global random
+            state is used
 
     Returns:
         a single index for the Wyckoff position. If no position is found,
         returns False
     """
     wyckoffs = group.wyckoffs_organized
+    rng = np.random if random_state is None else random_state
 
-    if general_site_only or np.random.random() > 0.5:  # choose from high to low
+    if general_site_only or rng.random() > 0.5:  # choose from high to low
         for j, wyckoff in enumerate(wyckoffs):
             if len(wyckoff[0]) <= number:
                 good_wyckoff = []
@@ -2805,7 +2841,7 @@ def choose_wyckoff_molecular(group, number, orientations, general_site_only=True
                     if orientations[j][k] != []:
                         good_wyckoff.append(w)
                 if len(good_wyckoff) > 0:
-                    return random.choice(good_wyckoff)
+                    return random_choice(good_wyckoff, random_state)
         return False
     else:
         good_wyckoff = []
@@ -2815,11 +2851,347 @@ def choose_wyckoff_molecular(group, number, orientations, general_site_only=True
                     if orientations[j][k] != []:
                         good_wyckoff.append(w)
         if len(good_wyckoff) > 0:
-            return random.choice(good_wyckoff)
+            return random_choice(good_wyckoff, random_state)
         else:
             return False
 
 
+class Stoichiometry_solver:
+    """
+    Class for the combinations of Wyckoff positions which accommodate a given
+    number of atoms (or molecules) of each species in a group. Positions
+    with degrees of freedom can be occupied several times, while each fixed
+    position (e.g., 4a at the origin) can only be occupied once over all
+    species. Use get_stoichiometry_solver to obtain a shared instance.
+
+    Args:
+        group: a pyxtal.symmetry.Group object
+        numIons: a list of the number of atoms for each species
+        masks: a list (one per species) of lists of booleans, telling whether
+            each Wyckoff position (in unorganized order) may be occupied by
+            the species. If None, all positions are allowed
+    """
+
+    def __init__(self, group, numIons, masks=None):
+        self.numIons = [int(n) for n in numIons]
+        if masks is None:
+            masks = [[True] * len(group)] * len(numIons)
+        self.labels = [str(len(wp)) + wp.letter for wp in group]
+        self.mults = [len(wp) for wp in group]
+        is_free = [
+            not np.allclose(wp[0].rotation_matrix, np.zeros([3, 3])) for wp in group
+        ]
+        # The fixed positions are identified by their bit in the used mask
+        self.fixed = [i for i, free in enumerate(is_free) if not free]
+        self.free = []
+        self.ways = []
+        for n, mask in zip(self.numIons, masks):
+            free = [i for i, f in enumerate(is_free) if f and mask[i]]
+            self.free.append(free)
+            self.ways.append(self._count_free(free, n))
+        self.subsets = [
+            self._fixed_subsets(n, mask) for n, mask in zip(self.numIons, masks)
+        ]
+        self._verdicts = {}
+        self._counts = {}
+        self.verdict = {1: True, 0: 0, -1: False}[self._solve(0, 0)]
+        """True if a valid combination with degrees of freedom exists, 0 if
+        only combinations of fixed positions exist, and False otherwise"""
+
+    def _count_free(self, free, n):
+        """
+        Returns ways[j][m], the number of combinations of the free positions
+        free[j:] accommodating m atoms
+        """
+        ways = np.zeros([len(free) + 1, n + 1], dtype=object)
+        ways[-1][0] = 1
+        for j in range(len(free) - 1, -1, -1):
+            mult = self.mults[free[j]]
+            for m in range(n + 1):
+                ways[j][m] = ways[j + 1][m]
+                if m >= mult:
+                    ways[j][m] += ways[j][m - mult]
+        return ways
+
+    def _fixed_subsets(self, n, mask):
+        """
+        Returns the subsets of allowed fixed positions with a total
+        multiplicity of at most n, as a list of (bitmask, multiplicity)
+        """
+        subsets = [(0, 0)]
+        for bit, i in enumerate(self.fixed):
+            if mask[i]:
+                subsets += [
+                    (used | (1 << bit), total + self.mults[i])
+                    for used, total in subsets
+                    if total + self.mults[i] <= n
+                ]
+        return subsets
+
+    def _options(self, s, used):
+        """
+        Yields the fixed subsets usable by species s, along with the number
+        of atoms left for the free positions
+        """
+        ways = self.ways[s][0]
+        for subset, total in self.subsets[s]:
+            rest = self.numIons[s] - total
+            if not subset & used and ways[rest] > 0:
+                yield subset, rest
+
+    def _solve(self, s, used):
+        """
+        Returns 1 if species s and later can be placed with at least one
+        degree of freedom, 0 if they can only be placed on fixed positions,
+        and -1 if they cannot be placed at all
+        """
+        if s == len(self.numIons):
+            return 0
+        key = (s, used)
+        if key not in self._verdicts:
+            best = -1
+            for subset, rest in self._options(s, used):
+                sub = self._solve(s + 1, used | subset)
+                if sub >= 0:
+                    best = max(best, sub, int(rest > 0))
+                    if best == 1:
+                        break
+            self._verdicts[key] = best
+        return self._verdicts[key]
+
+    def _count(self, s, used):
+        if s == len(self.numIons):
+            return 1
+        key = (s, used)
+        if key not in self._counts:
+            self._counts[key] = sum(
+                self.ways[s][0][rest] * self._count(s + 1, used | subset)
+                for subset, rest in self._options(s, used)
+            )
+        return self._counts[key]
+
+    def count(self):
+        """
+        Returns the total number of valid combinations
+        """
+        return self._count(0, 0)
+
+    def _free_combinations(self, s, j, rest):
+        free = self.free[s]
+        if j == len(free):
+            yield []
+            return
+        mult = self.mults[free[j]]
+        for c in range(rest // mult, -1, -1):
+            if self.ways[s][j + 1][rest - c * mult] > 0:
+                for tail in self._free_combinations(s, j + 1, rest - c * mult):
+                    yield [self.labels[free[j]]] * c + tail
+
+    def _fixed_labels(self, subset):
+        return [
+            self.labels[i] for bit, i in enumerate(self.fixed) if subset >> bit & 1
+        ]
+
+    def _combinations(self, s, used):
+        if s == len(self.numIons):
+            yield []
+            return
+        for subset, rest in self._options(s, used):
+            if self._count(s + 1, used | subset) == 0:
+                continue
+            fixed = self._fixed_labels(subset)
+            for sites in self._free_combinations(s, 0, rest):
+                for tail in self._combinations(s + 1, used | subset):
+                    yield [sites + fixed] + tail
+
+    def __iter__(self):
+        """
+        Iterates lazily over all valid combinations. Each combination is a
+        list (one per species) of Wyckoff labels, e.g., [["8c"], ["4a", "4b"]],
+        which can be passed as the sites of random_crystal
+        """
+        yield from self._combinations(0, 0)
+
+    def __len__(self):
+        return self.count()
+
+    def sample(self, random_state=None):
+        """
+        Returns a uniformly chosen valid combination (see __iter__), or None
+        if no combination exists
+
+        Args:
+            random_state: a numpy.random.Generator. If None, the global random
+                state is used
+        """
+        if self.verdict is False:
+            return None
+        if random_state is None:
+            randrange = random.randrange
+        else:
+            # the counts may exceed the range of numpy integers
+            randrange = random.Random(int(random_state.integers(2**63))).randrange
+        combination = []
+        used = 0
+        for s in range(len(self.numIons)):
+            options = list(self._options(s, used))
+            weights = [
+                self.ways[s][0][rest] * self._count(s + 1, used | subset)
+                for subset, rest in options
+            ]
+            r = randrange(sum(weights))
+            for (subset, rest), weight in zip(options, weights):
+                if r < weight:
+                    break
+                r -= weight
+            sites = []
+            free = self.free[s]
+            for j, i in enumerate(free):
+                mult = self.mults[i]
+                weights = [
+                    self.ways[s][j + 1][rest - c * mult]
+                    for c in range(rest // mult + 1)
+                ]
+                r = randrange(sum(weights))
+                for c, weight in enumerate(weights):
+                    if r < weight:
+                        break
+                    r -= weight
+                sites += [self.labels[i]] * c
+                rest -= c * mult
+            combination.append(sites + self._fixed_labels(subset))
+            used |= subset
+        return combination
+
+
+@lru_cache(maxsize=1024)
+def _get_stoichiometry_solver(number, dim, numIons, masks):
+    group = get_group(number, dim)
+    return Stoichiometry_solver(group, numIons, masks)
+
+
+def get_stoichiometry_solver(group, numIons, masks=None):
+    """
+    Returns a shared Stoichiometry_solver, memoized by the group, the number
+    of atoms of each species and the masks of allowed Wyckoff positions.
+
+    Args:
+        group: a pyxtal.symmetry.Group object
+        numIons: a list of the number of atoms for each species
+        masks: a list (one per species) of lists of booleans for each Wyckoff
+            position, or None if all positions are allowed
+
+    Returns:
+        a Stoichiometry_solver object
+    """
+    numIons = tuple(int(n) for n in numIons)
+    if masks is not None:
+        masks = tuple(tuple(bool(m) for m in mask) for mask in masks)
+    return _get_stoichiometry_solver(group.number, group.dim, numIons, masks)
+
+
+@lru_cache(maxsize=256)
+def get_merge_table(number, dim=3):
+    """
+    Returns the Wyckoff positions that each Wyckoff position of a group can
+    merge into, i.e., those whose multiplicity is smaller and divides its
+    own. Used by wyckoff_site.WP_merge.
+
+    Args:
+        number: the international number of the group
+        dim: the periodic dimension of the group
+
+    Returns:
+        a list indexed by Wyckoff position of (indices, ops) tuples, where
+        indices is an array of the candidate Wyckoff indices and ops is an
+        (n, 4, 4) array of the affine matrices of their first operations
+    """
+    group = get_group(number, dim)
+    mults = np.array([wp.multiplicity for wp in group])
+    first_ops = np.array([wp[0].affine_matrix for wp in group])
+    table = []
+    for mult in mults:
+        indices = np.where((mults < mult) & (mult % mults == 0))[0]
+        table.append((indices, first_ops[indices]))
+    return table
+
+
+def get_symops_key(strings):
+    """
+    Returns the canonical key of a set of symmetry operations given as xyz
+    strings: the sha1 digest of the sorted, unique strings without spaces.
+    Used for the index of Wyckoff_position.from_symops
+
+    Args:
+        strings: a list of xyz strings (e.g., "x, y+1/2, -z")
+
+    Returns:
+        a hexadecimal string
+    """
+    strings = sorted(set(st.replace(" ", "") for st in strings))
+    return sha1(";".join(strings).encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_symops_index():
+    """
+    Returns the index of all space group Wyckoff positions, built by
+    database/compile_symmetry.py and read from symmetry.npz on first use.
+
+    Returns:
+        a dict mapping the canonical key (see get_symops_key) to a list of
+        (group, Wyckoff index, multiplicity, setting) tuples, where setting
+        is 1 for the n-glide settings of P21/c, Pc and C2/c and 0 otherwise
+    """
+    index = {}
+    with np.load(os.path.join(database, "symmetry.npz")) as data:
+        for key, value in zip(data["symops_keys"], data["symops_values"]):
+            index.setdefault(str(key), []).append(tuple(int(v) for v in value))
+    return index
+
+
+@lru_cache(maxsize=None)
+def get_site_symmetry_symbols(dim=3):
+    """
+    Returns the site symmetry symbols of all Wyckoff positions for one kind
+    of group, built by database/compile_symmetry.py and read from
+    symmetry.npz on first use.
+
+    Args:
+        dim: the dimension of the groups (3 for space, 2 for layer, 1 for rod
+            and 0 for point groups)
+
+    Returns:
+        a list indexed by group number, each entry a list of Hermann-Mauguin
+        style strings indexed by Wyckoff position
+    """
+    key = ["point", "rod", "layer", "space"][dim] + "_ss"
+    with np.load(os.path.join(database, "symmetry.npz")) as data:
+        symbols = [str(symbol) for symbol in data[key]]
+        offsets = data[key + "_offsets"]
+    return [symbols[offsets[i] : offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def get_site_symmetry_symbol(number, index, dim=3):
+    """
+    Look up the site symmetry symbol of a Wyckoff position in a standard
+    setting. See ss_string_from_ops for positions in other settings.
+
+    Args:
+        number: the international number of the group
+        index: the index of the Wyckoff position within the group
+        dim: the dimension of the group
+
+    Returns:
+        a Hermann-Mauguin style string, or None if the position is not
+        tabulated (e.g., for the non-crystallographic point groups)
+    """
+    symbols = get_site_symmetry_symbols(dim)
+    if 0 < number < len(symbols) and 0 <= index < len(symbols[number]):
+        return symbols[number][index]
+    return None
+
+
 def permutate_xyz_string(xyzs, permutation):
     if permutation == [0,1,2]:
         return xyzs
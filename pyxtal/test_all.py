@@ -1,4 +1,5 @@
 #python -m unittest pyxtal/test_all.py
+import os
 import unittest
 import numpy as np
 from pyxtal.crystal import *
@@ -7,9 +8,12 @@ from pyxtal.lattice import Lattice
 from pyxtal.symmetry import Wyckoff_position, get_wyckoffs
 from pyxtal.wyckoff_site import WP_merge
 from pymatgen.core.structure import Molecule
+from pymatgen.core.operations import SymmOp
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pkg_resources import resource_filename
 
+# do not write the orientation cache to ~/.cache/pyxtal
+os.environ["PYXTAL_CACHE_DIR"] = ""
 cif_path = resource_filename("pyxtal", "database/aspirin.cif")
 l0 = Lattice.from_matrix([[4.08,0,0],[0,9.13,0],[0,0,5.50]])
 l1 = Lattice.from_matrix([[4.08,0,0],[0,9.13,0],[0,0,5.50]])
@@ -33,11 +37,82 @@ class TestWP(unittest.TestCase):
         symbol = str(wp.multiplicity) + wp.letter
         self.assertTrue(symbol=='8b')
 
+    def test_merge_table(self):
+        from pyxtal.symmetry import get_merge_table
+        # 8b of Cmc21 can only merge into 4a
+        indices, ops = get_merge_table(36)[0]
+        self.assertTrue(list(indices) == [1])
+        self.assertTrue(np.allclose(ops[0], wp2[0].affine_matrix))
+        self.assertTrue(len(get_merge_table(36)[1][0]) == 0)
+
     def test_get_wyckoff(self):
         for i in [1, 2, 229, 230]:
             get_wyckoffs(i)
             get_wyckoffs(i, organized=True)
 
+    def test_apply_ops(self):
+        from pyxtal.operations import apply_ops
+        pts = np.random.random([5, 3])
+        coords = wp1.apply_ops(pts)
+        self.assertTrue(coords.shape == (5, 8, 3))
+        ref = [[op.operate(p) for op in wp1.ops] for p in pts]
+        self.assertTrue(np.allclose(coords, ref))
+        self.assertTrue(np.allclose(apply_ops(pts[0], wp1), ref[0]))
+
+    def test_project_point(self):
+        from pyxtal.operations import project_point
+        op = Wyckoff_position.from_group_and_index(14, 1)[0]
+        self.assertTrue(np.allclose(project_point([0, 0.3, 0.1], op), [0.5, 0, 0.5]))
+        pts = np.random.random([4, 3])
+        pts1 = project_point(pts, wp2[0], l2.matrix)
+        self.assertTrue(pts1.shape == (4, 3))
+        self.assertTrue(np.allclose(pts1[2], project_point(pts[2], wp2[0], l2.matrix)))
+
+    def test_group_registry(self):
+        from pyxtal.symmetry import get_group, clear_group_cache
+        g = get_group(225)
+        self.assertTrue(g is get_group("Fm-3m"))
+        self.assertTrue(get_group(25, dim=2) is not get_group(25))
+        clear_group_cache()
+        self.assertTrue(g is not get_group(225))
+
+    def test_group_frozen(self):
+        from copy import deepcopy
+        from pyxtal.symmetry import get_group
+        g = get_group(14)
+        wp = g.Wyckoff_positions[0]
+        ops = [op.as_xyz_string() for op in wp.ops]
+        self.assertRaises(AttributeError, setattr, g, "number", 15)
+        self.assertRaises(AttributeError, setattr, wp, "ops", [])
+        self.assertRaises(TypeError, wp.diagonalize_symops)
+        wp1 = wp.copy()
+        wp1.diagonalize_symops()
+        self.assertTrue(ops != [op.as_xyz_string() for op in wp1.ops])
+        g1 = deepcopy(g)
+        self.assertTrue(g1 is not g)
+        g1.Wyckoff_positions[0].diagonalize_symops()
+        self.assertTrue(ops == [op.as_xyz_string() for op in get_group(14)[0].ops])
+
+    def test_compiled_tables(self):
+        from pyxtal.database.compile_symmetry import read_table
+        from pyxtal.symmetry import get_wyckoff_generators
+        strings = read_table("wyckoff_list")[225]
+        for wp, strs in zip(get_wyckoffs(225), strings):
+            for op, st in zip(wp, strs):
+                self.assertTrue(op == SymmOp.from_xyz_string(st))
+        gens = get_wyckoff_generators(191, molecular=True)
+        self.assertTrue(np.allclose(gens[0][1].translation_vector, 0))
+
+    def test_site_symmetry_symbols(self):
+        from pyxtal.symmetry import get_group, ss_string_from_ops
+        for number, dim in [(225, 3), (191, 3), (20, 2), (30, 0)]:
+            g = get_group(number, dim)
+            for wp in g:
+                ss = ss_string_from_ops(wp.symmetry_m[0], g.number, dim=dim)
+                self.assertTrue(wp.get_site_symmetry() == ss)
+        g = get_group(191)
+        self.assertTrue(g.get_wyckoff_symmetry("1a") == g[-1].get_site_symmetry())
+
     # to add test from string
 
 class TestMolecular(unittest.TestCase):
@@ -62,6 +137,140 @@ class TestMolecular(unittest.TestCase):
         self.assertTrue(sga.get_space_group_symbol()=='Cmc2_1')
         #print(pmg_struc.frac_coords[:3])
 
+    def test_mol_site_coords(self):
+        struc = molecular_crystal(14, ['H2O'], [4], 1.0, random_state=0)
+        ms = struc.mol_sites[0]
+        coords, species = ms._get_coords_and_species()
+        self.assertTrue(coords.shape == (12, 3) and species == ['O', 'H', 'H'] * 4)
+        # the O atom of the first molecule is close to the site position
+        d = (coords[0] - ms.position).dot(ms.lattice.matrix)
+        self.assertTrue(np.linalg.norm(d) < 0.2)
+        buf = np.zeros([12, 3])
+        ms._get_coords_and_species(out=buf)
+        self.assertTrue(np.allclose(buf, coords))
+        ms.translate([0.1, 0, 0], absolute=True)
+        coords = ms._get_coords_and_species()[0]
+        self.assertFalse(np.allclose(coords[:3], buf[:3]))
+        # replacing the Wyckoff position gives new coordinates
+        ms.wp = Wyckoff_position.from_group_and_index(14, 1)
+        self.assertFalse(np.allclose(ms._get_coords_and_species()[0], coords[:6]))
+
+    def test_optimize_orientation(self):
+        struc = molecular_crystal(14, ['aspirin'], [4], 1.0, random_state=0)
+        ms = struc.mol_sites[0]
+        score0 = ms.get_orientation_scores([ms.orientation.matrix])[0]
+        score = ms.optimize_orientation(n_refine=2, random_state=np.random.default_rng(0))
+        self.assertTrue(score >= score0)
+        self.assertTrue(np.isclose(score, ms.get_orientation_scores([ms.orientation.matrix])[0]))
+        # with a single molecule, the scores only see the periodic images
+        # of check_distances (with [-1, 0, 2] along the short axes)
+        ms = molecular_crystal(1, ['H2O'], [1], 1.0, random_state=0).mol_sites[0]
+        rng = np.random.default_rng(0)
+        for i in range(10):
+            ms.orientation.change_orientation(random_state=rng)
+            score = ms.get_orientation_scores([ms.orientation.matrix])[0]
+            self.assertTrue(ms.check_distances() == (score >= 1))
+
+    def test_orientation_cache(self):
+        import os, tempfile
+        from pyxtal.symmetry import get_group
+        from pyxtal.molecule import pyxtal_molecule, get_orientations_in_group, orientation_cache
+        mol = pyxtal_molecule('H2O').mol
+        g = get_group(36)
+        old = os.environ.get('PYXTAL_CACHE_DIR')
+        with tempfile.TemporaryDirectory() as d:
+            os.environ['PYXTAL_CACHE_DIR'] = d
+            try:
+                oris = get_orientations_in_group(mol, g)
+                orientation_cache.clear()
+                self.assertTrue(len(os.listdir(d)) == 1)
+                oris1 = get_orientations_in_group(mol, g)
+            finally:
+                if old is None:
+                    del os.environ['PYXTAL_CACHE_DIR']
+                else:
+                    os.environ['PYXTAL_CACHE_DIR'] = old
+        for o, o1 in zip(sum(sum(oris, []), []), sum(sum(oris1, []), [])):
+            self.assertTrue(np.allclose(o.matrix, o1.matrix) and o.degrees == o1.degrees)
+        self.assertTrue(oris[-1][0][0] is not oris1[-1][0][0])
+
+    def test_molecule_registry(self):
+        from copy import deepcopy
+        from pyxtal.tolerance import Tol_matrix
+        from pyxtal.molecule import pyxtal_molecule, get_pyxtal_molecule
+        pmol = get_pyxtal_molecule('aspirin')
+        self.assertTrue(get_pyxtal_molecule('aspirin') is pmol)
+        # tolerances are compared by content
+        tm = Tol_matrix(prototype="molecular")
+        self.assertTrue(get_pyxtal_molecule('aspirin', tm) is pmol)
+        tm.set_tol('C', 'O', 2.0)
+        self.assertTrue(get_pyxtal_molecule('aspirin', tm) is not pmol)
+        with self.assertRaises(AttributeError):
+            pmol.radius = 1.0
+        pmol1 = deepcopy(pmol)
+        pmol1.radius = 1.0
+        pmol0 = pyxtal_molecule('aspirin')
+        self.assertTrue(np.allclose(pmol0.tols_matrix, pmol.tols_matrix))
+        self.assertTrue(np.isclose(pmol0.radius, pmol.radius))
+
+    def test_collection(self):
+        import tempfile
+        from pyxtal.database.collection import Collection, write_collection
+        c = Collection('molecules')
+        # every access builds a new molecule
+        mol = c['H2O']
+        mol.translate_sites(list(range(len(mol))), [1, 0, 0])
+        self.assertTrue(np.allclose(c['h2o'].cart_coords[0], 0))
+        with self.assertRaises(NameError):
+            c['XXX']
+        with tempfile.TemporaryDirectory() as d:
+            ion = Molecule(['N', 'H', 'H', 'H', 'H'], c['CH4'].cart_coords, charge=1)
+            write_collection(d, {'water': c['H2O'], 'ammonia': c['NH3'], 'NH4': ion})
+            c1 = Collection(d)
+            self.assertTrue(list(c1) == ['water', 'ammonia', 'NH4'])
+            self.assertTrue(c1['NH4'].charge == 1)
+            mol = c1['ammonia']
+            self.assertTrue(mol.formula == c['NH3'].formula)
+            self.assertTrue(np.allclose(mol.cart_coords, c['NH3'].cart_coords))
+
+    def test_canonical_orientations(self):
+        from pymatgen.symmetry.analyzer import PointGroupAnalyzer
+        from pyxtal.symmetry import get_group
+        from pyxtal.molecule import pyxtal_molecule, get_canonical_symmetry, get_rotations_key
+        mol = pyxtal_molecule('H2O').mol
+        mol1 = mol.copy()
+        mol1.apply_operation(SymmOp.from_axis_angle_and_translation([1, 2, 3], 40))
+        # the same point group in the principal frames
+        _, rots = get_canonical_symmetry(mol)
+        _, rots1 = get_canonical_symmetry(mol1)
+        self.assertTrue(get_rotations_key(rots) == get_rotations_key(rots1))
+        g = get_group(36)
+        oris = get_orientations_in_group(mol1, g, allow_inversion=False)
+        for wps, oris_wps in zip(g.wyckoffs_organized, oris):
+            for wp, oris_wp in zip(wps, oris_wps):
+                self.assertTrue(len(oris_wp) > 0)
+                for o in oris_wp:
+                    mo = mol1.copy()
+                    mo.apply_operation(o.get_op())
+                    pga = PointGroupAnalyzer(mo)
+                    self.assertTrue(all(pga.is_valid_op(op) for op in wp.symmetry_m[0]))
+
+    def test_canonical_orientations_approximate(self):
+        # glycine is only approximately Cs
+        from pyxtal.symmetry import get_group
+        from pyxtal.molecule import pyxtal_molecule, orientation_in_wyckoff_position
+        mol = pyxtal_molecule('glycine').mol
+        for number in [36, 191, 221]:
+            g = get_group(number)
+            oris = get_orientations_in_group(mol, g)
+            for wps, oris_wps in zip(g.wyckoffs_organized, oris):
+                for wp, oris_wp in zip(wps, oris_wps):
+                    ref = orientation_in_wyckoff_position(mol, wp, already_oriented=True)
+                    degrees = sorted(o.degrees for o in ref or [])
+                    self.assertTrue(degrees == sorted(o.degrees for o in oris_wp))
+        struc = molecular_crystal(36, ['glycine'], [2], 1.0)
+        self.assertTrue(struc.valid)
+
     def test_read(self):
         #test reading structure from external
         struc = molecular_crystal(14, ['aspirin'], [4], seed=cif_path)
@@ -131,6 +340,36 @@ class TestAtomic3D(unittest.TestCase):
         struc = random_crystal(225, ['C'], [3], 1.0, sites=[["4a", "8c"]])
         self.assertTrue(struc.valid)
 
+    def test_generate_many(self):
+        struc = random_crystal(99, ['Ba','Ti','O'], [1,1,3], 1.2)
+        strucs = list(struc.generate_many(3))
+        self.assertTrue(len(strucs) == 3)
+        self.assertTrue(all(s.valid and s.numattempts > 0 for s in strucs))
+        self.assertTrue(strucs[0].lattice is not strucs[1].lattice)
+        # each structure has its own sites
+        sites = [s.atom_sites for s in strucs]
+        self.assertTrue(len(set(id(site) for ss in sites for site in ss)) == sum(map(len, sites)))
+        self.assertFalse(np.allclose(sites[0][0].position, sites[1][0].position))
+
+    def test_random_state(self):
+        from pyxtal.parallel import generate_parallel
+        s1 = random_crystal(99, ['Ba','Ti','O'], [1,1,3], 1.2, random_state=7)
+        s2 = random_crystal(99, ['Ba','Ti','O'], [1,1,3], 1.2, random_state=7)
+        self.assertTrue(np.allclose(s1.lattice.matrix, s2.lattice.matrix))
+        args = (random_crystal, 4, 99, ['Ba','Ti','O'], [1,1,3], 1.2)
+        strucs = list(generate_parallel(*args, seed=1, max_workers=2,
+                                        batch_size=2, ordered=True))
+        self.assertTrue(len(strucs) == 4)
+        volumes = [s.lattice.volume for s in strucs]
+        self.assertTrue(len(set(volumes)) == 4)
+        # the same seed gives the same sites, and the structures differ
+        strucs1 = list(generate_parallel(*args, seed=1, max_workers=2,
+                                         batch_size=2, ordered=True))
+        coords = [s._get_coords_and_species()[0] for s in strucs]
+        coords1 = [s._get_coords_and_species()[0] for s in strucs1]
+        self.assertTrue(all(np.allclose(c, c1) for c, c1 in zip(coords, coords1)))
+        self.assertTrue(len(set(np.round(c[0], 6).tobytes() for c in coords)) == 4)
+
     #def test_space_groups(self):
 
 
@@ -195,6 +434,121 @@ class TestLattice(unittest.TestCase):
         l0.set_para([5,5,5,90,90,90])
         self.assertTrue(l0.a==5)
 
+    def test_cell_list(self):
+        from pyxtal.operations import Cell_list, distance_matrix
+        pts = np.random.random([50, 3])
+        cells = Cell_list(l2.matrix, 2.0)
+        cells.add(pts, 'C')
+        d, labels = cells.get_neighbors([0.1, 0.2, 0.3])
+        dm = distance_matrix([[0.1, 0.2, 0.3]], pts, l2.matrix)
+        self.assertTrue(len(labels) == (dm < 2.0).sum())
+        self.assertTrue(np.allclose(np.sort(d), np.sort(dm[dm < 2.0])))
+
+    def test_short_pair(self):
+        from pyxtal.operations import distance_matrix, find_short_pair
+        pts1 = np.random.random([3, 3])
+        pts2 = np.random.random([20, 3])
+        dm = distance_matrix(pts1, pts2, l3.matrix)
+        # exact minimum images: never farther than the 27 neighboring images
+        ref = [[min(np.linalg.norm(np.dot(p2 - p1 + np.array(v), l3.matrix))
+                    for v in np.ndindex(3, 3, 3)) for p2 in pts2 - 1] for p1 in pts1]
+        self.assertTrue((dm <= np.array(ref) + 1e-8).all())
+        pair = find_short_pair(pts1, pts2, l3.matrix, dm.min() + 1e-6)
+        self.assertTrue(dm[pair] <= dm.min() + 1e-6)
+        self.assertTrue(find_short_pair(pts1, pts2, l3.matrix, dm.min()) is None)
+        # the kernel can be rebuilt
+        from pyxtal.operations import _kernels
+        _kernels.clear()
+        self.assertTrue(find_short_pair(pts1, pts2, l3.matrix, dm.min() + 1e-6) == pair)
+
+    def test_short_contact(self):
+        from pyxtal.operations import check_distance, find_short_contact
+        coords1 = [[0.1, 0.1, 0.1], [0.5, 0.5, 0.5]]
+        coords2 = [[0.9, 0.9, 0.9], [0.55, 0.5, 0.5]]
+        contact = find_short_contact(coords1, coords2, ['C', 'O'], ['H', 'C'], l2.matrix)
+        self.assertTrue(contact[:4] == (1, 1, 'O', 'C'))
+        self.assertTrue(abs(contact[4] - 0.204) < 1e-6)
+        self.assertFalse(check_distance(coords1, coords2, ['C', 'O'], ['H', 'C'], l2.matrix))
+
+    def test_short_molecule_pair(self):
+        from pyxtal.operations import find_short_molecule_pair
+        mol = np.array([[0.0, 0.0, 0.0], [0.1, 0.0, 0.0]])
+        centers = np.array([[0.5, 0.5, 0.5], [0.95, 0.0, 0.0]])
+        coords = mol[None, :, :] + centers[:, None, :]
+        tols = np.full([2, 2], 1.0)
+        # the molecule at the origin only touches the second one, via an image
+        pair = find_short_molecule_pair(mol, [0, 0, 0], coords, centers, l2.matrix, tols, 2.0)
+        self.assertTrue(pair is not None and pair[1] >= 2)
+        self.assertTrue(find_short_molecule_pair(mol, [0, 0, 0], coords, centers,
+                                                 l2.matrix, tols, 0.1) is None)
+
+    def test_short_pair_fallback(self):
+        from pyxtal.operations import (distance_matrix, find_short_pair,
+                                       find_short_molecule_pair, _kernels)
+        pts1 = np.random.random([3, 3])
+        pts2 = np.random.random([20, 3])
+        mol = np.random.random([4, 3]) * 0.2
+        centers = np.random.random([6, 3])
+        coords = mol[None, :, :] + centers[:, None, :]
+        tols = np.random.random([4, 4]) + 0.5
+        dm = distance_matrix(mol + centers[0], coords.reshape([-1, 3]), l3.matrix)
+
+        def run():
+            res = []
+            for tol in [0.5, 1.5, 2.5]:
+                res.append(find_short_pair(pts1, pts2, l3.matrix, tol))
+            for scale in [0.5, 1.0, 2.0]:
+                res.append(find_short_molecule_pair(mol + centers[0], centers[0],
+                                                    coords[1:], centers[1:], l3.matrix,
+                                                    tols * scale, 10.0))
+            return res
+
+        try:
+            ref = run()
+            # the numpy version, used when numba is not installed
+            _kernels["short_pair"] = None
+            res = run()
+        finally:
+            _kernels.clear()
+        dm1 = distance_matrix(pts1, pts2, l3.matrix)
+        for tol, pair0, pair1 in zip([0.5, 1.5, 2.5], ref[:3], res[:3]):
+            self.assertTrue((pair0 is None) == (pair1 is None))
+            if pair1 is not None:
+                self.assertTrue(dm1[pair1] < tol)
+        for scale, pair0, pair1 in zip([0.5, 1.0, 2.0], ref[3:], res[3:]):
+            self.assertTrue((pair0 is None) == (pair1 is None))
+            if pair1 is not None:
+                i, j = pair1
+                self.assertTrue(dm[i, j + 4] < tols[i, j % 4] * scale)
+
+    def test_rotate_vector(self):
+        from pyxtal.operations import aa2matrix, rotate_vector, get_random_state
+        v = np.array([0.3, -0.2, 0.9])
+        m = rotate_vector(v, -v)
+        self.assertTrue(np.allclose(np.dot(m, v), -v))
+        self.assertTrue(np.allclose(m, rotate_vector(v, -v)))
+        m1 = aa2matrix(1, 1, random=True, random_state=get_random_state(3))
+        m2 = aa2matrix(1, 1, random=True, random_state=get_random_state(3))
+        self.assertTrue(np.allclose(m1, m2))
+
+class TestElement(unittest.TestCase):
+
+    def test_lookup(self):
+        from pyxtal.database.element import Element, covalent_radii
+        for x in [6, 'C', 'Carbon']:
+            el = Element(x)
+            self.assertTrue((el.z, el.short_name, el.long_name) == (6, 'C', 'Carbon'))
+        self.assertTrue(Element('Xx').z is None)
+        self.assertTrue(Element.number_from_specie(np.str_('O')) == 8)
+        self.assertTrue(covalent_radii[8] == Element('O').covalent_radius)
+
+    def test_tol_matrix(self):
+        from pyxtal.tolerance import Tol_matrix
+        for tm in [Tol_matrix(prototype="metallic"), Tol_matrix.from_single_value(2.0)]:
+            tols = tm.get_tols([1, 6], [1, 6, 8])
+            self.assertTrue(tols.shape == (2, 3))
+            self.assertTrue(tols[1, 2] == tm.get_tol('C', 'O') == tm.get_tol('O', 'C'))
+
 class TestSymmetry(unittest.TestCase):
 
     def test_P21(self):
@@ -212,12 +566,77 @@ class TestSymmetry(unittest.TestCase):
         wyc, perm = Wyckoff_position.from_symops(strs)
         self.assertTrue(wyc.number==14)
 
+    def test_assign_wyckoff(self):
+        from pyxtal.symmetry import get_group, assign_wyckoff_positions
+        g = get_group(225)
+        wp1, wp2 = g.get_wyckoff_position("8c"), g.get_wyckoff_position("4a")
+        pts = np.vstack([wp1.apply_ops([0.25, 0.25, 0.25]), wp2.apply_ops([0, 0, 0])])
+        res = assign_wyckoff_positions(pts, g)
+        self.assertTrue([r[0] for r in res] == [wp1.index, wp2.index])
+        self.assertTrue(len(res[0][2]) == 8)
+
+    def test_site_symm(self):
+        from pyxtal.symmetry import get_group, site_symm, site_symm_indices
+        g = get_group(225)
+        pts = [[0, 0, 0], [0.25, 0.25, 0.25], [0.12, 0.35, 0.78]]
+        ids, trans = site_symm_indices(pts, g[0])
+        self.assertTrue([len(i) for i in ids] == [48, 24, 1])
+        ops = site_symm([0.25, 0.25, 0.25], g[0])
+        self.assertTrue(len(ops) == 24)
+        self.assertTrue(np.allclose(ops[0].translation_vector, trans[1][0]))
+
+    def test_stoichiometry_solver(self):
+        from pyxtal.symmetry import get_group, get_stoichiometry_solver
+        g = get_group(225)
+        solver = get_stoichiometry_solver(g, [4, 8])
+        self.assertTrue(solver.verdict == 0 and solver.verdict is not False)
+        self.assertTrue(sorted(solver) == [[["4a"], ["8c"]], [["4b"], ["8c"]]])
+        self.assertTrue(len(list(solver)) == solver.count() == 2)
+        self.assertTrue(solver.sample()[1] == ["8c"])
+        self.assertTrue(get_stoichiometry_solver(g, [3]).verdict is False)
+        self.assertTrue(get_stoichiometry_solver(g, [4, 8]) is solver)
+        self.assertTrue(get_stoichiometry_solver(get_group(147), [3]).verdict is True)
+
+    def test_P21_permutation(self):
+        strs = ['x, y, z', 'x+1/2, -y, -z']
+        wyc, perm = Wyckoff_position.from_symops(strs)
+        self.assertTrue(wyc.number==4 and perm==[1,0,2])
+        wyc, perm = Wyckoff_position.from_symops(strs, group=3)
+        self.assertTrue(wyc is None)
+
     def test_P21n(self):
         strs = ['x, y, z', '-x, -y, -z', '-x+1/2, y+1/2, -z+1/2', 'x+1/2, -y+1/2, z+1/2']
         wyc, perm = Wyckoff_position.from_symops(strs)
         self.assertTrue(wyc.number==14)
 
 
+class TestImport(unittest.TestCase):
+
+    def test_import_time(self):
+        # The budget (in seconds) covers the modules of pyxtal only
+        budget = 0.5
+        import subprocess, sys
+        code = "import pyxtal.crystal, pyxtal.molecular_crystal"
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             stderr=subprocess.PIPE, universal_newlines=True).stderr
+        lines = [l.split("|") for l in out.splitlines() if l.startswith("import time:")]
+        lines = [(int(l[0].split(":")[1]), len(l[2]) - len(l[2].lstrip()), l[2].strip())
+                 for l in lines[1:]]
+        total = sum(t for (t, _, name) in lines if name.startswith("pyxtal"))
+        self.assertTrue(total*1e-6 < budget)
+        # pandas should not be imported by pyxtal itself
+        for i, (_, indent, name) in enumerate(lines):
+            if name == "pandas":
+                parent = [n for (_, d, n) in lines[i:] if d < indent][0]
+                self.assertFalse(parent.startswith("pyxtal"))
+
+    def test_lazy_tables(self):
+        import subprocess, sys
+        code = "import pyxtal.symmetry as s; assert len(s.symmetry_tables) == 0; "
+        code += "s.Group(225); assert all(k.startswith('space') for k in s.symmetry_tables)"
+        self.assertTrue(subprocess.run([sys.executable, "-c", code]).returncode == 0)
+
+
 #class TestOperation(unittest.TestCase):
 #class TestIO(unittest.TestCase):
 
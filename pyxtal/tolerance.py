@@ -1,4 +1,4 @@
-from pyxtal.database.element import Element
+from pyxtal.database.element import Element, covalent_radii, metallic_radii
 import numpy as np
 
 
@@ -25,49 +25,27 @@ class Tol_matrix:
         self.prototype = prototype
         if prototype == "atomic":
             f *= 0.5
-            attrindex = 5
+            radii = covalent_radii
             self.radius_type = "covalent"
         elif prototype == "molecular":
-            attrindex = 5
+            radii = covalent_radii
             self.radius_type = "covalent"
             f *= 1.2
         elif prototype == "metallic":
-            attrindex = 7
+            # Use the covalent radius if no metallic radius is found
+            radii = np.where(np.isnan(metallic_radii), covalent_radii, metallic_radii)
             self.radius_type = "metallic"
             f *= 0.5
         else:
+            radii = covalent_radii
             self.radius_type = "N/A"
         self.f = f
-        H = Element("H")
-        m = [[0.0] * (len(H.elements_list) + 1)]
-        for i, tup1 in enumerate(H.elements_list):
-            m.append([0.0])
-            for j, tup2 in enumerate(H.elements_list):
-                # Get the appropriate atomic radii
-                if tup1[attrindex] is None:
-                    if tup1[5] is None:
-                        val1 = None
-                    else:
-                        # Use the covalent radius
-                        val1 = tup1[5]
-                else:
-                    val1 = tup1[attrindex]
-                if tup2[attrindex] is None:
-                    if tup2[5] is None:
-                        val2 = None
-                    else:
-                        # Use the covalent radius
-                        val2 = tup1[5]
-                else:
-                    val2 = tup2[attrindex]
-                if val1 is not None and val2 is not None:
-                    m[-1].append(f * (val1 + val2))
-                else:
-                    # If no radius is found for either atom, set tolerance to None
-                    m[-1].append(None)
-        self.matrix = np.array(
-            m
-        )  # A symmetric np matrix storing the tolerance between specie pairs
+        # A symmetric np matrix storing the tolerance between specie pairs,
+        # indexed by atomic number. If no radius is found for either atom,
+        # the tolerance is NaN
+        self.matrix = f * (radii[:, None] + radii[None, :])
+        self.matrix[0, :] = 0.0
+        self.matrix[:, 0] = 0.0
         self.custom_values = (
             []
         )  # A list of tuples storing which species pair tolerances have custom values
@@ -83,12 +61,7 @@ class Tol_matrix:
                 priority=1,
             )
 
-        self.radius_list = []
-        for i in range(len(self.matrix)):
-            if i == 0:
-                continue
-            x = self.get_tol(i, i)
-            self.radius_list.append(x)
+        self.radius_list = [self.get_tol(i, i) for i in range(1, len(self.matrix))]
 
     def get_tol(self, specie1, specie2):
         """
@@ -101,15 +74,36 @@ class Tol_matrix:
         Returns:
             the tolerance between the provided pair of atomic species
         """
-        if self.prototype == "single_value":
+        if self.prototype == "single value":
             return self.matrix[0][0]
         index1 = Element.number_from_specie(specie1)
         index2 = Element.number_from_specie(specie2)
         if index1 is not None and index2 is not None:
-            return self.matrix[index1][index2]
+            tol = self.matrix[index1][index2]
+            return None if np.isnan(tol) else tol
         else:
             return None
 
+    def get_tols(self, numbers1, numbers2):
+        """
+        Returns the tolerances between two arrays of atomic numbers, looked up
+        all at once by fancy indexing. Convert each list of species to atomic
+        numbers once (e.g., with Element.number_from_specie) and reuse them.
+
+        Args:
+            numbers1, numbers2: integer arrays of atomic numbers
+
+        Returns:
+            an array of shape numbers1.shape + numbers2.shape. Missing values
+            are NaN
+        """
+        numbers1 = np.asarray(numbers1, dtype=int)
+        numbers2 = np.asarray(numbers2, dtype=int)
+        if self.prototype == "single value":
+            return np.full(numbers1.shape + numbers2.shape, self.matrix[0][0])
+        index1 = numbers1.reshape(numbers1.shape + (1,) * numbers2.ndim)
+        return self.matrix[index1, numbers2]
+
     def set_tol(self, specie1, specie2, value):
         """
         Sets the distance tolerance between two species.
@@ -13,15 +13,16 @@ from pymatgen import Molecule
 from pyxtal.tolerance import Tol_matrix
 from pyxtal.operations import (
     apply_ops, 
-    check_images,
     distance, 
     distance_matrix, 
+    find_short_pair,
+    find_short_molecule_pair,
     project_point, 
+    project_point_ops,
     filtered_coords, 
     create_matrix,
 )
-from pyxtal.symmetry import Group, jk_from_i
-from pyxtal.symmetry import ss_string_from_ops as site_symm
+from pyxtal.symmetry import get_group, get_merge_table
 from pyxtal.database.element import Element
 from pyxtal.constants import rad, deg
 from pyxtal.lattice import Lattice
@@ -49,7 +50,7 @@ class mol_site:
         self.mol = mol.mol # A Pymatgen molecule object
         self.site_props = mol.props
         self.symbols = mol.symbols #[site.specie.value for site in self.mol.sites]
-        self.numbers = self.mol.atomic_numbers
+        self.numbers = np.array(self.mol.atomic_numbers)
         self.tols_matrix = mol.tols_matrix
         self.radius = mol.radius
         self.diag = diag
@@ -59,6 +60,7 @@ class mol_site:
         self.PBC = wp.PBC #The periodic axes
 
         if self.diag:
+            wp = wp.copy()
             wp.diagonalize_symops()
             self.position = project_point(self.position, wp[0])
         self.wp = wp
@@ -72,9 +74,7 @@ class mol_site:
     def __str__(self):
 
         if not hasattr(self, "site_symm"):
-            self.site_symm = site_symm(
-                self.wp.symmetry_m[0], self.wp.number, dim=self.wp.dim
-            )
+            self.site_symm = self.wp.get_site_symmetry()
         self.angles = self.orientation.r.as_euler('zxy', degrees=True)
         formula = self.mol.formula.replace(" ","")
         s = "{:} @ [{:6.4f} {:6.4f} {:6.4f}]  ".format(formula, *self.position)
@@ -88,7 +88,8 @@ class mol_site:
         from pyxtal.viz import display_molecular_site
         return display_molecular_site(self, id, **kwargs)
 
-    def _get_coords_and_species(self, absolute=False, add_PBC=False, first=False):
+    def _get_coords_and_species(self, absolute=False, add_PBC=False, first=False,
+                                out=None):
         """
         Used to generate coords and species for get_coords_and_species
 
@@ -98,40 +99,16 @@ class mol_site:
             add_PBC: whether or not to add coordinates in neighboring unit cells, 
                 used for distance checking
             first: whether or not to extract the information from only the first site
+            out: an optional (n_ops*n_atoms, 3) array to store the fractional
+                coordinates of the orbit, e.g., reused over many trials
 
         Returns:
             atomic coords: a numpy array of fractional coordinates for the atoms in the site
             species: a list of atomic species for the atomic coords
         """
-        coord0 = self.mol.cart_coords.dot(self.orientation.matrix.T)  #
-        wp_atomic_sites = []
-        wp_atomic_coords = None
-
-        for point_index, op2 in enumerate(self.wp.ops):
-            # Obtain the center in absolute coords
-            center_relative = op2.operate(self.position)
-            center_absolute = np.dot(center_relative, self.lattice.matrix)
-
-            # Rotate the molecule (Euclidean metric)
-            #op2_m = self.wp.generators_m[point_index]
-            op2_m = self.wp.generators_m[point_index]
-            rot = op2_m.affine_matrix[0:3][:, 0:3].T
-            if self.diag and self.wp.index > 0:
-                tau = op2.translation_vector
-            else:
-                tau = op2_m.affine_matrix[0:3][:, 3]
-            tmp = np.dot(coord0, rot) + tau
-            # Add absolute center to molecule
-            tmp += center_absolute
-            tmp = tmp.dot(self.lattice.inv_matrix)
-            if wp_atomic_coords is None:
-                wp_atomic_coords = tmp
-            else:
-                wp_atomic_coords = np.append(wp_atomic_coords, tmp, axis=0)
-            wp_atomic_sites.extend(self.symbols)
-
-            if first:
-                break
+        n_ops = 1 if first else len(self.wp.ops)
+        wp_atomic_coords = self._get_orbit_coords(n_ops, out)
+        wp_atomic_sites = self.symbols * n_ops
 
         if add_PBC is True:
             # Filter PBC of wp_atomic_coords
@@ -152,6 +129,195 @@ class mol_site:
 
         return wp_atomic_coords, wp_atomic_sites
 
+    def _get_orbit_coords(self, n_ops, out=None):
+        """
+        Computes the fractional coordinates of the molecules generated by the
+        first n_ops operations of the Wyckoff position, with one batched
+        product over the stacked rotations and translations. The full orbit
+        is cached until the position, orientation, molecule or lattice changes.
+
+        Args:
+            n_ops: the number of operations to apply
+            out: an optional (n_ops*n_atoms, 3) array to store the result
+
+        Returns:
+            a (n_ops*n_atoms, 3) array of fractional coordinates
+        """
+        position = np.asarray(self.position, dtype=float)
+        key = (
+            id(self.mol),
+            id(self.wp),
+            self.diag,
+            position.tobytes(),
+            self.orientation.matrix.tobytes(),
+            self.lattice.matrix.tobytes(),
+        )
+        n_atoms = len(self.symbols)
+        cache = getattr(self, "_orbit_cache", None)
+        if cache is not None and cache[0] == key:
+            coords = cache[1][:n_ops * n_atoms]
+            if out is None:
+                return coords.copy()
+            out[:] = coords
+            return out
+
+        coord0 = self.mol.cart_coords.dot(self.orientation.matrix.T)
+        rots, shifts = self._get_orbit_transforms(n_ops)
+        if out is None:
+            out = np.empty([n_ops * n_atoms, 3])
+        coords = out.reshape([n_ops, n_atoms, 3])
+        # Rotate the molecule (Euclidean metric) and add the absolute center
+        np.matmul(coord0, rots, out=coords)
+        coords += shifts[:, None, :]
+        out[:] = out.dot(self.lattice.inv_matrix)
+        if n_ops == len(self.wp.ops):
+            # keep mol and wp alive so that their ids are not reused
+            self._orbit_cache = (key, out.copy(), (self.mol, self.wp))
+        return out
+
+    def _get_orbit_transforms(self, n_ops):
+        """
+        Stacks the transformations which place the (oriented) molecule at the
+        first n_ops sites of the orbit: in absolute coordinates, the i-th
+        molecule is `coord0.dot(rots[i]) + shifts[i]`
+
+        Args:
+            n_ops: the number of operations
+
+        Returns:
+            rots: a (n_ops, 3, 3) array of transposed rotation matrices
+            shifts: a (n_ops, 3) array of absolute translations
+        """
+        position = np.asarray(self.position, dtype=float)
+        # Centers in absolute coords
+        centers = np.dot(self.wp.apply_ops(position)[:n_ops], self.lattice.matrix)
+        ops_m = self.wp.affine_generators_m[:n_ops]
+        if self.diag and self.wp.index > 0:
+            tau = self.wp.affine_ops[:n_ops, :3, 3]
+        else:
+            tau = ops_m[:, :3, 3]
+        return ops_m[:, :3, :3].transpose(0, 2, 1), tau + centers
+
+    def get_orientation_scores(self, matrices, max_size=2000000):
+        """
+        Evaluates many candidate orientations of the molecule at once. For
+        each orientation, computes the smallest ratio between an inter-
+        molecular distance and its tolerance, over the distances between the
+        generating molecule and the other molecules of the site (taken at the
+        nearest image in fractional coordinates) and its own periodic images
+        (the same images as check_distances). The ratios are only used to rank
+        the orientations; check_distances should be called to validate the
+        chosen one.
+
+        Args:
+            matrices: a (k, 3, 3) array of candidate orientation matrices
+            max_size: the number of distances evaluated per batch
+
+        Returns:
+            a (k,) array of ratios. Values below 1 indicate short contacts
+        """
+        matrices = np.asarray(matrices)
+        n_ops = len(self.wp.ops)
+        n_atoms = len(self.symbols)
+        rots, shifts = self._get_orbit_transforms(n_ops)
+        pbc = np.array(self.PBC, dtype=bool)
+        # periodic images of the molecule itself, as in check_distances
+        images = self._create_matrix()
+        images = images[(images != 0).any(axis=1)]
+        tols2 = self.tols_matrix ** 2
+        scores = np.full(len(matrices), np.inf)
+
+        size = max(1, (n_ops - 1 + len(images)) * n_atoms * n_atoms)
+        batch = max(1, max_size // size)
+        for i in range(0, len(matrices), batch):
+            # (k, n_ops, n_atoms, 3) fractional coordinates of the orbits
+            coord0 = np.matmul(self.mol.cart_coords, matrices[i:i+batch].transpose(0, 2, 1))
+            coords = np.matmul(coord0[:, None], rots) + shifts[:, None, :]
+            coords = coords.dot(self.lattice.inv_matrix)
+            coords_mol = coords[:, 0]
+            ratios = []
+            if n_ops > 1:
+                # (k, n_ops-1, n_atoms, n_atoms, 3) vectors to the other molecules
+                d = coords[:, 1:, None, :, :] - coords_mol[:, None, :, None, :]
+                d[..., pbc] -= np.round(d[..., pbc])
+                d = d.dot(self.lattice.matrix)
+                d = np.einsum("...i,...i->...", d, d) / tols2
+                ratios.append(d.min(axis=(1, 2, 3)))
+            if len(images) > 0:
+                # (k, n_images, n_atoms, n_atoms, 3) vectors to the periodic images
+                d = coords_mol[:, None, None, :, :] - coords_mol[:, None, :, None, :]
+                d = d + images[None, :, None, None, :]
+                d = d.dot(self.lattice.matrix)
+                d = np.einsum("...i,...i->...", d, d) / tols2
+                ratios.append(d.min(axis=(1, 2, 3)))
+            if len(ratios) > 0:
+                scores[i:i+batch] = np.sqrt(np.min(ratios, axis=0))
+        return scores
+
+    def optimize_orientation(self, n_grid=24, n_refine=0, target=None,
+                             random_state=None):
+        """
+        Searches for the orientation of the molecule with the largest
+        get_orientation_scores value. The candidates are evaluated in batches:
+        a grid of angles about the constraint axis if the orientation has one
+        degree of freedom, or random rotations if it has two. With n_refine >
+        0, the search is repeated on a finer set of candidates around the best
+        orientation found so far. The current orientation is always one of the
+        candidates. The orientation of the site is updated in place.
+
+        Args:
+            n_grid: the number of candidates per round
+            n_refine: the number of refinement rounds
+            target: stop the refinement once the score reaches this value
+            random_state: a numpy.random.Generator, used for two degrees of
+                freedom. If None, the global random state is used
+
+        Returns:
+            the score of the chosen orientation
+        """
+        ori = self.orientation
+        if ori.degrees == 0:
+            return self.get_orientation_scores([ori.matrix])[0]
+        rng = np.random if random_state is None else random_state
+
+        best_r, best_angle, best_score = ori.r, 0.0, -np.inf
+        step = 2 * np.pi / n_grid if ori.degrees == 1 else np.pi / 2
+        for level in range(n_refine + 1):
+            if ori.degrees == 1:
+                # Rotations about the constraint axis
+                if level == 0:
+                    angles = np.arange(n_grid) * step
+                else:
+                    angles = np.linspace(-step, step, n_grid)
+                    step *= 2 / max(1, n_grid - 1)
+                rs = R.from_rotvec(angles[:, None] * ori.axis) * best_r
+            elif level == 0:
+                # Uniform samples of SO(3)
+                rs = R.random(n_grid, random_state=random_state)
+            else:
+                # Random rotations of the best orientation, by at most step
+                step *= 0.5
+                axes = rng.random([n_grid, 3]) - 0.5
+                axes /= np.linalg.norm(axes, axis=1)[:, None]
+                rs = R.from_rotvec(axes * step * rng.random([n_grid, 1])) * best_r
+            # Keep the best orientation as a candidate
+            rs = R.from_quat(np.vstack([best_r.as_quat(), rs.as_quat()]))
+            scores = self.get_orientation_scores(rs.as_matrix())
+            i = np.argmax(scores)
+            if i > 0:
+                best_r = rs[i]
+                if ori.degrees == 1:
+                    best_angle += angles[i - 1]
+            best_score = scores[i]
+            if target is not None and best_score >= target:
+                break
+
+        ori.r = best_r
+        ori.matrix = best_r.as_matrix()
+        if ori.degrees == 1:
+            ori.angle = (ori.angle or 0.0) + best_angle
+        return best_score
+
     def get_coords_and_species(self, absolute=False, add_PBC=False):
         """
         Lazily generates and returns the atomic coordinate and species for the
@@ -178,7 +344,7 @@ class mol_site:
         Returns:
             A numpy array of fractional 3-vectors
         """
-        centers = apply_ops(self.position, self.wp.ops)
+        centers = apply_ops(self.position, self.wp)
         # centers1 = filtered_coords(centers0, self.PBC)
         if absolute is False:
             return centers
@@ -224,13 +390,19 @@ class mol_site:
         matrix = self.get_principle_axes(coord0, True)
         return R.from_matrix(matrix).as_euler('zxy', degrees=True)
 
-    def perturbate(self, magnitude=1.0):
+    def perturbate(self, magnitude=1.0, random_state=None):
         """
         Random perturbation of the molecular site
+
+        Args:
+            magnitude: the magnitude of the displacement (in Angstrom)
+            random_state: a numpy.random.Generator. If None, the global
+                random state is used
         """
-        disp = np.random.random([1,3])-0.5
+        rng = np.random if random_state is None else random_state
+        disp = rng.random([1,3])-0.5
         self.translate(magnitude*disp, True)
-        self.orientation.change_orientation()
+        self.orientation.change_orientation(random_state=random_state)
 
     
     def translate(self, disp=np.array([0.0,0.0,0.0]), absolute=False):
@@ -398,7 +570,7 @@ class mol_site:
             wp, ax, pos = self._find_gen_wyckoff_in_subgroup()
             ori = self.orientation.rotate_by_matrix(np.eye(3)[ax])
             lat = self.lattice.swap_axis(ids=ax)
-            lat.ltype = Group(wp.number).lattice_type
+            lat.ltype = get_group(wp.number).lattice_type
             return mol_site(self.molecule, pos, ori, wp, lat, self.diag)
         else:
             print("This is already a general position")
@@ -490,8 +662,8 @@ class mol_site:
     def check_distances(self):
         """
         Checks if the atoms in the Wyckoff position are too close to each other
-        or not. Does not check distances between atoms in the same molecule. Uses
-        crystal.check_distance as the base code.
+        or not. Does not check distances between atoms in the same molecule.
+        The check stops at the first pair of atoms which is too close.
 
         Returns:
             True if the atoms are not too close together, False otherwise
@@ -508,29 +680,20 @@ class mol_site:
             # Check periodic images
             m = self._create_matrix()
             # Remove original coordinates
-            m2 = []
-            v0 = np.array([0.0, 0.0, 0.0])
-            for v in m:
-                if not (v == v0).all():
-                    m2.append(v)
-            if len(m2) > 0:
-                coords_PBC = np.vstack([coords_mol + v for v in m2])
-                d = distance_matrix(coords_PBC, coords_mol, self.lattice.matrix, PBC=[0, 0, 0])
-                # only check if small distance is detected
-                if np.min(d) < np.max(self.tols_matrix):
-                    tols = np.min(d.reshape([len(m2), m_length, m_length]), axis=0)
-                    if (tols < self.tols_matrix).any():
-                        return False
+            m = m[(m != 0).any(axis=1)]
+            if len(m) > 0:
+                coords_PBC = (coords_mol[None, :, :] + m[:, None, :]).reshape([-1, 3])
+                tols = np.tile(self.tols_matrix, (len(m), 1))
+                if find_short_pair(coords_PBC, coords_mol, self.lattice.matrix,
+                                   tols, PBC=[0, 0, 0]) is not None:
+                    return False
 
         if self.wp.multiplicity > 1:
             # Check inter-atomic distances
-            d = distance_matrix(coords, coords_mol, self.lattice.matrix, PBC=self.PBC)
-            if np.min(d) < np.max(self.tols_matrix):
-                tols = np.min(
-                    d.reshape([self.wp.multiplicity - 1, m_length, m_length]), axis=0
-                )
-                if (tols < self.tols_matrix).any():
-                    return False
+            tols = np.tile(self.tols_matrix, (self.wp.multiplicity - 1, 1))
+            if find_short_pair(coords, coords_mol, self.lattice.matrix,
+                               tols, PBC=self.PBC) is not None:
+                return False
 
         return True
 
@@ -538,9 +701,12 @@ class mol_site:
 
 def check_mol_sites(ms1, ms2, factor=1.0, tm=Tol_matrix(prototype="molecular")):
     """
-    Checks whether or not the molecules of two mol sites overlap. Uses
-    ellipsoid overlapping approximation to check. Takes PBC and lattice
-    into consideration.
+    Checks whether or not the molecules of two mol sites overlap. Takes PBC
+    and lattice into consideration. One molecule of a site is compared with
+    the whole orbit of the other site in two stages. First, only the
+    molecules (and periodic images) whose bounding spheres come closer than
+    the largest tolerance are kept, using the distances between the centers.
+    Then, the atomic distances are checked for these molecules only.
 
     Args:
         ms1: a mol_site object
@@ -552,44 +718,34 @@ def check_mol_sites(ms1, ms2, factor=1.0, tm=Tol_matrix(prototype="molecular")):
     Returns:
         False if the Wyckoff positions overlap. True otherwise
     """
-    # Get coordinates for both mol_sites
-    c1, _ = ms1.get_coords_and_species()
-    c2, _ = ms2.get_coords_and_species()
-
     # Calculate which distance matrix is smaller/faster
+    size1 = len(ms1.numbers) * ms2.wp.multiplicity
+    size2 = len(ms2.numbers) * ms1.wp.multiplicity
+    if size1 > size2:
+        ms1, ms2 = ms2, ms1
     m_length1 = len(ms1.numbers)
     m_length2 = len(ms2.numbers)
-    wp_length1 = len(c1)
-    wp_length2 = len(c2)
-    size1 = m_length1 * wp_length2
-    size2 = m_length2 * wp_length1
-
-    # Case 1
-    if size1 <= size2:
-        coords_mol = c1[:m_length1]
-        # Calculate tol matrix for species pairs
-        tols = np.zeros((m_length1, m_length2))
-        for i1, number1 in enumerate(ms1.numbers):
-            for i2, number2 in enumerate(ms2.numbers):
-                tols[i1][i2] = tm.get_tol(number1, number2)
-        tols = np.repeat(tols, ms2.wp.multiplicity, axis=1)
-        d = distance_matrix(coords_mol, c2, ms1.lattice.matrix, PBC=ms1.PBC)
-
-    # Case 2
-    elif size1 > size2:
-        coords_mol = c2[:m_length2]
-        # Calculate tol matrix for species pairs
-        tols = np.zeros((m_length2, m_length1))
-        for i1, number1 in enumerate(ms2.numbers):
-            for i2, number2 in enumerate(ms1.numbers):
-                tols[i1][i2] = tm.get_tol(number1, number2)
-        tols = np.repeat(tols, ms1.wp.multiplicity, axis=1)
-        d = distance_matrix(coords_mol, c1, ms1.lattice.matrix, PBC=ms1.PBC)
-
-    # Check if distances are smaller than tolerances
-    if (d < tols).any():
-        return False
-    return True
+    lattice = ms1.lattice.matrix
+
+    # Calculate tol matrix for species pairs
+    tols = tm.get_tols(ms1.numbers, ms2.numbers)
+
+    # The centers of the molecules
+    inv_lattice = ms1.lattice.inv_matrix
+    center = ms1._get_orbit_transforms(1)[1][0].dot(inv_lattice)
+    centers = ms2._get_orbit_transforms(ms2.wp.multiplicity)[1].dot(inv_lattice)
+    # the radius of a molecule bounds the distance of its atoms to the center
+    cutoff = ms1.radius + ms2.radius + tols.max()
+
+    c1, _ = ms1.get_coords_and_species()
+    c2, _ = ms2.get_coords_and_species()
+    coords_mol = c1[:m_length1]
+    coords = c2.reshape([-1, m_length2, 3])
+
+    # Stop at the first distance smaller than the tolerance
+    pair = find_short_molecule_pair(coords_mol, center, coords, centers, lattice,
+                                    tols, cutoff, PBC=ms1.PBC)
+    return pair is None
 
 
 class atom_site:
@@ -604,7 +760,9 @@ class atom_site:
 
     def __init__(self, wp, coordinate, specie=1):
         self.position = np.array(coordinate)
-        self.specie = Element(specie).short_name
+        element = Element(specie)
+        self.specie = element.short_name
+        self.number = element.z
         self.multiplicity = wp.multiplicity
         self.wp = wp
         self.PBC = wp.PBC
@@ -612,9 +770,7 @@ class atom_site:
 
     def __str__(self):
         if not hasattr(self, "site_symm"):
-            self.site_symm = site_symm(
-                self.wp.symmetry_m[0], self.wp.number, dim=self.wp.dim
-            )
+            self.site_symm = self.wp.get_site_symmetry()
 
         s = "{:>2s} @ [{:6.4f} {:6.4f} {:6.4f}], ".format(self.specie, *self.position)
         s += "WP: {:2d}{:s}, ".format(self.wp.multiplicity, self.wp.letter)
@@ -632,6 +788,27 @@ class atom_site:
         return str(self)
 
 
+def check_atom_site_neighbors(ws, cells, tm):
+    """
+    Checks the inter-atomic distances between a Wyckoff site and the atoms
+    already placed in a Cell_list. Since the stored atoms form complete
+    orbits of the same group, only the first atom of the site is checked.
+
+    Args:
+        ws: an atom_site object
+        cells: a `pyxtal.operations.Cell_list` object holding the placed atoms,
+            labelled by atomic number. Its cutoff must be at least the largest
+            tolerance
+        tm: a Tol_matrix object
+
+    Returns:
+        True if all distances are greater than the allowed tolerances.
+        False if any distance is smaller than the allowed tolerance
+    """
+    d, numbers = cells.get_neighbors(ws.coords[0])
+    return not (d < tm.get_tols(ws.number, numbers)).any()
+
+
 def check_atom_sites(ws1, ws2, lattice, tm, same_group=True):
     """
     Given two Wyckoff sites, checks the inter-atomic distances between them.
@@ -664,21 +841,12 @@ def check_atom_sites(ws1, ws2, lattice, tm, same_group=True):
         else:
             coords1 = [ws2.coords[0]]
             coords2 = ws1.coords
-        # Calculate distances
-        dm = distance_matrix(coords1, coords2, lattice, PBC=ws1.PBC)
-        # Check if any distances are less than the tolerance
-        if (dm < tol).any():
-            return False
-        else:
-            return True
     # No symmetry method: check all atomic pairs
     else:
-        dm = distance_matrix(ws1.coords, ws2.coords, lattice, PBC=ws1.PBC)
-        # Check if any distances are less than the tolerance
-        if (dm < tol).any():
-            return False
-        else:
-            return True
+        coords1 = ws1.coords
+        coords2 = ws2.coords
+    # Stop at the first distance less than the tolerance
+    return find_short_pair(coords1, coords2, lattice, tol, PBC=ws1.PBC) is None
 
 def WP_merge(pt, lattice, wp, tol, orientations=None):
     """
@@ -703,70 +871,49 @@ def WP_merge(pt, lattice, wp, tol, orientations=None):
     """
     index = wp.index
     PBC = wp.PBC
-    group = Group(wp.number, wp.dim)
+    group = get_group(wp.number, wp.dim)
+    table = get_merge_table(wp.number, wp.dim)
     pt = project_point(pt, wp[0], lattice, PBC)
     coor = apply_ops(pt, wp)
     if orientations is None:
         valid_ori = None
     else:
-        j, k = jk_from_i(index, orientations)
-        valid_ori = orientations[j][k]
-    
-    # Main loop for merging multiple times
+        # the orientations of each Wyckoff position, in the group order
+        oris = [ori for oris_j in orientations for ori in oris_j]
+        valid_ori = oris[index]
+    images = create_matrix(PBC=PBC)
+    origin = (images == 0).all(axis=1)
 
+    # Main loop for merging multiple times
     while True:
-        # Check distances of current WP. If too small, merge
-        dm = distance_matrix([coor[0]], coor, lattice, PBC=PBC)
-        passed_distance_check = True
-        x = np.argwhere(dm < tol)
-        for y in x:
-            # Ignore distance from atom to itself
-            if y[0] == 0 and y[1] == 0:
-                pass
-            else:
-                passed_distance_check = False
-                break
-
-        # for molecular crystal, one more check
-        if check_images([coor[0]], [6], lattice, PBC=PBC, tol=tol) is False:
-            passed_distance_check = False
-
-        
-        if not passed_distance_check:
-            mult1 = group[index].multiplicity
-            # Find possible wp's to merge into
-            possible = []
-            for i, wp0 in enumerate(group):
-                mult2 = wp0.multiplicity
-                # Check that a valid orientation exists
-                if orientations is not None:
-                    j, k = jk_from_i(i, orientations)
-                    if orientations[j][k] == []:
-                        continue
-                    else:
-                        valid_ori = orientations[j][k]
-                # factor = mult2 / mult1
-
-                if (mult2 < mult1) and (mult1 % mult2 == 0):
-                    possible.append(i)
-            if possible == []:
-                return None, False, valid_ori
-        
-            # Calculate minimum separation for each WP
-            distances = []
-            for i in possible:
-                wp = group[i]
-                projected_point = project_point(pt, wp[0], lattice=lattice, PBC=PBC)
-                d = distance(pt - projected_point, lattice, PBC=PBC)
-                distances.append(np.min(d))
-            # Choose wp with shortest translation for generating point
-            tmpindex = np.argmin(distances)
-            index = possible[tmpindex]
-            wp = group[index]
-            pt = project_point(pt, wp[0], lattice=lattice, PBC=PBC)
-            coor = apply_ops(pt, wp)
-        # Distances were not too small; return True
-        else:
+        # Check the distances from the first atom to all atoms of the current
+        # WP, and to its own periodic images. If too small, merge
+        coor = filtered_coords(coor, PBC=PBC)
+        d = np.dot(coor[None, :, :] - coor[0] - images[:, None, :], lattice)
+        d = np.linalg.norm(d, axis=-1)
+        # Ignore distance from atom to itself
+        d[origin, 0] = np.inf
+        if (d >= tol).all():
             return pt, wp, valid_ori
 
+        # Find possible wp's to merge into
+        possible, ops = table[index]
+        if orientations is not None:
+            # Check that a valid orientation exists
+            mask = [oris[i] != [] for i in possible]
+            possible, ops = possible[mask], ops[mask]
+        if len(possible) == 0:
+            return None, False, valid_ori
+
+        # Choose wp with shortest translation for generating point
+        points = project_point_ops(pt, ops, lattice, PBC)
+        distances = distance(pt - points, lattice, PBC=PBC)
+        tmpindex = np.argmin(distances)
+        index = possible[tmpindex]
+        wp = group[index]
+        pt = points[tmpindex]
+        coor = apply_ops(pt, wp)
+        if orientations is not None:
+            valid_ori = oris[index]
+
 
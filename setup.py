@@ -28,7 +28,7 @@ setup(
         "pyxtal.potentials",
     ],
     package_data={
-        "pyxtal.database": ["*.csv", "*.json"],
+        "pyxtal.database": ["*.csv", "*.json", "*.npz"],
         #'pyxtal.potentials': ['*'],
     },
     scripts=[